@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 文件名: bench_codec.py
+"""Opus编解码单帧耗时
+
+使用与AudioCodec相同的编解码参数(AudioConfig)，上行编码16kHz帧，下行解码服务端帧，
+另外测量丢包隐藏(PLC)和FEC恢复的耗时。opus_encode_<预设>为OpusEncoderController各预设下的编码耗时，
+其中带FEC的用例按10%预期丢包开启带内FEC。opus_decode_prealloc为AudioCodec实际使用的
+OpusFrameDecoder（解码到预分配缓冲区），opus_decode为opuslib.Decoder的解码耗时。
+
+用法:
+    python benchmarks/bench_codec.py [--iterations 1000]
+"""
+
+import numpy as np
+
+from common import BenchCase, cycling, run_stage_cli, skip_on_error
+
+STAGE = "codec"
+
+
+def _speech_like(rate, samples, seed=0):
+    """正弦叠加噪声，接近语音的编码负载"""
+    t = np.arange(samples) / rate
+    rng = np.random.default_rng(seed)
+    signal = 5000 * np.sin(2 * np.pi * 220 * t) * (1 + np.sin(2 * np.pi * 3 * t))
+    signal += rng.normal(0, 800, samples)
+    return np.clip(signal, -32768, 32767).astype(np.int16)
+
+
+def _codec_cases():
+    from src.utils.opus_loader import setup_opus
+
+    setup_opus()
+    import opuslib
+
+    from src.constants.constants import AudioConfig
+
+    encoder = opuslib.Encoder(
+        AudioConfig.INPUT_SAMPLE_RATE, AudioConfig.CHANNELS, AudioConfig.OPUS_APPLICATION
+    )
+    input_frame = AudioConfig.INPUT_FRAME_SIZE
+    pcm = _speech_like(AudioConfig.INPUT_SAMPLE_RATE, input_frame * 50)
+    input_frames = [
+        pcm[i : i + input_frame].tobytes() for i in range(0, len(pcm), input_frame)
+    ]
+    next_input = cycling(input_frames)
+
+    # 下行：按服务端采样率预先编码一段音频
+    output_rate = AudioConfig.OUTPUT_SAMPLE_RATE
+    output_frame = output_rate * AudioConfig.FRAME_DURATION // 1000
+    server_encoder = opuslib.Encoder(output_rate, 1, opuslib.APPLICATION_AUDIO)
+    pcm = _speech_like(output_rate, output_frame * 50, seed=1)
+    packets = [
+        server_encoder.encode(pcm[i : i + output_frame].tobytes(), output_frame)
+        for i in range(0, len(pcm), output_frame)
+    ]
+    next_packet = cycling(packets)
+    decoder = opuslib.Decoder(output_rate, AudioConfig.CHANNELS)
+
+    from src.audio_codecs.opus_decoder import OpusFrameDecoder
+
+    frame_decoder = OpusFrameDecoder(
+        output_rate, AudioConfig.CHANNELS, AudioConfig.MAX_DECODE_FRAME_SIZE
+    )
+
+    from src.audio_codecs.opus_controller import (PROFILE_SETTINGS,
+                                                  OpusEncoderController)
+
+    profile_cases = []
+    for profile in PROFILE_SETTINGS:
+        for fec in (False, True):
+            profile_encoder = opuslib.Encoder(
+                AudioConfig.INPUT_SAMPLE_RATE,
+                AudioConfig.CHANNELS,
+                AudioConfig.OPUS_APPLICATION,
+            )
+            controller = OpusEncoderController(
+                profile_encoder, AudioConfig.FRAME_DURATION, profile, adaptive=False
+            )
+            name = f"opus_encode_{profile}"
+            if fec:
+                controller.inband_fec = True
+                controller.packet_loss_perc = 10
+                controller._apply()
+                name += "_fec"
+            profile_cases.append(
+                BenchCase(
+                    STAGE,
+                    name,
+                    lambda e=profile_encoder: e.encode(next_input(), input_frame),
+                )
+            )
+
+    return [
+        BenchCase(
+            STAGE, "opus_encode", lambda: encoder.encode(next_input(), input_frame)
+        ),
+        *profile_cases,
+        BenchCase(
+            STAGE,
+            "opus_decode",
+            lambda: decoder.decode(next_packet(), AudioConfig.MAX_DECODE_FRAME_SIZE),
+        ),
+        BenchCase(
+            STAGE,
+            "opus_decode_prealloc",
+            lambda: frame_decoder.decode(
+                next_packet(), AudioConfig.MAX_DECODE_FRAME_SIZE
+            ),
+        ),
+        BenchCase(STAGE, "opus_plc", lambda: decoder.decode(b"", output_frame)),
+        BenchCase(
+            STAGE,
+            "opus_fec",
+            lambda: decoder.decode(next_packet(), output_frame, decode_fec=True),
+        ),
+    ]
+
+
+def cases(args=None):
+    return skip_on_error(STAGE, "opus", _codec_cases)
+
+
+if __name__ == "__main__":
+    run_stage_cli("Opus编解码单帧耗时", cases)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 文件名: bench_crypto.py
+"""MQTT UDP音频通道的AES-CTR加解密耗时
+
+- aes_ctr_encrypt / aes_ctr_decrypt: MqttProtocol的通用加解密函数（每次构造Cipher）
+- aes_ctr_cipher: 会话内复用的AesCtrCipher
+- send_audio: MqttProtocol.send_audio的完整发送路径（nonce写入+加密+打包），UDP发送替换为空操作
+- udp_receive_decrypt: 每个UDP包的解析与解密（MqttProtocol._decrypt_packet）
+- udp_packet_dispatch: 从收到数据报到回调音频处理的完整路径，含序号窗口（MqttProtocol._on_udp_packet）
+
+用法:
+    python benchmarks/bench_crypto.py [--iterations 5000]
+"""
+
+import asyncio
+import os
+
+from common import BenchCase, cycling, run_stage_cli, run_sync, skip_on_error
+
+STAGE = "crypto"
+PACKET_SIZE = 120  # 20ms Opus帧的典型大小
+
+
+class _NullTransport:
+    """吞掉数据包的UDP传输对象，只测量加密和打包"""
+
+    def sendto(self, data, addr=None):
+        pass
+
+    def is_closing(self):
+        return False
+
+    def close(self):
+        pass
+
+
+def _make_packets(protocol, key, payloads, count):
+    """模拟服务端下发的加密包：nonce(16) + 密文，序号从1开始连续递增"""
+    packets = []
+    for sequence in range(1, count + 1):
+        payload = payloads[sequence % len(payloads)]
+        nonce = (
+            protocol.aes_nonce[:4]
+            + format(len(payload), "04x")
+            + protocol.aes_nonce[8:24]
+            + format(sequence, "08x")
+        )
+        nonce = bytes.fromhex(nonce)
+        packets.append(nonce + protocol.aes_ctr_encrypt(key, nonce, payload))
+    return packets
+
+
+def _crypto_cases(args):
+    from src.protocols.aes_ctr import AesCtrCipher
+    from src.protocols.mqtt_protocol import MqttProtocol
+
+    protocol = MqttProtocol(asyncio.new_event_loop())
+    protocol.aes_key = os.urandom(16).hex()
+    protocol.aes_nonce = (bytes([0x01, 0, 0, 0]) + os.urandom(8) + bytes(4)).hex()
+    protocol.udp_server = "127.0.0.1"
+    protocol.udp_port = 8884
+    protocol.udp_transport = _NullTransport()
+    protocol._setup_udp_crypto()
+    protocol.on_incoming_audio = lambda audio, sequence: None
+
+    key = bytes.fromhex(protocol.aes_key)
+    payloads = [os.urandom(PACKET_SIZE - i % 20) for i in range(50)]
+    next_payload = cycling(payloads)
+
+    packets = _make_packets(protocol, key, payloads, len(payloads))
+    next_packet = cycling(packets)
+    # 完整接收路径会丢弃重复序号，需要足够多的连续序号覆盖全部调用
+    count = args.iterations + args.warmup if args else 2000
+    next_sequential_packet = cycling(_make_packets(protocol, key, payloads, count))
+    nonce = packets[0][:16]
+    cipher = AesCtrCipher(key)
+
+    return [
+        BenchCase(
+            STAGE,
+            "aes_ctr_encrypt",
+            lambda: protocol.aes_ctr_encrypt(key, nonce, next_payload()),
+            unit="包",
+        ),
+        BenchCase(
+            STAGE,
+            "aes_ctr_decrypt",
+            lambda: protocol.aes_ctr_decrypt(key, nonce, next_payload()),
+            unit="包",
+        ),
+        BenchCase(
+            STAGE,
+            "aes_ctr_cipher",
+            lambda: cipher.process(nonce, next_payload()),
+            unit="包",
+        ),
+        BenchCase(
+            STAGE,
+            "send_audio",
+            lambda: run_sync(protocol.send_audio(next_payload())),
+            unit="包",
+        ),
+        BenchCase(
+            STAGE,
+            "udp_receive_decrypt",
+            lambda: protocol._decrypt_packet(next_packet()),
+            unit="包",
+        ),
+        BenchCase(
+            STAGE,
+            "udp_packet_dispatch",
+            lambda: protocol._on_udp_packet(next_sequential_packet()),
+            unit="包",
+        ),
+    ]
+
+
+def cases(args=None):
+    return skip_on_error(STAGE, "aes_ctr", lambda: _crypto_cases(args))
+
+
+if __name__ == "__main__":
+    run_stage_cli("MQTT UDP音频加解密耗时", cases)
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 文件名: bench_json.py
+"""JSON消息处理耗时
+
+- parse_*: 协议层收到服务端文本消息后的解析（json_codec.loads）
+- send_*: Protocol的消息构造与序列化，文本发送替换为空操作
+- send_iot_states: 物联网状态列表由Protocol一次序列化
+- send_iot_states_str: 兼容旧调用方式，传入ThingManager序列化好的字符串，需再解析、再序列化
+- trace_decode/trace_encode: 一次完整对话的消息记录逐条解析/序列化，
+  与标准库版本(*_stdlib)对比json_codec的收益，单位为每条消息
+
+用法:
+    python benchmarks/bench_json.py [--iterations 5000]
+"""
+
+import json
+
+from common import BenchCase, run_stage_cli, run_sync, skip_on_error
+
+STAGE = "json"
+SESSION_ID = "a3f1c2d4-5e6f-4a7b-8c9d-0e1f2a3b4c5d"
+
+SERVER_MESSAGES = {
+    "tts_sentence_start": {
+        "type": "tts",
+        "state": "sentence_start",
+        "text": "今天北京晴，最高气温二十六度，适合出门散步。",
+        "session_id": SESSION_ID,
+    },
+    "stt": {
+        "type": "stt",
+        "text": "今天天气怎么样",
+        "session_id": SESSION_ID,
+    },
+    "iot_commands": {
+        "type": "iot",
+        "commands": [
+            {"name": "Lamp", "method": "TurnOn", "parameters": {}},
+            {"name": "Speaker", "method": "SetVolume", "parameters": {"volume": 60}},
+        ],
+        "session_id": SESSION_ID,
+    },
+}
+
+
+def _iot_states():
+    """与ThingManager.get_states输出规模相当的状态列表"""
+    return [
+            {"name": "Speaker", "state": {"volume": 60}},
+            {"name": "Lamp", "state": {"power": True}},
+            {"name": "CountdownTimer", "state": {"active": False, "remaining": 0}},
+            {
+                "name": "MusicPlayer",
+                "state": {
+                    "playing": True,
+                    "current_song": "晴天 - 周杰伦",
+                    "position": 93.5,
+                    "duration": 269.0,
+                    "lyrics": "故事的小黄花 从出生那年就飘着",
+                },
+            },
+            {"name": "Camera", "state": {"power": False}},
+            {"name": "Thermometer", "state": {"temperature": 25.4, "humidity": 48}},
+    ]
+
+
+def _iot_descriptors():
+    """与ThingManager.get_descriptors输出规模相当的设备描述"""
+
+    def thing(name, description, properties, methods):
+        return {
+            "name": name,
+            "description": description,
+            "properties": {
+                key: {"description": text, "type": kind}
+                for key, (text, kind) in properties.items()
+            },
+            "methods": {
+                key: {
+                    "description": text,
+                    "parameters": {
+                        param: {"description": param_text, "type": param_kind}
+                        for param, (param_text, param_kind) in params.items()
+                    },
+                }
+                for key, (text, params) in methods.items()
+            },
+        }
+
+    return [
+        thing(
+            "Speaker",
+            "当前 AI 机器人的扬声器",
+            {"volume": ("当前音量值", "number")},
+            {"SetVolume": ("设置音量", {"volume": ("0到100之间的整数", "number")})},
+        ),
+        thing(
+            "Lamp",
+            "一个测试用的灯",
+            {"power": ("灯是否打开", "boolean")},
+            {"TurnOn": ("打开灯", {}), "TurnOff": ("关闭灯", {})},
+        ),
+        thing(
+            "MusicPlayer",
+            "在线音乐播放器，优先本地缓存",
+            {
+                "playing": ("是否正在播放", "boolean"),
+                "current_song": ("当前歌曲", "string"),
+                "position": ("播放位置(秒)", "number"),
+                "duration": ("歌曲时长(秒)", "number"),
+                "lyrics": ("当前歌词", "string"),
+            },
+            {
+                "Play": ("播放指定歌曲", {"song_name": ("歌曲名称", "string")}),
+                "TogglePlayPause": ("播放/暂停切换", {}),
+                "Stop": ("停止播放", {}),
+                "SeekPosition": ("跳转到指定位置", {"position": ("秒数", "number")}),
+                "GetLyrics": ("获取当前歌曲歌词", {}),
+            },
+        ),
+        thing(
+            "CountdownTimer",
+            "一个用于延迟执行命令的倒计时器",
+            {"active": ("是否有计时器在运行", "boolean"), "remaining": ("剩余秒数", "number")},
+            {
+                "StartCountdown": (
+                    "启动一个倒计时，结束后执行指定命令",
+                    {
+                        "command": ("要执行的IoT命令(JSON字符串)", "string"),
+                        "delay": ("延迟时间(秒)", "number"),
+                    },
+                ),
+                "CancelCountdown": ("取消指定的倒计时", {"timer_id": ("计时器ID", "number")}),
+            },
+        ),
+        thing(
+            "Thermometer",
+            "温湿度传感器",
+            {"temperature": ("当前温度", "number"), "humidity": ("当前湿度", "number")},
+            {},
+        ),
+    ]
+
+
+def _session_trace():
+    """一次完整对话中协议层收发的文本消息，依时间顺序记录
+
+    Returns:
+        tuple: (收到的消息列表, 发出的消息列表)
+    """
+    sentences = [
+        "今天北京晴，最高气温二十六度。",
+        "早晚温差比较大，出门记得带件外套。",
+        "空气质量良好，适合户外运动。",
+    ]
+    incoming = [
+        {
+            "type": "hello",
+            "transport": "websocket",
+            "session_id": SESSION_ID,
+            "audio_params": {"format": "opus", "sample_rate": 24000, "frame_duration": 60},
+        },
+        {"type": "stt", "text": "今天天气怎么样", "session_id": SESSION_ID},
+        {"type": "llm", "text": "😊", "emotion": "happy", "session_id": SESSION_ID},
+        {"type": "tts", "state": "start", "session_id": SESSION_ID},
+    ]
+    for text in sentences:
+        incoming.append(
+            {"type": "tts", "state": "sentence_start", "text": text, "session_id": SESSION_ID}
+        )
+        incoming.append(
+            {"type": "tts", "state": "sentence_end", "text": text, "session_id": SESSION_ID}
+        )
+    incoming.append({"type": "tts", "state": "stop", "session_id": SESSION_ID})
+    incoming.append(SERVER_MESSAGES["iot_commands"])
+
+    outgoing = [
+        {
+            "type": "hello",
+            "version": 1,
+            "transport": "websocket",
+            "audio_params": {
+                "format": "opus",
+                "sample_rate": 16000,
+                "channels": 1,
+                "frame_duration": 20,
+            },
+        },
+        {"session_id": SESSION_ID, "type": "iot", "descriptors": _iot_descriptors()},
+        {"session_id": SESSION_ID, "type": "iot", "states": _iot_states()},
+        {"session_id": SESSION_ID, "type": "listen", "state": "detect", "text": "小智"},
+        {"session_id": SESSION_ID, "type": "listen", "state": "start", "mode": "auto"},
+        {"session_id": SESSION_ID, "type": "listen", "state": "stop"},
+        {"session_id": SESSION_ID, "type": "iot", "states": _iot_states()[:2]},
+        {"session_id": SESSION_ID, "type": "abort", "reason": "wake_word_detected"},
+    ]
+    return incoming, outgoing
+
+
+def _trace_cases():
+    from src.utils import json_codec
+
+    incoming, outgoing = _session_trace()
+    # 服务端消息按收到时的文本形式记录
+    texts = [json.dumps(message, ensure_ascii=False) for message in incoming]
+
+    def decode_stdlib():
+        for text in texts:
+            json.loads(text)
+
+    def decode():
+        for text in texts:
+            json_codec.loads(text)
+
+    def encode_stdlib():
+        for message in outgoing:
+            json.dumps(message)
+
+    def encode():
+        for message in outgoing:
+            json_codec.dumps(message)
+
+    return [
+        BenchCase(STAGE, "trace_decode_stdlib", decode_stdlib, len(texts), "条"),
+        BenchCase(STAGE, f"trace_decode_{json_codec.BACKEND}", decode, len(texts), "条"),
+        BenchCase(STAGE, "trace_encode_stdlib", encode_stdlib, len(outgoing), "条"),
+        BenchCase(
+            STAGE, f"trace_encode_{json_codec.BACKEND}", encode, len(outgoing), "条"
+        ),
+    ]
+
+
+def _json_cases():
+    from src.constants.constants import ListeningMode
+    from src.protocols.protocol import Protocol
+    from src.utils import json_codec
+
+    class _CaptureProtocol(Protocol):
+        async def send_text(self, message):
+            return message
+
+    protocol = _CaptureProtocol()
+    protocol.session_id = SESSION_ID
+
+    result = []
+    for name, message in SERVER_MESSAGES.items():
+        text = json.dumps(message, ensure_ascii=False)
+        result.append(
+            BenchCase(
+                STAGE, f"parse_{name}", lambda t=text: json_codec.loads(t), unit="条"
+            )
+        )
+
+    states = _iot_states()
+    states_str = json.dumps(states)
+    result += [
+        BenchCase(
+            STAGE,
+            "send_start_listening",
+            lambda: run_sync(protocol.send_start_listening(ListeningMode.AUTO_STOP)),
+            unit="条",
+        ),
+        BenchCase(
+            STAGE,
+            "send_iot_states",
+            lambda: run_sync(protocol.send_iot_states(states)),
+            unit="条",
+        ),
+        BenchCase(
+            STAGE,
+            "send_iot_states_str",
+            lambda: run_sync(protocol.send_iot_states(states_str)),
+            unit="条",
+        ),
+    ]
+    return result
+
+
+def cases(args=None):
+    return skip_on_error(STAGE, "json", _json_cases) + skip_on_error(
+        STAGE, "trace", _trace_cases
+    )
+
+
+if __name__ == "__main__":
+    run_stage_cli("JSON消息处理耗时", cases)
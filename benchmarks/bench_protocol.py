@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 文件名: bench_protocol.py
+"""WebSocket/MQTT协议离线压测
+
+在进程内启动本地服务端替身(fake_server)，用客户端实际使用的WebsocketProtocol和
+MqttProtocol（MQTT控制消息 + AES-CTR加密的UDP音频）模拟多个设备并发对话，
+每种传输方式各跑一轮，统计：
+
+- 建连+hello握手和断开耗时（连续重连）
+- 上行音频吞吐（服务端实际收到的帧数）和每轮音频+listen stop的发送耗时
+- 语音结束到收到第一个TTS音频包的延迟
+- 下行音频到达间隔的抖动
+
+服务端地址直接注入协议对象，不修改配置文件。本地MQTT broker不支持TLS，
+压测时只在内存中为协议对象开启allow_insecure。
+
+用法:
+    python benchmarks/bench_protocol.py [--transports websocket mqtt] [--clients 20] [--turns 3] [--jitter-ms 20]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from fake_server import (  # noqa: E402
+    FRAME_DURATION_MS,
+    FakeXiaozhiServer,
+    NetworkProfile,
+    ServerStats,
+    TtsMode,
+)
+
+TRANSPORTS = ("websocket", "mqtt")
+
+
+def _percentiles(values):
+    if not values:
+        return "无数据"
+    values = sorted(values)
+    p50 = values[len(values) // 2]
+    p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+    return f"p50 {p50:7.2f}  p95 {p95:7.2f}  max {values[-1]:7.2f}"
+
+
+def _create_protocol(transport, server, index=0):
+    """创建连接到本地服务端的协议对象，服务端地址在内存中注入"""
+    if transport == "websocket":
+        from src.protocols.websocket_protocol import WebsocketProtocol
+
+        protocol = WebsocketProtocol()
+        protocol.WEBSOCKET_URL = server.websocket_url
+        # 每轮结束都真正断开连接，重连测量完整的握手过程
+        protocol.persistent = False
+        protocol.preconnect = False
+        return protocol
+
+    from src.protocols.mqtt_protocol import MqttProtocol
+
+    mqtt_info = dict(server.ota_response()["mqtt"], client_id=f"bench-{index}")
+    protocol = MqttProtocol(asyncio.get_running_loop(), mqtt_info=mqtt_info)
+    protocol.allow_insecure = True
+    return protocol
+
+
+async def bench_reconnect(transport, server, count):
+    """连续建连+hello+断开
+
+    Returns:
+        tuple: (每次建连耗时, 每次断开耗时)，单位毫秒
+    """
+    connect_ms = []
+    close_ms = []
+    for i in range(count):
+        protocol = _create_protocol(transport, server, i)
+        start = time.perf_counter()
+        if not await protocol.open_audio_channel():
+            raise RuntimeError(f"{transport}连接本地服务端失败")
+        connected = time.perf_counter()
+        await protocol.close_audio_channel()
+        connect_ms.append((connected - start) * 1000)
+        close_ms.append((time.perf_counter() - connected) * 1000)
+    return connect_ms, close_ms
+
+
+async def _client(protocol, args, result):
+    from src.constants.constants import ListeningMode
+
+    events = asyncio.Queue()
+    protocol.on_incoming_json = events.put_nowait
+    # MQTT的音频回调还带有扩展序号
+    protocol.on_incoming_audio = lambda data, *_: events.put_nowait(bytes(data))
+    if not await protocol.open_audio_channel():
+        result["failed_clients"] += 1
+        return
+
+    frame = bytes(120)  # 与60ms Opus帧大小相当
+    for _ in range(args.turns):
+        await protocol.send_start_listening(ListeningMode.MANUAL)
+        # 设备在开始监听后一个帧时长才采集到第一帧；MQTT的音频走UDP，
+        # 立即发送会先于listen start到达服务端而被丢弃
+        await asyncio.sleep(FRAME_DURATION_MS / 1000)
+        send_start = time.perf_counter()
+        for _ in range(args.frames):
+            await protocol.send_audio(frame)
+            result["uplink_frames"] += 1
+            if args.realtime:
+                await asyncio.sleep(FRAME_DURATION_MS / 1000)
+        # listen stop排在已发送的音频之后，等待其发出即为本轮上行完成
+        await protocol.send_stop_listening()
+        speech_end = time.perf_counter()
+        result["uplink_ms"].append((speech_end - send_start) * 1000)
+
+        last_arrival = None
+        while True:
+            message = await asyncio.wait_for(events.get(), timeout=10)
+            now = time.perf_counter()
+            if isinstance(message, bytes):
+                if last_arrival is None:
+                    result["response_ms"].append((now - speech_end) * 1000)
+                else:
+                    # 到达间隔相对帧时长的偏差
+                    interval = (now - last_arrival) * 1000
+                    result["jitter_ms"].append(abs(interval - FRAME_DURATION_MS))
+                last_arrival = now
+                result["downlink_frames"] += 1
+                continue
+            if message.get("type") == "tts" and message.get("state") == "stop":
+                break
+
+
+async def bench_conversation(transport, server, args):
+    result = {
+        "failed_clients": 0,
+        "uplink_frames": 0,
+        "downlink_frames": 0,
+        "uplink_ms": [],
+        "response_ms": [],
+        "jitter_ms": [],
+    }
+    server.stats = ServerStats()
+    protocols = [_create_protocol(transport, server, i) for i in range(args.clients)]
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(_client(protocol, args, result) for protocol in protocols))
+        result["elapsed"] = time.perf_counter() - start
+        result["server"] = server.stats.to_dict()
+    finally:
+        # 所有对话结束后再断开：MqttProtocol断开时会阻塞事件循环，
+        # 放在对话中间会拖慢其他客户端，断开耗时由重连测试单独统计
+        for protocol in protocols:
+            await protocol.close_audio_channel()
+    return result
+
+
+def _report(transport, args, reconnect, result):
+    elapsed = result["elapsed"]
+    server = result["server"]
+    connect_ms, close_ms = reconnect
+    print(f"== {transport} ==")
+    print(f"建连+hello(ms, {args.reconnects}次): {_percentiles(connect_ms)}")
+    print(f"断开(ms):              {_percentiles(close_ms)}")
+    print(
+        f"{args.clients}个客户端 x {args.turns}轮, 耗时 {elapsed:.2f}s, "
+        f"失败客户端 {result['failed_clients']}, "
+        f"上行 发送{result['uplink_frames']}帧/服务端收到{server['frames_received']}帧 "
+        f"({server['frames_received'] / elapsed:.0f} 帧/秒), "
+        f"下行 {result['downlink_frames'] / elapsed:.0f} 帧/秒"
+    )
+    print(f"每轮上行发送耗时(ms):  {_percentiles(result['uplink_ms'])}")
+    print(f"首个TTS音频包延迟(ms): {_percentiles(result['response_ms'])}")
+    print(f"下行到达抖动(ms):      {_percentiles(result['jitter_ms'])}")
+    if result["jitter_ms"]:
+        print(f"平均抖动(ms): {statistics.mean(result['jitter_ms']):.2f}")
+    print(f"服务端统计: {server}")
+
+
+async def _run(args):
+    server = FakeXiaozhiServer(
+        ota_port=args.port_base,
+        ws_port=args.port_base + 1,
+        mqtt_port=args.port_base + 2,
+        udp_port=args.port_base + 3,
+        # MQTT的音频和listen stop走不同通道，连发时最后几帧可能晚于stop到达；
+        # 用合成音作为TTS，下行统计不受上行到达顺序影响
+        tts_mode=TtsMode.TONE,
+        tts_ms=args.tts_ms,
+        stt_delay_ms=args.stt_delay_ms,
+        tts_delay_ms=args.stt_delay_ms,
+        network=NetworkProfile(args.latency_ms, args.jitter_ms, args.loss, seed=0),
+    )
+    await server.start()
+    try:
+        for transport in args.transports:
+            # 协议类在连接过程中会打印服务端配置，压测期间不输出
+            with contextlib.redirect_stdout(io.StringIO()):
+                reconnect = await bench_reconnect(transport, server, args.reconnects)
+                result = await bench_conversation(transport, server, args)
+            _report(transport, args, reconnect, result)
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket/MQTT协议离线压测")
+    parser.add_argument(
+        "--transports", nargs="+", default=list(TRANSPORTS), choices=TRANSPORTS
+    )
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--frames", type=int, default=25, help="每轮上行音频帧数")
+    parser.add_argument("--realtime", action="store_true", help="按帧时长节拍上行")
+    parser.add_argument("--reconnects", type=int, default=50)
+    parser.add_argument("--tts-ms", type=int, default=1200)
+    parser.add_argument("--stt-delay-ms", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--loss", type=float, default=0.0)
+    parser.add_argument("--port-base", type=int, default=18700)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 文件名: bench_resampler.py
+"""重采样单帧耗时基准
+
+对比旧的逐帧FFT重采样(scipy.signal.resample)与流式多相重采样器的单帧耗时。
+
+用法:
+    python benchmarks/bench_resampler.py [--frames 2000]
+
+run_all.py通过cases()只运行流式重采样用例。
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import scipy.signal
+
+# 添加项目根目录到系统路径，以便导入src中的模块
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.audio_codecs.resampler import StreamingResampler  # noqa: E402
+
+FRAME_DURATION_MS = 60
+RATE_PAIRS = [
+    (44100, 16000),
+    (48000, 16000),
+    (16000, 24000),
+    (16000, 48000),
+]
+
+
+def _make_signal(rate, frames):
+    """生成带噪声的测试信号"""
+    n = int(rate * FRAME_DURATION_MS / 1000) * frames
+    t = np.arange(n) / rate
+    rng = np.random.default_rng(0)
+    signal = 6000 * np.sin(2 * np.pi * 440 * t) + rng.normal(0, 500, n)
+    return np.clip(signal, -32768, 32767).astype(np.int16)
+
+
+def _legacy_fft(frames, output_frame_size):
+    """旧实现：逐帧FFT重采样"""
+    for frame in frames:
+        samples = frame.astype(np.float32)
+        resampled = scipy.signal.resample(samples, output_frame_size)
+        np.clip(resampled, -32768, 32767).astype(np.int16)
+
+
+def _streaming(frames, resampler):
+    for frame in frames:
+        resampler.process(frame)
+
+
+def _time_per_frame(func, frames, *args):
+    start = time.perf_counter()
+    func(frames, *args)
+    return (time.perf_counter() - start) / len(frames) * 1e6
+
+
+def cases(args=None):
+    """流式重采样的基准用例（供run_all.py使用）"""
+    from common import BenchCase, cycling
+
+    result = []
+    for input_rate, output_rate in RATE_PAIRS:
+        input_frame = int(input_rate * FRAME_DURATION_MS / 1000)
+        signal = _make_signal(input_rate, 50)
+        frames = [
+            signal[i : i + input_frame] for i in range(0, len(signal), input_frame)
+        ]
+        resampler = StreamingResampler(input_rate, output_rate)
+        next_frame = cycling(frames)
+        result.append(
+            BenchCase(
+                "resample",
+                f"streaming_{input_rate}_to_{output_rate}",
+                lambda r=resampler, n=next_frame: r.process(n()),
+            )
+        )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重采样单帧耗时基准")
+    parser.add_argument("--frames", type=int, default=2000, help="测试帧数")
+    args = parser.parse_args()
+
+    print(f"帧长 {FRAME_DURATION_MS}ms, {args.frames}帧")
+    print(f"{'输入→输出':<16}{'FFT(us/帧)':>14}{'多相(us/帧)':>14}{'加速比':>10}")
+    for input_rate, output_rate in RATE_PAIRS:
+        input_frame = int(input_rate * FRAME_DURATION_MS / 1000)
+        output_frame = int(output_rate * FRAME_DURATION_MS / 1000)
+        signal = _make_signal(input_rate, args.frames)
+        frames = [
+            signal[i : i + input_frame] for i in range(0, len(signal), input_frame)
+        ]
+
+        resampler = StreamingResampler(input_rate, output_rate)
+        # 预热：生成滤波器组和采样位置缓存
+        _streaming(frames[:10], resampler)
+
+        fft_us = _time_per_frame(_legacy_fft, frames, output_frame)
+        poly_us = _time_per_frame(_streaming, frames, resampler)
+        print(
+            f"{f'{input_rate}→{output_rate}':<16}"
+            f"{fft_us:>14.1f}{poly_us:>14.1f}{fft_us / poly_us:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 文件名: bench_wake_word.py
+"""唤醒词检测耗时
+
+- check_wake_word: WakeWordDetector._check_wake_word对识别文本做拼音匹配的耗时（legacy匹配器），
+  使用不重复的随机文本，避开最近文本去重和拼音缓存，对应最坏情况
+- check_wake_word_compiled: 同上，使用预编译的WakeWordMatcher
+- check_wake_word_{legacy,compiled}_N: 唤醒词增加到N个（每户自定义名字）时的匹配耗时
+- process_audio_data: WakeWordDetector._process_audio_data处理一帧音频（含Vosk识别）的耗时，
+  不经过语音门限，需要本地有Vosk模型
+- process_audio_data_gated_idle: 同上，但开启语音门限并输入环境噪声，对应常驻待机时的每帧开销
+- process_audio_data_grammar: 同process_audio_data，但识别器使用唤醒词语法约束
+- speech_gate_idle / speech_gate_speech: SpeechGate对噪声帧和语音帧做判决的耗时
+- pinyin_full_partial / pinyin_incremental_partial: 部分识别结果逐字变长到PARTIAL_LENGTH字时，
+  整句4次lazy_pinyin（原实现）与IncrementalPinyinConverter计算拼音变体的耗时
+
+用法:
+    python benchmarks/bench_wake_word.py [--vosk-model models/vosk-model-small-cn-0.22]
+"""
+
+import random
+
+import numpy as np
+
+from common import BenchCase, SkippedCase, cycling, run_stage_cli, skip_on_error
+
+STAGE = "wake_word"
+WAKE_WORDS = ["你好小明", "你好小智", "你好小天", "小爱同学", "贾维斯"]
+# 识别文本常见字，随机组合成不含唤醒词的句子
+CHAR_POOL = (
+    "今天天气怎么样我想听一首歌帮我打开客厅的灯现在几点了明早七点叫我起床"
+    "播放新闻关闭空调温度调高一点音量大一些讲个笑话查一下路况导航去公司"
+)
+# 生成自定义唤醒词（名字）的常用字
+NAME_POOL = "明智天爱华丽强军伟芳娜秀英敏静杰涛超磊洋勇艳峰波辉刚健平玲兰霞红宝贝乐乐豆豆"
+# 唤醒词规模测试的唤醒词数量，legacy匹配器耗时与唤醒词数成正比，只测较小的规模
+SCALE_COUNTS = (100, 500)
+LEGACY_SCALE_COUNTS = (100,)
+# 拼音转换用例中一句话的最终长度
+PARTIAL_LENGTH = 40
+
+
+class _IdleRecognizer:
+    """匹配命中时_check_wake_word会重置识别器，文本匹配用例不需要真实模型"""
+
+    def Reset(self):
+        pass
+
+
+def _make_detector(recognizer):
+    """跳过__init__中的配置和模型加载，只设置匹配所需的属性"""
+    from src.audio_processing.pinyin_converter import IncrementalPinyinConverter
+    from src.audio_processing.wake_word_detect import WakeWordDetector
+
+    detector = WakeWordDetector.__new__(WakeWordDetector)
+    detector.enabled = True
+    detector.running = False
+    detector.detection_thread = None
+    detector.audio_codec = None
+    detector._subscription = None
+    detector.on_detected_callbacks = []
+    detector.wake_words = WAKE_WORDS
+    detector.wake_word_patterns = detector._build_wake_word_patterns()
+    detector.similarity_threshold = 0.8
+    detector.max_edit_distance = 2
+    detector._recent_texts = []
+    detector._max_recent_cache = 10
+    detector._pinyin = IncrementalPinyinConverter()
+    detector.matcher = None
+    detector.recognizer_mode = "open"
+    detector._grammar_phrases = {}
+    detector.recognizer = recognizer
+    detector.speech_gate = None
+    return detector
+
+
+def _make_texts(count=2000, seed=0):
+    rng = random.Random(seed)
+    texts = set()
+    while len(texts) < count:
+        length = rng.randint(2, 12)
+        texts.add("".join(rng.choice(CHAR_POOL) for _ in range(length)))
+    return sorted(texts)
+
+
+def _make_wake_words(count, seed=0):
+    """生成count个不重复的唤醒词，前5个为默认唤醒词"""
+    rng = random.Random(seed)
+    words = list(WAKE_WORDS)
+    seen = set(words)
+    while len(words) < count:
+        name = "".join(rng.choice(NAME_POOL) for _ in range(rng.randint(2, 3)))
+        word = rng.choice(["你好", "小", ""]) + name
+        if len(word) >= 3 and word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words[:count]
+
+
+def _check_case(name, wake_words, compiled):
+    from src.audio_processing.wake_word_matcher import WakeWordMatcher
+
+    detector = _make_detector(_IdleRecognizer())
+    if wake_words is not WAKE_WORDS:
+        detector.wake_words = wake_words
+        detector.wake_word_patterns = detector._build_wake_word_patterns()
+    if compiled:
+        detector.matcher = WakeWordMatcher(detector.wake_word_patterns)
+    next_text = cycling(_make_texts())
+    return BenchCase(
+        STAGE,
+        name,
+        lambda: detector._check_wake_word(next_text()),
+        unit="条",
+    )
+
+
+def _check_cases():
+    cases = [
+        _check_case("check_wake_word", WAKE_WORDS, compiled=False),
+        _check_case("check_wake_word_compiled", WAKE_WORDS, compiled=True),
+    ]
+    for count in SCALE_COUNTS:
+        wake_words = _make_wake_words(count)
+        if count in LEGACY_SCALE_COUNTS:
+            cases.append(
+                _check_case(f"check_wake_word_legacy_{count}", wake_words, False)
+            )
+        cases.append(_check_case(f"check_wake_word_compiled_{count}", wake_words, True))
+    return cases
+
+
+def _make_partials(count=50, seed=0):
+    """模拟Vosk部分识别结果：每句话逐字变长，词之间带空格"""
+    rng = random.Random(seed)
+    partials = []
+    for _ in range(count):
+        text = ""
+        for _ in range(PARTIAL_LENGTH):
+            if text and rng.random() < 0.4:
+                text += " "
+            text += rng.choice(CHAR_POOL)
+            partials.append(text)
+    return partials
+
+
+def _full_pinyin_variants(text):
+    """原实现：每次对整句做4次lazy_pinyin"""
+    import re
+
+    from pypinyin import Style, lazy_pinyin
+
+    cleaned = re.sub(r"[^\u4e00-\u9fff\w]", "", text)
+    return {
+        "standard": "".join(lazy_pinyin(cleaned, style=Style.NORMAL)).lower(),
+        "initials": "".join(lazy_pinyin(cleaned, style=Style.FIRST_LETTER)).lower(),
+        "tone": "".join(lazy_pinyin(cleaned, style=Style.TONE)).lower(),
+        "finals": "".join(lazy_pinyin(cleaned, style=Style.FINALS)).lower(),
+    }
+
+
+def _pinyin_cases():
+    from src.audio_processing.pinyin_converter import IncrementalPinyinConverter
+
+    partials = _make_partials()
+    next_full = cycling(partials)
+    converter = IncrementalPinyinConverter()
+    next_partial = cycling(partials)
+
+    def incremental():
+        text = next_partial()
+        # 每句话的第一个字对应识别器开始新的语句
+        if len(text) == 1:
+            converter.reset()
+        converter.convert(text)
+
+    return [
+        BenchCase(
+            STAGE,
+            "pinyin_full_partial",
+            lambda: _full_pinyin_variants(next_full()),
+            unit="条",
+        ),
+        BenchCase(STAGE, "pinyin_incremental_partial", incremental, unit="条"),
+    ]
+
+
+def _gate_frames(frame_size, count=200):
+    """环境噪声帧和类语音帧（谐波叠加，幅度远高于噪声）"""
+    rng = np.random.default_rng(1)
+    idle = rng.normal(0, 40, frame_size * count).astype(np.int16)
+    t = np.arange(frame_size * count) / 16000
+    speech = 3000 * np.sin(2 * np.pi * 180 * t) + 1500 * np.sin(2 * np.pi * 540 * t)
+    speech = speech.astype(np.int16)
+    split = lambda pcm: [
+        pcm[i : i + frame_size].tobytes() for i in range(0, len(pcm), frame_size)
+    ]
+    return split(idle), split(speech)
+
+
+def _gate_cases():
+    from src.audio_processing.speech_gate import SpeechGate
+    from src.constants.constants import AudioConfig
+
+    idle_frames, speech_frames = _gate_frames(AudioConfig.INPUT_FRAME_SIZE)
+    idle_gate = SpeechGate(AudioConfig.INPUT_SAMPLE_RATE)
+    next_idle = cycling(idle_frames)
+    # 拖尾设得足够长，门一直开着
+    speech_gate = SpeechGate(AudioConfig.INPUT_SAMPLE_RATE, hangover_ms=10**9)
+    next_speech = cycling(speech_frames)
+    return [
+        BenchCase(STAGE, "speech_gate_idle", lambda: idle_gate.process(next_idle())),
+        BenchCase(
+            STAGE, "speech_gate_speech", lambda: speech_gate.process(next_speech())
+        ),
+    ]
+
+
+def _find_model_path(args):
+    if args is not None and getattr(args, "vosk_model", None):
+        return args.vosk_model
+
+    from src.utils.config_manager import ConfigManager
+
+    return _make_detector(None)._get_model_path(ConfigManager.get_instance())
+
+
+def _make_vosk_detector(model, model_path, mode, wake_words=WAKE_WORDS):
+    """使用真实Vosk模型、按指定识别器模式创建检测器"""
+    from src.constants.constants import AudioConfig
+
+    detector = _make_detector(None)
+    if wake_words is not WAKE_WORDS:
+        detector.wake_words = list(wake_words)
+        detector.wake_word_patterns = detector._build_wake_word_patterns()
+    detector.model = model
+    detector.sample_rate = AudioConfig.INPUT_SAMPLE_RATE
+    detector.recognizer_mode = mode
+    detector.recognizer = detector._create_recognizer(model_path)
+    return detector
+
+
+def _process_cases(args):
+    import os
+
+    from vosk import Model, SetLogLevel
+
+    from src.audio_processing.wake_word_detect import RecognizerMode
+    from src.constants.constants import AudioConfig
+
+    model_path = _find_model_path(args)
+    if not os.path.exists(model_path):
+        return SkippedCase(STAGE, "process_audio_data", f"未找到Vosk模型: {model_path}")
+
+    SetLogLevel(-1)
+    model = Model(model_path=model_path)
+    detector = _make_vosk_detector(model, model_path, RecognizerMode.OPEN)
+    recognizer = detector.recognizer
+    grammar = _make_vosk_detector(model, model_path, RecognizerMode.GRAMMAR)
+
+    frame_size = AudioConfig.INPUT_FRAME_SIZE
+    rng = np.random.default_rng(0)
+    pcm = rng.normal(0, 1500, frame_size * 200).astype(np.int16)
+    frames = [pcm[i : i + frame_size].tobytes() for i in range(0, len(pcm), frame_size)]
+    next_frame = cycling(frames)
+
+    from src.audio_processing.speech_gate import SpeechGate
+
+    gated = _make_detector(recognizer)
+    gated.speech_gate = SpeechGate(AudioConfig.INPUT_SAMPLE_RATE)
+    idle_frames, _ = _gate_frames(frame_size)
+    next_idle = cycling(idle_frames)
+    return [
+        BenchCase(
+            STAGE,
+            "process_audio_data",
+            lambda: detector._process_audio_data(next_frame()),
+        ),
+        BenchCase(
+            STAGE,
+            "process_audio_data_gated_idle",
+            lambda: gated._process_audio_data(next_idle()),
+        ),
+        BenchCase(
+            STAGE,
+            "process_audio_data_grammar",
+            lambda: grammar._process_audio_data(next_frame()),
+        ),
+    ]
+
+
+def add_arguments(parser):
+    parser.add_argument("--vosk-model", help="Vosk模型目录，默认使用配置中的模型")
+
+
+def cases(args=None):
+    return (
+        skip_on_error(STAGE, "check_wake_word", _check_cases)
+        + skip_on_error(STAGE, "pinyin", _pinyin_cases)
+        + skip_on_error(STAGE, "speech_gate", _gate_cases)
+        + skip_on_error(STAGE, "process_audio_data", lambda: _process_cases(args))
+    )
+
+
+if __name__ == "__main__":
+    run_stage_cli("唤醒词检测耗时", cases, add_arguments)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 文件名: bench_webrtc.py
+"""WebRTC音频处理(APM)单帧耗时
+
+测量WebRTCProcessor.process_capture_stream处理10ms麦克风帧的耗时，
+以及附带参考信号（扬声器输出）时的耗时。aec_stage_frame为AudioCodec采集路径中
+EchoCancellationStage处理一整帧(FRAME_DURATION)的耗时，包括写入播放采样率的参考信号、
+重采样和按10ms分块处理，即开启AEC后每帧增加的开销。
+
+用法:
+    python benchmarks/bench_webrtc.py [--iterations 1000]
+"""
+
+import numpy as np
+
+from common import BenchCase, SkippedCase, cycling, run_stage_cli, skip_on_error
+
+STAGE = "webrtc"
+SAMPLE_RATE = 16000
+FRAME_SIZE = SAMPLE_RATE // 100  # APM按10ms处理
+
+
+def _webrtc_cases():
+    from src.audio_processing import webrtc_processing
+
+    if webrtc_processing.apm_lib is None:
+        return SkippedCase(STAGE, "process_capture_stream", "WebRTC APM库未加载")
+
+    processor = webrtc_processing.WebRTCProcessor(
+        sample_rate=SAMPLE_RATE, channels=1, frame_size=FRAME_SIZE
+    )
+    rng = np.random.default_rng(0)
+    capture = rng.normal(0, 1000, FRAME_SIZE * 50).astype(np.int16)
+    reference = rng.normal(0, 1000, FRAME_SIZE * 50).astype(np.int16)
+    capture_frames = [
+        capture[i : i + FRAME_SIZE].tobytes()
+        for i in range(0, len(capture), FRAME_SIZE)
+    ]
+    reference_frames = [
+        reference[i : i + FRAME_SIZE].tobytes()
+        for i in range(0, len(reference), FRAME_SIZE)
+    ]
+    next_capture = cycling(capture_frames)
+    next_reference = cycling(reference_frames)
+
+    from src.audio_processing.echo_cancellation import EchoCancellationStage
+    from src.constants.constants import AudioConfig
+
+    stage = EchoCancellationStage(
+        AudioConfig.INPUT_SAMPLE_RATE,
+        AudioConfig.OUTPUT_SAMPLE_RATE,
+        AudioConfig.FRAME_DURATION,
+        max_load=float("inf"),
+    )
+    stage_frame = AudioConfig.INPUT_FRAME_SIZE
+    stage_capture = rng.normal(0, 1000, stage_frame * 20).astype(np.int16)
+    stage_frames = [
+        stage_capture[i : i + stage_frame].tobytes()
+        for i in range(0, len(stage_capture), stage_frame)
+    ]
+    next_stage_frame = cycling(stage_frames)
+    playback = rng.normal(0, 1000, AudioConfig.OUTPUT_FRAME_SIZE).astype(np.int16)
+
+    def aec_stage_frame():
+        stage.add_reference(playback)
+        return stage.process(next_stage_frame())
+
+    return [
+        BenchCase(
+            STAGE,
+            "process_capture_stream",
+            lambda: processor.process_capture_stream(next_capture()),
+        ),
+        BenchCase(
+            STAGE,
+            "process_capture_stream_with_reference",
+            lambda: processor.process_capture_stream(next_capture(), next_reference()),
+        ),
+        BenchCase(STAGE, "aec_stage_frame", aec_stage_frame),
+    ]
+
+
+def cases(args=None):
+    return skip_on_error(STAGE, "process_capture_stream", _webrtc_cases)
+
+
+if __name__ == "__main__":
+    run_stage_cli("WebRTC音频处理单帧耗时", cases)
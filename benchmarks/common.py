@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+# 文件名: common.py
+"""基准测试公共工具
+
+每个阶段模块(bench_*.py)提供cases(args)，返回BenchCase列表；依赖缺失时返回SkippedCase，
+不影响其他阶段。run_all.py汇总所有阶段并输出JSON结果，可与之前提交的结果对比。
+"""
+
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到系统路径，以便导入src中的模块
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+RESULT_VERSION = 1
+
+
+class BenchCase:
+    """一个基准测试用例
+
+    Args:
+        stage: 所属阶段，如codec、crypto
+        name: 用例名
+        func: 无参可调用对象，每次调用处理batch个单位（帧/包/消息）
+        batch: 每次调用处理的单位数
+        unit: 单位名称
+    """
+
+    def __init__(self, stage, name, func, batch=1, unit="帧"):
+        self.stage = stage
+        self.name = name
+        self.func = func
+        self.batch = batch
+        self.unit = unit
+
+
+class SkippedCase:
+    """因依赖缺失等原因无法运行的用例"""
+
+    def __init__(self, stage, name, reason):
+        self.stage = stage
+        self.name = name
+        self.reason = reason
+
+
+def cycling(items):
+    """循环返回items中的元素，用于让每次调用处理不同的输入"""
+    return itertools.cycle(items).__next__
+
+
+def run_sync(coro):
+    """驱动不含真实等待的协程，避免事件循环调度开销计入结果"""
+    try:
+        coro.send(None)
+    except StopIteration as e:
+        return e.value
+    raise RuntimeError("协程意外挂起")
+
+
+def skip_on_error(stage, name, factory):
+    """调用factory创建用例，失败时转为SkippedCase
+
+    Returns:
+        list: 用例列表
+    """
+    try:
+        cases = factory()
+        return cases if isinstance(cases, list) else [cases]
+    except Exception as e:
+        return [SkippedCase(stage, name, f"{type(e).__name__}: {e}")]
+
+
+def _percentile(sorted_values, percent):
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100))
+    return sorted_values[index]
+
+
+def run_case(case, iterations=1000, warmup=50):
+    """运行单个用例，逐次计时
+
+    Returns:
+        dict: 结果记录，耗时单位为微秒（每单位）
+    """
+    if isinstance(case, SkippedCase):
+        return {
+            "stage": case.stage,
+            "name": case.name,
+            "status": "skipped",
+            "reason": case.reason,
+        }
+
+    func = case.func
+    for _ in range(warmup):
+        func()
+
+    timer = time.perf_counter_ns
+    samples = []
+    append = samples.append
+    for _ in range(iterations):
+        start = timer()
+        func()
+        append(timer() - start)
+
+    samples.sort()
+    per_unit = 1000 * case.batch  # 纳秒 -> 每单位微秒
+    mean = sum(samples) / len(samples) / per_unit
+    return {
+        "stage": case.stage,
+        "name": case.name,
+        "status": "ok",
+        "unit": case.unit,
+        "iterations": iterations,
+        "mean_us": round(mean, 3),
+        "p50_us": round(_percentile(samples, 50) / per_unit, 3),
+        "p95_us": round(_percentile(samples, 95) / per_unit, 3),
+        "min_us": round(samples[0] / per_unit, 3),
+        "ops_per_sec": round(1e6 / mean, 1) if mean else None,
+    }
+
+
+def _git(*args):
+    try:
+        return subprocess.run(
+            ["git", *args],
+            cwd=project_root,
+            capture_output=True,
+            text=True,
+            timeout=10,
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def collect_metadata(iterations):
+    """记录运行环境，便于跨提交对比"""
+    return {
+        "version": RESULT_VERSION,
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "iterations": iterations,
+    }
+
+
+def format_result(result):
+    label = f"{result['stage']}/{result['name']}"
+    if result["status"] != "ok":
+        return f"{label:<44} 跳过: {result['reason']}"
+    return (
+        f"{label:<44} p50 {result['p50_us']:>10.2f}us  "
+        f"p95 {result['p95_us']:>10.2f}us  "
+        f"{result['ops_per_sec']:>12.0f} {result['unit']}/秒"
+    )
+
+
+def run_cases(cases, iterations=1000, warmup=50, verbose=True):
+    results = []
+    for case in cases:
+        result = run_case(case, iterations, warmup)
+        if verbose:
+            print(format_result(result), flush=True)
+        results.append(result)
+    return results
+
+
+def save_results(results, path, iterations):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"meta": collect_metadata(iterations), "results": results}
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    return data
+
+
+def load_results(path):
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def compare_results(baseline, results, threshold=0.1):
+    """与基线结果比较p50耗时
+
+    Args:
+        baseline: load_results返回的基线数据
+        results: 本次结果列表
+        threshold: 视为退化的相对变慢比例
+
+    Returns:
+        list: 退化的用例描述
+    """
+    previous = {
+        (r["stage"], r["name"]): r
+        for r in baseline.get("results", [])
+        if r.get("status") == "ok"
+    }
+    regressions = []
+    print(f"\n与基线 {baseline.get('meta', {}).get('commit', '?')} 对比(p50):")
+    for result in results:
+        key = (result["stage"], result["name"])
+        if result["status"] != "ok" or key not in previous:
+            continue
+        before = previous[key]["p50_us"]
+        after = result["p50_us"]
+        if not before:
+            continue
+        change = (after - before) / before
+        flag = ""
+        if change > threshold:
+            flag = "  <- 退化"
+            regressions.append(f"{key[0]}/{key[1]}: {before:.2f}us -> {after:.2f}us")
+        print(
+            f"  {key[0] + '/' + key[1]:<44} {before:>10.2f} -> {after:>10.2f}us "
+            f"({change:+.1%}){flag}"
+        )
+    return regressions
+
+
+def add_common_arguments(parser):
+    parser.add_argument("--iterations", type=int, default=1000, help="每个用例的计时次数")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--output", help="结果JSON文件路径")
+    return parser
+
+
+def run_stage_cli(description, cases_factory, add_arguments=None):
+    """单个阶段模块的命令行入口"""
+    import argparse
+
+    parser = add_common_arguments(argparse.ArgumentParser(description=description))
+    if add_arguments:
+        add_arguments(parser)
+    args = parser.parse_args()
+    results = run_cases(cases_factory(args), args.iterations, args.warmup)
+    if args.output:
+        save_results(results, args.output, args.iterations)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 文件名: eval_wake_word.py
+"""唤醒词识别器模式评估
+
+在录音语料上对比开放词表(open)和语法约束(grammar)两种识别器模式的解码开销和检测准确率。
+
+语料目录结构:
+    <corpus>/<唤醒词>/*.wav    应当命中该唤醒词的正样本
+    <corpus>/negative/*.wav    不应唤醒的负样本
+
+WAV文件为16位单声道，采样率不是16kHz时先重采样。每个文件从干净的识别器状态开始，
+按采集帧长逐帧送入WakeWordDetector._process_audio_data，文件结束时取出最终结果。
+唤醒词默认取语料中的正样本目录名，也可以用--wake-words指定。
+
+用法:
+    python benchmarks/eval_wake_word.py --corpus recordings/wake_word
+    python benchmarks/eval_wake_word.py --corpus recordings/wake_word --output eval.json
+"""
+
+import argparse
+import json
+import os
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from bench_wake_word import _find_model_path, _make_vosk_detector
+from common import _percentile, collect_metadata
+
+NEGATIVE_LABEL = "negative"
+
+
+def load_corpus(corpus_dir):
+    """读取语料
+
+    Returns:
+        list: (标签, 文件路径)，负样本的标签为None
+    """
+    samples = []
+    for label_dir in sorted(Path(corpus_dir).iterdir()):
+        if not label_dir.is_dir():
+            continue
+        label = None if label_dir.name == NEGATIVE_LABEL else label_dir.name
+        for path in sorted(label_dir.glob("*.wav")):
+            samples.append((label, path))
+    return samples
+
+
+def read_pcm(path, sample_rate):
+    """读取WAV为目标采样率的int16单声道PCM"""
+    with wave.open(str(path), "rb") as f:
+        if f.getsampwidth() != 2 or f.getnchannels() != 1:
+            raise ValueError(f"{path} 不是16位单声道WAV")
+        rate = f.getframerate()
+        pcm = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+    if rate != sample_rate:
+        from src.audio_codecs.resampler import StreamingResampler
+
+        pcm = StreamingResampler(rate, sample_rate).process(pcm).copy()
+    return pcm
+
+
+def evaluate_mode(detector, samples, sample_rate, frame_size):
+    """在语料上运行一种识别器模式
+
+    Returns:
+        dict: 解码耗时和检测结果统计
+    """
+    detections = []
+    detector.on_detected_callbacks = [lambda word, text: detections.append(word)]
+
+    frame_ns = []
+    audio_seconds = 0.0
+    counts = {"correct": 0, "wrong_word": 0, "missed": 0, "false_accept": 0}
+    timer = time.perf_counter_ns
+    for label, path in samples:
+        pcm = read_pcm(path, sample_rate)
+        audio_seconds += len(pcm) / sample_rate
+
+        detector.recognizer.Reset()
+        detector._recent_texts.clear()
+        detections.clear()
+        for offset in range(0, len(pcm) - frame_size + 1, frame_size):
+            frame = pcm[offset : offset + frame_size].tobytes()
+            start = timer()
+            detector._process_audio_data(frame)
+            frame_ns.append(timer() - start)
+        detector._finish_segment()
+
+        detected = detections[0] if detections else None
+        if label is None:
+            if detected is not None:
+                counts["false_accept"] += 1
+        elif detected == label:
+            counts["correct"] += 1
+        elif detected is None:
+            counts["missed"] += 1
+        else:
+            counts["wrong_word"] += 1
+
+    positives = sum(1 for label, _ in samples if label is not None)
+    negatives = len(samples) - positives
+    frame_ns.sort()
+    total_seconds = sum(frame_ns) / 1e9
+    return {
+        "files": len(samples),
+        "positives": positives,
+        "negatives": negatives,
+        **counts,
+        "recall": round(counts["correct"] / positives, 3) if positives else None,
+        "false_accept_rate": (
+            round(counts["false_accept"] / negatives, 3) if negatives else None
+        ),
+        "accuracy": round(
+            (counts["correct"] + negatives - counts["false_accept"]) / len(samples), 3
+        ),
+        "frames": len(frame_ns),
+        "frame_mean_us": round(total_seconds * 1e6 / max(1, len(frame_ns)), 3),
+        "frame_p50_us": round(_percentile(frame_ns, 50) / 1000, 3),
+        "frame_p95_us": round(_percentile(frame_ns, 95) / 1000, 3),
+        "real_time_factor": round(total_seconds / audio_seconds, 4) if audio_seconds else None,
+    }
+
+
+def format_report(mode, result):
+    return (
+        f"{mode:<8} 召回 {result['recall']}  误唤醒 {result['false_accept']}/{result['negatives']}  "
+        f"错词 {result['wrong_word']}  准确率 {result['accuracy']:.3f}  "
+        f"每帧 p50 {result['frame_p50_us']:.1f}us p95 {result['frame_p95_us']:.1f}us  "
+        f"实时率 {result['real_time_factor']:.4f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="唤醒词识别器模式评估")
+    parser.add_argument("--corpus", required=True, help="录音语料目录")
+    parser.add_argument("--vosk-model", help="Vosk模型目录，默认使用配置中的模型")
+    parser.add_argument("--wake-words", nargs="+", help="唤醒词列表，默认取正样本目录名")
+    parser.add_argument(
+        "--modes", nargs="+", default=["open", "grammar"], choices=["open", "grammar"]
+    )
+    parser.add_argument("--output", help="结果JSON文件路径")
+    args = parser.parse_args()
+
+    model_path = _find_model_path(args)
+    if not os.path.exists(model_path):
+        print(f"跳过: 未找到Vosk模型: {model_path}")
+        return
+    if not Path(args.corpus).is_dir():
+        print(f"跳过: 语料目录不存在: {args.corpus}")
+        return
+    samples = load_corpus(args.corpus)
+    if not samples:
+        print(f"跳过: 语料目录中没有WAV文件: {args.corpus}")
+        return
+
+    from vosk import Model, SetLogLevel
+
+    from src.constants.constants import AudioConfig
+
+    wake_words = args.wake_words or sorted(
+        {label for label, _ in samples if label is not None}
+    )
+    print(f"语料: {len(samples)}个文件, 唤醒词: {wake_words}")
+
+    SetLogLevel(-1)
+    model = Model(model_path=model_path)
+    results = {}
+    for mode in args.modes:
+        detector = _make_vosk_detector(model, model_path, mode, wake_words)
+        results[mode] = evaluate_mode(
+            detector,
+            samples,
+            AudioConfig.INPUT_SAMPLE_RATE,
+            AudioConfig.INPUT_FRAME_SIZE,
+        )
+        print(format_report(mode, results[mode]), flush=True)
+
+    if args.output:
+        path = Path(args.output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "meta": {**collect_metadata(None), "corpus": str(args.corpus)},
+            "wake_words": wake_words,
+            "results": results,
+        }
+        path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n结果已写入: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
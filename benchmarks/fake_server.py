@@ -0,0 +1,752 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 文件名: fake_server.py
+"""本地小智服务端替身
+
+在本机模拟小智后端，用于协议压测和延迟测试：
+
+- OTA接口(HTTP)：返回指向本服务的WebSocket和MQTT配置
+- WebSocket：hello/listen/abort/iot/tts/stt消息和二进制Opus音频
+- MQTT+UDP：内置的最小MQTT broker(3.1.1，QoS 0/1/2)和AES-CTR加密的UDP音频通道
+
+收到一段语音后按配置的延迟回复stt和tts消息，TTS音频可以回放客户端上传的音频(echo)
+或合成正弦音(tone)，下行音频可以模拟固定延迟、抖动和丢包。
+
+用法:
+    python benchmarks/fake_server.py --latency-ms 40 --jitter-ms 20 --loss 0.02
+
+然后把客户端配置中的SYSTEM_OPTIONS.NETWORK.OTA_VERSION_URL改为输出中的OTA地址。
+MQTT broker不支持TLS，使用MQTT时还需在本地配置中开启SYSTEM_OPTIONS.NETWORK.MQTT_ALLOW_INSECURE。
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import struct
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+# 添加项目根目录到系统路径，以便导入src中的模块
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+SAMPLE_RATE = 24000
+FRAME_DURATION_MS = 60
+
+
+class TtsMode:
+    """TTS音频来源"""
+
+    ECHO = "echo"  # 回放客户端上传的音频
+    TONE = "tone"  # 合成正弦音
+
+
+class NetworkProfile:
+    """下行网络损伤模拟：固定延迟 + 均匀分布抖动 + 随机丢包"""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, loss=0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.loss = loss
+        self._random = random.Random(seed)
+
+    def should_drop(self):
+        return self.loss > 0 and self._random.random() < self.loss
+
+    def delay(self, with_jitter=True):
+        """本次发送的延迟(秒)"""
+        jitter = self._random.uniform(0, self.jitter_ms) if with_jitter else 0
+        return (self.latency_ms + jitter) / 1000
+
+
+class ServerStats:
+    """服务端统计"""
+
+    def __init__(self):
+        self.sessions = 0
+        self.active_sessions = 0
+        self.frames_received = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.utterances = 0
+        self.aborts = 0
+        self.json_received = 0
+        # 语音结束到发出第一个TTS音频包的耗时(毫秒)
+        self.response_latency_ms = []
+
+    def to_dict(self):
+        latencies = sorted(self.response_latency_ms)
+        return {
+            "sessions": self.sessions,
+            "active_sessions": self.active_sessions,
+            "frames_received": self.frames_received,
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "utterances": self.utterances,
+            "aborts": self.aborts,
+            "json_received": self.json_received,
+            "response_latency_p50_ms": (
+                round(latencies[len(latencies) // 2], 2) if latencies else None
+            ),
+        }
+
+
+class ToneSynthesizer:
+    """用Opus编码的正弦音作为合成TTS"""
+
+    def __init__(self, frequency=440.0):
+        from src.utils.opus_loader import setup_opus
+
+        setup_opus()
+        import numpy as np
+        import opuslib
+
+        self._encoder = opuslib.Encoder(SAMPLE_RATE, 1, opuslib.APPLICATION_AUDIO)
+        frame_size = SAMPLE_RATE * FRAME_DURATION_MS // 1000
+        t = np.arange(frame_size * 10) / SAMPLE_RATE
+        tone = (8000 * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+        # 预先编码一个周期内的帧，播放时循环使用
+        self._frames = [
+            self._encoder.encode(
+                tone[i : i + frame_size].tobytes(), frame_size
+            )
+            for i in range(0, len(tone), frame_size)
+        ]
+
+    def frames(self, count):
+        return [self._frames[i % len(self._frames)] for i in range(count)]
+
+
+class FakeSession:
+    """一个客户端会话的对话逻辑，与传输方式无关
+
+    transport需要实现send_json(dict)和send_audio(bytes, sequence)，两者都是普通函数，
+    网络损伤由会话统一施加。音频序号在丢包之前分配，客户端可据此统计丢包和乱序。
+    """
+
+    def __init__(self, server, transport, name):
+        self.server = server
+        self.transport = transport
+        self.name = name
+        self.session_id = str(uuid.uuid4())
+        self.loop = asyncio.get_running_loop()
+
+        self.listening = False
+        self.listen_mode = "auto"
+        self._utterance = []
+        self._utterance_started = None
+        self._response_task = None
+        self._audio_sequence = 0
+
+        server.stats.sessions += 1
+        server.stats.active_sessions += 1
+
+    def close(self):
+        if self._response_task:
+            self._response_task.cancel()
+        self.server.stats.active_sessions -= 1
+
+    # ---- 下行 ----
+
+    def send_json(self, message):
+        """按固定延迟发送JSON（不加抖动以保持消息顺序）"""
+        message.setdefault("session_id", self.session_id)
+        delay = self.server.network.delay(with_jitter=False)
+        if delay > 0:
+            self.loop.call_later(delay, self.transport.send_json, message)
+        else:
+            self.transport.send_json(message)
+
+    def send_audio(self, frame):
+        """按延迟+抖动发送音频，可能丢包或乱序"""
+        self._audio_sequence = (self._audio_sequence + 1) & 0xFFFFFFFF
+        sequence = self._audio_sequence
+        if self.server.network.should_drop():
+            self.server.stats.frames_dropped += 1
+            return
+        self.server.stats.frames_sent += 1
+        delay = self.server.network.delay()
+        if delay > 0:
+            self.loop.call_later(delay, self.transport.send_audio, frame, sequence)
+        else:
+            self.transport.send_audio(frame, sequence)
+
+    # ---- 上行 ----
+
+    def on_json(self, message):
+        self.server.stats.json_received += 1
+        msg_type = message.get("type")
+        if msg_type == "listen":
+            state = message.get("state")
+            if state == "start":
+                self._start_listening(message.get("mode", "auto"))
+            elif state == "stop":
+                if self.listening:
+                    self._finish_utterance()
+            elif state == "detect":
+                print(f"[{self.name}] 唤醒词: {message.get('text')}")
+        elif msg_type == "abort":
+            self.server.stats.aborts += 1
+            if self._response_task and not self._response_task.done():
+                self._response_task.cancel()
+                self.send_json({"type": "tts", "state": "stop"})
+        elif msg_type == "iot":
+            pass
+        elif msg_type == "goodbye":
+            self.listening = False
+        else:
+            print(f"[{self.name}] 未知消息: {message}")
+
+    def on_audio(self, frame):
+        self.server.stats.frames_received += 1
+        if not self.listening:
+            return
+        self._utterance.append(bytes(frame))
+        # 非手动模式下由服务端判断说话结束
+        duration = len(self._utterance) * FRAME_DURATION_MS
+        if self.listen_mode != "manual" and duration >= self.server.utterance_ms:
+            self._finish_utterance()
+
+    def _start_listening(self, mode):
+        self.listening = True
+        self.listen_mode = mode
+        self._utterance = []
+        self._utterance_started = time.perf_counter()
+
+    def _finish_utterance(self):
+        self.listening = False
+        self.server.stats.utterances += 1
+        frames = self._utterance
+        self._utterance = []
+        if self._response_task and not self._response_task.done():
+            self._response_task.cancel()
+        self._response_task = self.loop.create_task(self._respond(frames))
+
+    async def _respond(self, frames):
+        """模拟识别+合成：stt → tts start → 句子 → 音频 → tts stop"""
+        server = self.server
+        speech_end = time.perf_counter()
+        try:
+            await asyncio.sleep(server.stt_delay_ms / 1000)
+            self.send_json({"type": "stt", "text": server.stt_text})
+            self.send_json({"type": "llm", "text": "😊", "emotion": "happy"})
+
+            await asyncio.sleep(server.tts_delay_ms / 1000)
+            self.send_json({"type": "tts", "state": "start"})
+            self.send_json(
+                {"type": "tts", "state": "sentence_start", "text": server.tts_text}
+            )
+
+            tts_frames = server.tts_frames(frames)
+            frame_duration = FRAME_DURATION_MS / 1000
+            start = self.loop.time()
+            for i, frame in enumerate(tts_frames):
+                # 按帧时长节拍推送，和真实服务端流式合成一致
+                delay = start + i * frame_duration - self.loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if i == 0:
+                    server.stats.response_latency_ms.append(
+                        (time.perf_counter() - speech_end) * 1000
+                    )
+                self.send_audio(frame)
+
+            # 等待抖动中的最后几个包到达后再结束
+            await asyncio.sleep((server.network.jitter_ms + FRAME_DURATION_MS) / 1000)
+            self.send_json(
+                {"type": "tts", "state": "sentence_end", "text": server.tts_text}
+            )
+            self.send_json({"type": "tts", "state": "stop"})
+        except asyncio.CancelledError:
+            pass
+
+
+class WebsocketTransport:
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.loop = asyncio.get_running_loop()
+
+    def _send(self, data):
+        self.loop.create_task(self._safe_send(data))
+
+    async def _safe_send(self, data):
+        try:
+            await self.websocket.send(data)
+        except Exception:
+            pass
+
+    def send_json(self, message):
+        self._send(json.dumps(message, ensure_ascii=False))
+
+    def send_audio(self, frame, sequence):
+        self._send(frame)
+
+
+class UdpAudioChannel:
+    """MQTT会话的AES-CTR加密UDP音频通道（服务端一侧）"""
+
+    def __init__(self, server, session_key):
+        self.server = server
+        self.key = os.urandom(16)
+        # nonce布局: 前缀(2) + 长度(2) + 会话标识(8) + 序号(4)
+        self.nonce = bytes([0x01, 0, 0, 0]) + session_key + bytes(4)
+        self.client_addr = None
+
+    def hello_info(self):
+        return {
+            "server": self.server.host,
+            "port": self.server.udp_port,
+            "key": self.key.hex(),
+            "nonce": self.nonce.hex(),
+        }
+
+    def decrypt(self, packet):
+        nonce, payload = packet[:16], packet[16:]
+        decryptor = Cipher(algorithms.AES(self.key), modes.CTR(nonce)).decryptor()
+        return decryptor.update(payload) + decryptor.finalize()
+
+    def send_audio(self, frame, sequence):
+        if self.client_addr is None or self.server.udp_transport is None:
+            return
+        nonce = bytearray(self.nonce)
+        struct.pack_into(">H", nonce, 2, len(frame))
+        struct.pack_into(">I", nonce, 12, sequence)
+        encryptor = Cipher(algorithms.AES(self.key), modes.CTR(bytes(nonce))).encryptor()
+        packet = bytes(nonce) + encryptor.update(frame) + encryptor.finalize()
+        self.server.udp_transport.sendto(packet, self.client_addr)
+
+
+class MqttConnection(asyncio.Protocol):
+    """最小MQTT 3.1.1 broker连接
+
+    客户端发布到任意主题的消息都交给会话处理，服务端消息发布到客户端的subscribe_topic，
+    与小智网关一致，客户端无需显式订阅。
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self._buffer = bytearray()
+        self.client_id = ""
+        self.session = None
+        self.udp = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def connection_lost(self, exc):
+        self._close_session()
+
+    def data_received(self, data):
+        self._buffer.extend(data)
+        while True:
+            packet = self._next_packet()
+            if packet is None:
+                return
+            header, body = packet
+            try:
+                self._handle_packet(header, body)
+            except Exception as e:
+                print(f"[MQTT] 处理报文失败: {e}")
+                self.transport.close()
+                return
+
+    def _next_packet(self):
+        """从缓冲区取出一个完整报文"""
+        buf = self._buffer
+        if len(buf) < 2:
+            return None
+        length, multiplier, pos = 0, 1, 1
+        while True:
+            if pos >= len(buf):
+                return None
+            byte = buf[pos]
+            length += (byte & 0x7F) * multiplier
+            multiplier *= 128
+            pos += 1
+            if not byte & 0x80:
+                break
+        if len(buf) < pos + length:
+            return None
+        header = buf[0]
+        body = bytes(buf[pos : pos + length])
+        del buf[: pos + length]
+        return header, body
+
+    @staticmethod
+    def _encode_packet(header, body):
+        length = len(body)
+        encoded = bytearray([header])
+        while True:
+            byte = length % 128
+            length //= 128
+            encoded.append(byte | 0x80 if length else byte)
+            if not length:
+                break
+        return bytes(encoded) + body
+
+    @staticmethod
+    def _read_string(body, pos):
+        (length,) = struct.unpack_from(">H", body, pos)
+        pos += 2
+        return body[pos : pos + length].decode("utf-8"), pos + length
+
+    def _handle_packet(self, header, body):
+        packet_type = header >> 4
+        if packet_type == 1:  # CONNECT
+            pos = 0
+            _, pos = self._read_string(body, pos)  # 协议名
+            pos += 4  # 协议级别(1) + 连接标志(1) + 保活时间(2)
+            self.client_id, pos = self._read_string(body, pos)
+            self.transport.write(self._encode_packet(0x20, b"\x00\x00"))
+        elif packet_type == 3:  # PUBLISH
+            qos = (header >> 1) & 0x03
+            topic, pos = self._read_string(body, 0)
+            packet_id = None
+            if qos:
+                (packet_id,) = struct.unpack_from(">H", body, pos)
+                pos += 2
+            payload = body[pos:]
+            if qos == 1:
+                self.transport.write(
+                    self._encode_packet(0x40, struct.pack(">H", packet_id))
+                )
+            elif qos == 2:
+                self.transport.write(
+                    self._encode_packet(0x50, struct.pack(">H", packet_id))
+                )
+            self._on_publish(topic, payload)
+        elif packet_type == 6:  # PUBREL
+            self.transport.write(self._encode_packet(0x70, body[:2]))
+        elif packet_type == 8:  # SUBSCRIBE
+            packet_id = body[:2]
+            pos, granted = 2, bytearray()
+            while pos < len(body):
+                _, pos = self._read_string(body, pos)
+                granted.append(min(body[pos], 1))
+                pos += 1
+            self.transport.write(self._encode_packet(0x90, packet_id + bytes(granted)))
+        elif packet_type == 10:  # UNSUBSCRIBE
+            self.transport.write(self._encode_packet(0xB0, body[:2]))
+        elif packet_type == 12:  # PINGREQ
+            self.transport.write(self._encode_packet(0xD0, b""))
+        elif packet_type == 14:  # DISCONNECT
+            self.transport.close()
+
+    def publish(self, message):
+        """向客户端发布一条JSON消息(QoS 0)"""
+        if self.transport is None or self.transport.is_closing():
+            return
+        topic = self.server.mqtt_subscribe_topic.encode("utf-8")
+        payload = json.dumps(message, ensure_ascii=False).encode("utf-8")
+        body = struct.pack(">H", len(topic)) + topic + payload
+        self.transport.write(self._encode_packet(0x30, body))
+
+    def _on_publish(self, topic, payload):
+        try:
+            message = json.loads(payload.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            print(f"[MQTT] 无效的消息: {payload[:64]!r}")
+            return
+
+        msg_type = message.get("type")
+        if msg_type == "hello":
+            self._close_session()
+            session_key = os.urandom(8)
+            self.udp = UdpAudioChannel(self.server, session_key)
+            self.session = FakeSession(self.server, self, f"mqtt:{self.client_id}")
+            self.server.udp_sessions[session_key] = self
+            self.publish(
+                {
+                    "type": "hello",
+                    "version": message.get("version", 3),
+                    "transport": "udp",
+                    "session_id": self.session.session_id,
+                    "audio_params": {
+                        "format": "opus",
+                        "sample_rate": SAMPLE_RATE,
+                        "channels": 1,
+                        "frame_duration": FRAME_DURATION_MS,
+                    },
+                    "udp": self.udp.hello_info(),
+                }
+            )
+        elif msg_type == "goodbye":
+            self._close_session()
+        elif self.session:
+            self.session.on_json(message)
+
+    def _close_session(self):
+        if self.session:
+            self.session.close()
+            self.session = None
+        if self.udp:
+            self.server.udp_sessions.pop(self.udp.nonce[4:12], None)
+            self.udp = None
+
+    # FakeSession的transport接口
+    def send_json(self, message):
+        self.publish(message)
+
+    def send_audio(self, frame, sequence):
+        if self.udp:
+            self.udp.send_audio(frame, sequence)
+
+
+class UdpServerProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server):
+        self.server = server
+
+    def connection_made(self, transport):
+        self.server.udp_transport = transport
+
+    def datagram_received(self, data, addr):
+        if len(data) < 16:
+            return
+        connection = self.server.udp_sessions.get(bytes(data[4:12]))
+        if connection is None or connection.udp is None or connection.session is None:
+            return
+        connection.udp.client_addr = addr
+        connection.session.on_audio(connection.udp.decrypt(data))
+
+
+class FakeXiaozhiServer:
+    """本地小智服务端替身"""
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        ota_port=8002,
+        ws_port=8765,
+        mqtt_port=1883,
+        udp_port=8884,
+        tts_mode=TtsMode.ECHO,
+        tts_ms=2000,
+        utterance_ms=1500,
+        stt_delay_ms=100,
+        tts_delay_ms=100,
+        network=None,
+        stt_text="你好",
+        tts_text="你好，我是本地测试服务。",
+    ):
+        self.host = host
+        self.ota_port = ota_port
+        self.ws_port = ws_port
+        self.mqtt_port = mqtt_port
+        self.udp_port = udp_port
+        self.tts_mode = tts_mode
+        self.tts_ms = tts_ms
+        self.utterance_ms = utterance_ms
+        self.stt_delay_ms = stt_delay_ms
+        self.tts_delay_ms = tts_delay_ms
+        self.network = network or NetworkProfile()
+        self.stt_text = stt_text
+        self.tts_text = tts_text
+
+        self.mqtt_publish_topic = "device-server"
+        self.mqtt_subscribe_topic = "devices/p2p/fake"
+
+        self.stats = ServerStats()
+        self.udp_sessions = {}
+        self.udp_transport = None
+        self._servers = []
+        self._synthesizer = None
+
+        if tts_mode == TtsMode.TONE:
+            try:
+                self._synthesizer = ToneSynthesizer()
+            except Exception as e:
+                print(f"无法初始化Opus编码器，改用echo模式: {e}")
+                self.tts_mode = TtsMode.ECHO
+
+    @property
+    def ota_url(self):
+        return f"http://{self.host}:{self.ota_port}/xiaozhi/ota/"
+
+    @property
+    def websocket_url(self):
+        return f"ws://{self.host}:{self.ws_port}/xiaozhi/v1/"
+
+    def tts_frames(self, utterance_frames):
+        """生成本轮回复的TTS音频帧"""
+        count = max(1, math.ceil(self.tts_ms / FRAME_DURATION_MS))
+        if self.tts_mode == TtsMode.TONE and self._synthesizer:
+            return self._synthesizer.frames(count)
+        if not utterance_frames:
+            return []
+        # echo：循环回放客户端上传的音频
+        return [utterance_frames[i % len(utterance_frames)] for i in range(count)]
+
+    def ota_response(self):
+        return {
+            "firmware": {"version": "1.6.0", "url": ""},
+            "mqtt": {
+                "endpoint": self.host,
+                "port": self.mqtt_port,
+                "tls": False,
+                "client_id": "fake-client",
+                "username": "fake",
+                "password": "fake",
+                "publish_topic": self.mqtt_publish_topic,
+                "subscribe_topic": self.mqtt_subscribe_topic,
+            },
+            "websocket": {"url": self.websocket_url, "token": "test-token"},
+        }
+
+    async def _handle_ota(self, reader, writer):
+        """极简HTTP处理，所有请求都返回OTA配置"""
+        try:
+            headers = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in headers.decode("latin-1").split("\r\n"):
+                if line.lower().startswith("content-length:"):
+                    length = int(line.split(":", 1)[1])
+            if length:
+                await reader.readexactly(length)
+            body = json.dumps(self.ota_response(), ensure_ascii=False).encode("utf-8")
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except Exception as e:
+            print(f"[OTA] 请求处理失败: {e}")
+        finally:
+            writer.close()
+
+    async def _handle_websocket(self, websocket, path=None):
+        transport = WebsocketTransport(websocket)
+        session = None
+        try:
+            async for message in websocket:
+                if isinstance(message, bytes):
+                    if session:
+                        session.on_audio(message)
+                    continue
+                data = json.loads(message)
+                if data.get("type") == "hello":
+                    session = FakeSession(self, transport, "websocket")
+                    transport.send_json(
+                        {
+                            "type": "hello",
+                            "transport": "websocket",
+                            "session_id": session.session_id,
+                            "audio_params": {
+                                "format": "opus",
+                                "sample_rate": SAMPLE_RATE,
+                                "channels": 1,
+                                "frame_duration": FRAME_DURATION_MS,
+                            },
+                        }
+                    )
+                elif session:
+                    session.on_json(data)
+        except Exception as e:
+            print(f"[WebSocket] 连接结束: {e}")
+        finally:
+            if session:
+                session.close()
+
+    async def start(self):
+        import websockets
+
+        loop = asyncio.get_running_loop()
+        self._servers.append(
+            await asyncio.start_server(self._handle_ota, self.host, self.ota_port)
+        )
+        self._servers.append(
+            await websockets.serve(
+                self._handle_websocket, self.host, self.ws_port, max_size=None
+            )
+        )
+        self._servers.append(
+            await loop.create_server(
+                lambda: MqttConnection(self), self.host, self.mqtt_port
+            )
+        )
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: UdpServerProtocol(self), local_addr=(self.host, self.udp_port)
+        )
+        self._udp_endpoint = transport
+
+    async def stop(self):
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+        if self.udp_transport:
+            self.udp_transport.close()
+            self.udp_transport = None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="本地小智服务端替身")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--ota-port", type=int, default=8002)
+    parser.add_argument("--ws-port", type=int, default=8765)
+    parser.add_argument("--mqtt-port", type=int, default=1883)
+    parser.add_argument("--udp-port", type=int, default=8884)
+    parser.add_argument(
+        "--tts-mode", choices=[TtsMode.ECHO, TtsMode.TONE], default=TtsMode.ECHO
+    )
+    parser.add_argument("--tts-ms", type=int, default=2000, help="每轮TTS音频时长")
+    parser.add_argument(
+        "--utterance-ms", type=int, default=1500, help="自动模式下判定说话结束的时长"
+    )
+    parser.add_argument("--stt-delay-ms", type=int, default=100)
+    parser.add_argument("--tts-delay-ms", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=0, help="下行固定延迟")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="下行音频抖动")
+    parser.add_argument("--loss", type=float, default=0.0, help="下行音频丢包率")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+async def _run(args):
+    server = FakeXiaozhiServer(
+        host=args.host,
+        ota_port=args.ota_port,
+        ws_port=args.ws_port,
+        mqtt_port=args.mqtt_port,
+        udp_port=args.udp_port,
+        tts_mode=args.tts_mode,
+        tts_ms=args.tts_ms,
+        utterance_ms=args.utterance_ms,
+        stt_delay_ms=args.stt_delay_ms,
+        tts_delay_ms=args.tts_delay_ms,
+        network=NetworkProfile(args.latency_ms, args.jitter_ms, args.loss, args.seed),
+    )
+    await server.start()
+    print(f"OTA地址:       {server.ota_url}")
+    print(f"WebSocket地址: {server.websocket_url}")
+    print(
+        f"MQTT broker:   {args.host}:{args.mqtt_port} (UDP {args.udp_port}，"
+        "非TLS，需开启MQTT_ALLOW_INSECURE)"
+    )
+    print("按Ctrl+C退出")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(json.dumps(server.stats.to_dict(), ensure_ascii=False))
+    finally:
+        await server.stop()
+
+
+def main():
+    args = parse_args()
+    try:
+        asyncio.run(_run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
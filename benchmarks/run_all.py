@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 文件名: run_all.py
+"""音频热路径基准测试套件
+
+依次运行各阶段的基准用例，输出JSON结果；指定--compare时与基线结果对比，
+p50耗时变慢超过阈值的用例视为退化，进程以非零状态码退出。
+
+用法:
+    python benchmarks/run_all.py --output benchmarks/results/$(git rev-parse --short HEAD).json
+    python benchmarks/run_all.py --compare benchmarks/results/base.json --threshold 0.15
+    python benchmarks/run_all.py --stages codec crypto
+"""
+
+import argparse
+import importlib
+import sys
+
+from common import add_common_arguments, compare_results, load_results, run_cases, save_results
+
+# 阶段名 -> 模块名
+STAGES = {
+    "codec": "bench_codec",
+    "resample": "bench_resampler",
+    "webrtc": "bench_webrtc",
+    "wake_word": "bench_wake_word",
+    "crypto": "bench_crypto",
+    "json": "bench_json",
+}
+
+
+def main():
+    parser = add_common_arguments(argparse.ArgumentParser(description="音频热路径基准测试套件"))
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), help="只运行指定阶段")
+    parser.add_argument("--compare", help="基线结果JSON文件")
+    parser.add_argument("--threshold", type=float, default=0.1, help="退化判定阈值（相对变慢比例）")
+
+    modules = {stage: importlib.import_module(name) for stage, name in STAGES.items()}
+    for module in modules.values():
+        if hasattr(module, "add_arguments"):
+            module.add_arguments(parser)
+    args = parser.parse_args()
+
+    results = []
+    for stage in args.stages or list(STAGES):
+        results += run_cases(modules[stage].cases(args), args.iterations, args.warmup)
+
+    if args.output:
+        save_results(results, args.output, args.iterations)
+        print(f"\n结果已写入: {args.output}")
+
+    if args.compare:
+        regressions = compare_results(load_results(args.compare), results, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)}个用例性能退化:")
+            for item in regressions:
+                print(f"  {item}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
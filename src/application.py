@@ -1,5 +1,4 @@
 import asyncio
-import json
 import logging
 import platform
 import sys
@@ -8,11 +7,13 @@ import time
 import traceback
 from pathlib import Path
 
-from src.constants.constants import (AbortReason, AudioConfig, DeviceState,
-                                     EventType, ListeningMode)
+from src.constants.constants import (AbortReason, DeviceState, EventType,
+                                     ListeningMode)
 from src.display import cli_display, gui_display
+from src.utils import json_codec
 from src.utils.common_utils import handle_verification_code
 from src.utils.config_manager import ConfigManager
+from src.utils.latency_tracer import LatencyTracer, TracePoint
 from src.utils.logging_config import get_logger
 # 在导入 opuslib 之前处理 opus 动态库
 from src.utils.opus_loader import setup_opus
@@ -67,6 +68,12 @@ class Application:
 
         # 音频处理相关
         self.audio_codec = None  # 将在 _initialize_audio 中初始化
+        self.audio_pipeline = None  # asyncio管线模式下使用
+        # 对话延迟打点
+        self.latency_tracer = LatencyTracer.get_instance()
+        self.pipeline_mode = self.config.get_config(
+            "AUDIO_OPTIONS.PIPELINE_MODE", "thread"
+        )
         self._tts_lock = threading.Lock()
         self.is_tts_playing = False  # 因为Display的播放状态只是GUI使用，不方便Music_player使用，所以加了这个标志位表示是TTS在说话
 
@@ -74,8 +81,6 @@ class Application:
         self.loop = asyncio.new_event_loop()
         self.loop_thread = None
         self.running = False
-        self.input_event_thread = None
-        self.output_event_thread = None
 
         # 任务队列和锁
         self.main_tasks = []
@@ -87,12 +92,16 @@ class Application:
         # 回调函数
         self.on_state_changed_callbacks = []
 
-        # 初始化事件对象
-        self.events = {
-            EventType.SCHEDULE_EVENT: threading.Event(),
-            EventType.AUDIO_INPUT_READY_EVENT: threading.Event(),
-            EventType.AUDIO_OUTPUT_READY_EVENT: threading.Event(),
-        }
+        # 主循环事件：所有事件源通过同一个条件变量唤醒主循环
+        self._event_cond = threading.Condition(self.mutex)
+        self._pending_events = set()
+        # 播放等待抖动缓冲区下一帧到期的时间点（只在主循环线程中访问）
+        self._output_deadline = None
+        self._event_order = (
+            EventType.SCHEDULE_EVENT,
+            EventType.AUDIO_INPUT_READY_EVENT,
+            EventType.AUDIO_OUTPUT_READY_EVENT,
+        )
 
         # 创建显示界面
         self.display = None
@@ -165,6 +174,21 @@ class Application:
         logger.debug("初始化音频编解码器")
         self._initialize_audio()
 
+        # asyncio管线模式：音频收发直接在事件循环上处理
+        if self.pipeline_mode == "asyncio" and self.audio_codec:
+            from src.audio_codecs.audio_pipeline import AsyncAudioPipeline
+
+            self.audio_pipeline = AsyncAudioPipeline(
+                self.audio_codec, self.protocol, self.loop
+            )
+            self.audio_codec.on_input_frame_ready = (
+                self.audio_pipeline.notify_capture_ready
+            )
+            self.audio_codec.on_playback_space_available = (
+                self.audio_pipeline.notify_playback_space_available
+            )
+            self.audio_pipeline.start()
+
         # 初始化并启动唤醒词检测
         self._initialize_wake_word_detector()
 
@@ -176,6 +200,16 @@ class Application:
         self.protocol.on_audio_channel_opened = self._on_audio_channel_opened
         self.protocol.on_audio_channel_closed = self._on_audio_channel_closed
 
+        # 编码参数根据协议层的网络统计自适应调整
+        if self.audio_codec and self.audio_codec.encoder_controller:
+            self.audio_codec.encoder_controller.feedback_provider = (
+                self.protocol.get_network_stats
+            )
+
+        # 开启预连接时在待命状态就建立连接，唤醒后直接开始聆听
+        if await self.protocol.start_persistent_session():
+            logger.info("已启动长连接会话维护")
+
         logger.info("应用程序组件初始化完成")
 
     def _initialize_audio(self):
@@ -185,6 +219,10 @@ class Application:
             from src.audio_codecs.audio_codec import AudioCodec
 
             self.audio_codec = AudioCodec()
+            self.audio_codec.on_input_frame_ready = self._on_input_frame_ready
+            self.audio_codec.on_playback_space_available = (
+                self._on_playback_space_available
+            )
             logger.info("音频编解码器初始化成功")
 
             # 记录音量控制状态
@@ -247,26 +285,49 @@ class Application:
         logger.debug("显示界面回调函数设置完成")
 
     def _main_loop(self):
-        """应用程序主循环"""
+        """应用程序主循环
+
+        阻塞在单个条件变量上，由采集、解码和调度事件直接唤醒，空闲时不占用CPU。
+        """
         logger.info("主循环已启动")
         self.running = True
 
         while self.running:
             # 等待事件
-            for event_type, event in self.events.items():
-                if event.is_set():
-                    event.clear()
-                    logger.debug("处理事件: %s", event_type)
-
-                    if event_type == EventType.AUDIO_INPUT_READY_EVENT:
-                        self._handle_input_audio()
-                    elif event_type == EventType.AUDIO_OUTPUT_READY_EVENT:
-                        self._handle_output_audio()
-                    elif event_type == EventType.SCHEDULE_EVENT:
-                        self._process_scheduled_tasks()
-
-            # 短暂休眠以避免CPU占用过高
-            time.sleep(0.01)
+            with self._event_cond:
+                while self.running:
+                    timeout = None
+                    if self._output_deadline is not None:
+                        timeout = self._output_deadline - time.monotonic()
+                        if timeout <= 0:
+                            # 抖动缓冲区中的下一帧已到期
+                            self._output_deadline = None
+                            self._pending_events.add(
+                                EventType.AUDIO_OUTPUT_READY_EVENT
+                            )
+                    if self._pending_events:
+                        break
+                    self._event_cond.wait(timeout)
+                pending = self._pending_events
+                self._pending_events = set()
+
+            for event_type in self._event_order:
+                if event_type not in pending:
+                    continue
+                logger.debug("处理事件: %s", event_type)
+
+                if event_type == EventType.AUDIO_INPUT_READY_EVENT:
+                    self._handle_input_audio()
+                elif event_type == EventType.AUDIO_OUTPUT_READY_EVENT:
+                    self._handle_output_audio()
+                elif event_type == EventType.SCHEDULE_EVENT:
+                    self._process_scheduled_tasks()
+
+    def _set_event(self, event_type):
+        """标记事件并唤醒主循环（线程安全）"""
+        with self._event_cond:
+            self._pending_events.add(event_type)
+            self._event_cond.notify()
 
     def _process_scheduled_tasks(self):
         """处理调度任务"""
@@ -283,18 +344,36 @@ class Application:
 
     def schedule(self, callback):
         """调度任务到主循环"""
-        with self.mutex:
+        with self._event_cond:
             self.main_tasks.append(callback)
-        self.events[EventType.SCHEDULE_EVENT].set()
+            self._pending_events.add(EventType.SCHEDULE_EVENT)
+            self._event_cond.notify()
+
+    def _on_input_frame_ready(self):
+        """采集总线有新帧可读（在采集线程中调用）"""
+        if self.device_state == DeviceState.LISTENING:
+            self._set_event(EventType.AUDIO_INPUT_READY_EVENT)
+
+    def _on_playback_space_available(self):
+        """播放环形缓冲区腾出了空间（在输出回调中调用）"""
+        if self.device_state == DeviceState.SPEAKING:
+            self._set_event(EventType.AUDIO_OUTPUT_READY_EVENT)
 
     def _handle_input_audio(self):
         """处理音频输入"""
-        if self.device_state != DeviceState.LISTENING:
+        if self.device_state != DeviceState.LISTENING or not self.audio_codec:
             return
 
-        # 读取并发送音频数据
-        encoded_data = self.audio_codec.read_audio()
-        if encoded_data and self.protocol and self.protocol.is_audio_channel_opened():
+        # 一次取完采集总线上积压的帧，后续由采集线程再次唤醒
+        while True:
+            encoded_data = self.audio_codec.read_audio()
+            if not encoded_data:
+                break
+            self._send_encoded_audio(encoded_data)
+
+    def _send_encoded_audio(self, encoded_data):
+        """把编码后的音频帧发送到事件循环"""
+        if self.protocol and self.protocol.is_audio_channel_opened():
             asyncio.run_coroutine_threadsafe(
                 self.protocol.send_audio(encoded_data), self.loop
             )
@@ -308,10 +387,27 @@ class Application:
 
     def _handle_output_audio(self):
         """处理音频输出"""
-        if self.device_state != DeviceState.SPEAKING:
+        self._output_deadline = None
+        if self.device_state != DeviceState.SPEAKING or not self.audio_codec:
             return
+
+        # 确保输出流是活跃的
+        self.audio_codec.ensure_output_stream_active()
+
         self.set_is_tts_playing(True)  # 开始播放
-        self.audio_codec.play_audio()
+        played = self.audio_codec.play_audio()
+
+        # 单次只处理有限帧数，队列中仍有数据时继续触发
+        if self.audio_codec.audio_decode_queue.empty():
+            return
+        if played:
+            self._set_event(EventType.AUDIO_OUTPUT_READY_EVENT)
+            return
+        # 抖动缓冲区在等待迟到的包时等到下一帧到期，播放环形缓冲区已满时等输出回调唤醒，
+        # 期间主循环照常响应其他事件
+        timeout = self.audio_codec.playback_wait_timeout()
+        if timeout is not None:
+            self._output_deadline = time.monotonic() + timeout
 
     def _on_network_error(self, error_message=None):
         """网络错误回调"""
@@ -334,11 +430,22 @@ class Application:
                     self.protocol.close_audio_channel(), self.loop
                 )
 
-    def _on_incoming_audio(self, data):
-        """接收音频数据回调"""
+    def _on_incoming_audio(self, data, sequence=None):
+        """接收音频数据回调
+
+        Args:
+            data: Opus音频数据
+            sequence: 数据包序号（MQTT/UDP通道提供），用于抖动缓冲区重排
+        """
+        self.latency_tracer.mark(TracePoint.FIRST_AUDIO_PACKET)
         if self.device_state == DeviceState.SPEAKING:
-            self.audio_codec.write_audio(data)
-            self.events[EventType.AUDIO_OUTPUT_READY_EVENT].set()
+            self.audio_codec.write_audio(data, sequence)
+            if self.audio_pipeline:
+                # 回调已在事件循环中执行，直接唤醒播放协程
+                self.set_is_tts_playing(True)
+                self.audio_pipeline.notify_playback_ready()
+            else:
+                self._set_event(EventType.AUDIO_OUTPUT_READY_EVENT)
 
     def _on_incoming_json(self, json_data):
         """接收JSON数据回调"""
@@ -348,11 +455,17 @@ class Application:
 
             # 解析JSON数据
             if isinstance(json_data, str):
-                data = json.loads(json_data)
+                data = json_codec.loads(json_data)
             else:
                 data = json_data
             # 处理不同类型的消息
             msg_type = data.get("type", "")
+            if msg_type == "stt":
+                self.latency_tracer.mark(TracePoint.STT)
+            elif msg_type == "tts":
+                # tts_start / tts_sentence_start / tts_stop
+                self.latency_tracer.mark(f"tts_{data.get('state', '')}")
+
             if msg_type == "tts":
                 self._handle_tts_message(data)
             elif msg_type == "stt":
@@ -490,7 +603,7 @@ class Application:
 
         thing_manager = ThingManager.get_instance()
         asyncio.run_coroutine_threadsafe(
-            self.protocol.send_iot_descriptors(thing_manager.get_descriptors_json()),
+            self.protocol.send_iot_descriptors(thing_manager.get_descriptors()),
             self.loop,
         )
         self._update_iot_states(False)
@@ -521,82 +634,11 @@ class Application:
                     # 只有在出错时才重新初始化
                     self.audio_codec._reinitialize_stream(is_input=False)
 
-            # 设置事件触发器
-            if (
-                self.input_event_thread is None
-                or not self.input_event_thread.is_alive()
-            ):
-                self.input_event_thread = threading.Thread(
-                    target=self._audio_input_event_trigger, daemon=True
-                )
-                self.input_event_thread.start()
-                logger.info("已启动输入事件触发线程")
-
-            # 检查输出事件线程
-            if (
-                self.output_event_thread is None
-                or not self.output_event_thread.is_alive()
-            ):
-                self.output_event_thread = threading.Thread(
-                    target=self._audio_output_event_trigger, daemon=True
-                )
-                self.output_event_thread.start()
-                logger.info("已启动输出事件触发线程")
-
+            # 音频事件由采集回调、收到的音频和状态切换直接触发，无需轮询线程
             logger.info("音频流已启动")
         except Exception as e:
             logger.error(f"启动音频流失败: {e}")
 
-    def _audio_input_event_trigger(self):
-        """音频输入事件触发器"""
-        while self.running:
-            try:
-                # 只有在主动监听状态下才触发输入事件
-                if (
-                    self.device_state == DeviceState.LISTENING
-                    and self.audio_codec.input_stream
-                ):
-                    self.events[EventType.AUDIO_INPUT_READY_EVENT].set()
-            except OSError as e:
-                logger.error(f"音频输入流错误: {e}")
-                # 不要退出循环，继续尝试
-                time.sleep(0.5)
-            except Exception as e:
-                logger.error(f"音频输入事件触发器错误: {e}")
-                time.sleep(0.5)
-
-            # 确保触发频率足够高，即使帧长度较大
-            # 使用20ms作为最大触发间隔，确保即使帧长度为60ms也能有足够的采样率
-            sleep_time = min(20, AudioConfig.FRAME_DURATION) / 1000
-            time.sleep(sleep_time)  # 按帧时长触发，但确保最小触发频率
-
-    def _audio_output_event_trigger(self):
-        """音频输出事件触发器"""
-        while self.running:
-            try:
-                # 确保输出流是活跃的
-                if (
-                    self.device_state == DeviceState.SPEAKING
-                    and self.audio_codec
-                    and self.audio_codec.output_stream
-                ):
-
-                    # 如果输出流不活跃，尝试重新激活
-                    if not self.audio_codec.output_stream.is_active():
-                        try:
-                            self.audio_codec.output_stream.start_stream()
-                        except Exception as e:
-                            logger.warning(f"启动输出流失败，尝试重新初始化: {e}")
-                            self.audio_codec._reinitialize_stream(is_input=False)
-
-                    # 当队列中有数据时才触发事件
-                    if not self.audio_codec.audio_decode_queue.empty():
-                        self.events[EventType.AUDIO_OUTPUT_READY_EVENT].set()
-            except Exception as e:
-                logger.error(f"音频输出事件触发器错误: {e}")
-
-            time.sleep(0.02)  # 稍微延长检查间隔
-
     async def _on_audio_channel_closed(self):
         """音频通道关闭回调"""
         logger.info("音频通道已关闭")
@@ -631,6 +673,9 @@ class Application:
             return
 
         self.device_state = state
+        self.latency_tracer.mark_state(state)
+        if self.audio_pipeline:
+            self.audio_pipeline.set_device_state(state)
 
         # 根据状态执行相应操作
         if state == DeviceState.IDLE:
@@ -666,8 +711,13 @@ class Application:
             if self.audio_codec:
                 if self.audio_codec.is_input_paused():
                     self.audio_codec.resume_input()
+                if not self.audio_pipeline:
+                    self._set_event(EventType.AUDIO_INPUT_READY_EVENT)
         elif state == DeviceState.SPEAKING:
             self.display.update_status("说话中...")
+            # 进入说话状态前可能已有音频入队
+            if not self.audio_pipeline:
+                self._set_event(EventType.AUDIO_OUTPUT_READY_EVENT)
             if (
                 self.wake_word_detector
                 and hasattr(self.wake_word_detector, "paused")
@@ -1032,15 +1082,29 @@ class Application:
         logger.info("正在关闭应用程序...")
         self.running = False
 
+        # 唤醒主循环以便退出
+        with self._event_cond:
+            self._event_cond.notify_all()
+
+        # 停止异步音频管线
+        if self.audio_pipeline and self.loop.is_running():
+            try:
+                asyncio.run_coroutine_threadsafe(
+                    self.audio_pipeline.stop(), self.loop
+                ).result(timeout=1.0)
+            except Exception as e:
+                logger.warning(f"停止音频管线失败: {e}")
+
         # 关闭音频编解码器
         if self.audio_codec:
             self.audio_codec.close()
 
+        # 配置了输出路径时保存延迟统计
+        self.latency_tracer.dump()
+
         # 关闭协议
         if self.protocol:
-            asyncio.run_coroutine_threadsafe(
-                self.protocol.close_audio_channel(), self.loop
-            )
+            asyncio.run_coroutine_threadsafe(self.protocol.disconnect(), self.loop)
 
         # 停止事件循环
         if self.loop and self.loop.is_running():
@@ -1163,16 +1227,19 @@ class Application:
             self.abort_speaking(AbortReason.WAKE_WORD_DETECTED)
 
     async def _connect_and_start_listening(self, wake_word):
-        """连接服务器并开始监听"""
-        # 首先尝试连接服务器
-        if not await self.protocol.connect():
-            logger.error("连接服务器失败")
-            self.alert("错误", "连接服务器失败")
-            self.schedule(lambda: self.set_device_state(DeviceState.IDLE))
-            # 恢复唤醒词检测
-            if self.wake_word_detector:
-                self.wake_word_detector.resume()
-            return
+        """连接服务器并开始监听
+
+        已有可用连接（长连接或预连接）时直接复用，省去建连和hello握手
+        """
+        if not self.protocol.is_audio_channel_opened():
+            if not await self.protocol.connect():
+                logger.error("连接服务器失败")
+                self.alert("错误", "连接服务器失败")
+                self.schedule(lambda: self.set_device_state(DeviceState.IDLE))
+                # 恢复唤醒词检测
+                if self.wake_word_detector:
+                    self.wake_word_detector.resume()
+                return
 
         # 然后尝试打开音频通道
         if not await self.protocol.open_audio_channel():
@@ -1331,21 +1398,21 @@ class Application:
         # 处理向下兼容
         if delta is None:
             # 保持原有行为：获取所有状态并发送
-            states_json = thing_manager.get_states_json_str()  # 调用旧方法
+            _, states = thing_manager.get_states(delta=False)
 
-            # 发送状态更新
+            # 发送状态更新，由协议层一次序列化
             asyncio.run_coroutine_threadsafe(
-                self.protocol.send_iot_states(states_json), self.loop
+                self.protocol.send_iot_states(states), self.loop
             )
             logger.info("物联网设备状态已更新")
             return
 
         # 使用新方法获取状态
-        changed, states_json = thing_manager.get_states_json(delta=delta)
+        changed, states = thing_manager.get_states(delta=delta)
         # delta=False总是发送，delta=True只在有变化时发送
         if not delta or changed:
             asyncio.run_coroutine_threadsafe(
-                self.protocol.send_iot_states(states_json), self.loop
+                self.protocol.send_iot_states(states), self.loop
             )
             if delta:
                 logger.info("物联网设备状态已更新(增量)")
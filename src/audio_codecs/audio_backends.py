@@ -0,0 +1,418 @@
+import threading
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from src.audio_codecs.resampler import StreamingResampler
+from src.utils.logging_config import get_logger
+
+try:
+    import pyaudio
+except ImportError:  # 无声卡的服务器/CI环境可以不安装PortAudio
+    pyaudio = None
+
+logger = get_logger(__name__)
+
+# 与PyAudio取值一致的常量，虚拟后端不依赖pyaudio
+PA_INT16 = 8
+PA_CONTINUE = 0
+PA_INPUT_OVERFLOW = 2
+
+
+class AudioBackendType:
+    """音频后端类型"""
+
+    PYAUDIO = "pyaudio"  # 真实声卡
+    WAV = "wav"  # 从WAV文件输入，输出录制到WAV文件
+    NULL = "null"  # 静音输入/丢弃输出，可选回环
+
+
+class VirtualStream:
+    """模拟PyAudio Stream接口的虚拟音频流
+
+    输入流从source取数据，输出流把数据交给sink。
+    指定stream_callback时为回调模式：输入流把数据交给回调，输出流把回调返回的数据交给sink。
+    realtime为True时按采样率节拍读写，行为与真实声卡一致；
+    为False时不等待，用于尽可能快地跑完整条管线。
+    """
+
+    def __init__(
+        self,
+        rate,
+        frames_per_buffer,
+        is_input,
+        source=None,
+        sink=None,
+        stream_callback=None,
+        realtime=True,
+        start=True,
+    ):
+        self.rate = rate
+        self.frames_per_buffer = frames_per_buffer
+        self.is_input = is_input
+        self._source = source
+        self._sink = sink
+        self._stream_callback = stream_callback
+        self._realtime = realtime
+
+        self._active = False
+        self._closed = False
+        self._start_time = 0.0
+        self._frames_done = 0
+        self._callback_thread = None
+
+        if start:
+            self.start_stream()
+
+    def _pace(self, frames):
+        """按实时节拍等待frames个样本的时长"""
+        if not self._realtime:
+            return
+        deadline = self._start_time + (self._frames_done + frames) / self.rate
+        delay = deadline - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def start_stream(self):
+        if self._closed:
+            raise OSError("Stream closed")
+        if self._active:
+            return
+        self._active = True
+        self._start_time = time.monotonic()
+        self._frames_done = 0
+        if self._stream_callback:
+            self._callback_thread = threading.Thread(
+                target=self._callback_loop,
+                daemon=True,
+                name="VirtualAudioInput" if self.is_input else "VirtualAudioOutput",
+            )
+            self._callback_thread.start()
+
+    def stop_stream(self):
+        self._active = False
+        thread = self._callback_thread
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=1.0)
+        self._callback_thread = None
+
+    def close(self):
+        self.stop_stream()
+        self._closed = True
+
+    def is_active(self):
+        return self._active
+
+    def is_stopped(self):
+        return not self._active
+
+    def _callback_loop(self):
+        """回调模式：按缓冲区时长周期性调用stream_callback"""
+        while self._active:
+            data = self._source(self.frames_per_buffer) if self.is_input else None
+            self._pace(self.frames_per_buffer)
+            if not self._active:
+                break
+            self._frames_done += self.frames_per_buffer
+            try:
+                out_data, _ = self._stream_callback(
+                    data, self.frames_per_buffer, {}, 0
+                )
+                if not self.is_input and out_data:
+                    self._sink(out_data)
+            except Exception as e:
+                logger.error(f"虚拟音频回调出错: {e}")
+            if not self._realtime:
+                # 非实时模式下也让出CPU，避免消费方跟不上
+                time.sleep(0)
+
+    def read(self, num_frames, exception_on_overflow=True):
+        if not self._active:
+            raise OSError("Stream not active")
+        data = self._source(num_frames)
+        self._pace(num_frames)
+        self._frames_done += num_frames
+        return data
+
+    def get_read_available(self):
+        if not self._realtime or not self._active:
+            return 0
+        elapsed = int((time.monotonic() - self._start_time) * self.rate)
+        return max(0, elapsed - self._frames_done)
+
+    def write(self, frames, num_frames=None, exception_on_underflow=False):
+        if not self._active:
+            raise OSError("Stream not active")
+        if num_frames is None:
+            num_frames = len(frames) // 2
+        self._sink(frames)
+        self._pace(num_frames)
+        self._frames_done += num_frames
+
+    def get_write_available(self):
+        return self.frames_per_buffer
+
+
+class VirtualAudioBackend:
+    """虚拟音频后端基类，提供与pyaudio.PyAudio一致的设备和流接口"""
+
+    device_name = "Virtual Audio Device"
+
+    def __init__(self, realtime=True):
+        self.realtime = realtime
+        self._streams = []
+
+    def input_sample_rate(self):
+        """虚拟输入设备的采样率"""
+        return 16000
+
+    def get_device_count(self):
+        return 1
+
+    def get_device_info_by_index(self, index):
+        return {
+            "index": 0,
+            "name": self.device_name,
+            "maxInputChannels": 1,
+            "maxOutputChannels": 1,
+            "defaultSampleRate": float(self.input_sample_rate()),
+        }
+
+    def get_default_input_device_info(self):
+        return self.get_device_info_by_index(0)
+
+    def get_default_output_device_info(self):
+        return self.get_device_info_by_index(0)
+
+    def open(
+        self,
+        rate,
+        channels=1,
+        format=PA_INT16,
+        input=False,
+        output=False,
+        frames_per_buffer=1024,
+        stream_callback=None,
+        start=True,
+        **kwargs,
+    ):
+        if channels != 1 or format != PA_INT16:
+            raise ValueError("虚拟音频后端仅支持单声道16位PCM")
+        stream = VirtualStream(
+            rate,
+            frames_per_buffer,
+            is_input=input,
+            source=self._make_source(rate) if input else None,
+            sink=self._make_sink(rate) if output else None,
+            stream_callback=stream_callback,
+            realtime=self.realtime,
+            start=start,
+        )
+        self._streams.append(stream)
+        return stream
+
+    def _make_source(self, rate):
+        """返回输入数据源：source(num_frames) -> bytes"""
+        raise NotImplementedError
+
+    def _make_sink(self, rate):
+        """返回输出数据接收方：sink(bytes)"""
+        raise NotImplementedError
+
+    def terminate(self):
+        for stream in self._streams:
+            try:
+                stream.close()
+            except Exception:
+                pass
+        self._streams = []
+
+
+class NullAudioBackend(VirtualAudioBackend):
+    """空设备：输入静音、输出丢弃
+
+    loopback为True时，写入输出流的音频会重采样后出现在输入流中，
+    可用于在没有声卡的机器上验证完整的收发链路。
+    """
+
+    device_name = "Null Audio Device"
+
+    def __init__(self, realtime=True, loopback=False):
+        super().__init__(realtime)
+        self.loopback = loopback
+        self._loop_lock = threading.Lock()
+        self._loop_buffer = bytearray()
+        self._loop_rate = None
+        self._loop_resampler = None
+        self._input_rate = None
+
+    def _make_source(self, rate):
+        self._input_rate = rate
+
+        def source(num_frames):
+            size = num_frames * 2
+            if not self.loopback:
+                return bytes(size)
+            with self._loop_lock:
+                data = bytes(self._loop_buffer[:size])
+                del self._loop_buffer[:size]
+            # 回环数据不足时补静音
+            return data + bytes(size - len(data))
+
+        return source
+
+    def _make_sink(self, rate):
+        def sink(data):
+            if not self.loopback:
+                return
+            if self._loop_resampler is None or self._loop_rate != rate:
+                self._loop_rate = rate
+                self._loop_resampler = StreamingResampler(
+                    rate, self._input_rate or rate
+                )
+            samples = self._loop_resampler.process(data)
+            with self._loop_lock:
+                self._loop_buffer.extend(samples.tobytes())
+
+        return sink
+
+
+class WavFileAudioBackend(VirtualAudioBackend):
+    """WAV文件设备：依次播放输入文件作为麦克风，把输出音频录制到文件
+
+    输入文件之间插入gap_ms的静音，全部播完后持续输出静音（loop为True时从头循环）。
+    """
+
+    device_name = "WAV File Device"
+
+    def __init__(
+        self, input_files=None, output_file=None, realtime=True, gap_ms=1000, loop=False
+    ):
+        super().__init__(realtime)
+        if isinstance(input_files, (str, Path)):
+            input_files = [input_files]
+        self.input_files = [Path(p) for p in (input_files or [])]
+        self.output_file = Path(output_file) if output_file else None
+        self.gap_ms = gap_ms
+        self.loop = loop
+
+        self._input_rate = 16000
+        self._input_pcm = self._load_inputs()
+        self._input_pos = 0
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self.finished = threading.Event()
+
+    def _load_inputs(self):
+        """读取所有输入文件，统一为第一个文件的采样率后拼接"""
+        pieces = []
+        for path in self.input_files:
+            with wave.open(str(path), "rb") as wav:
+                if wav.getsampwidth() != 2:
+                    raise ValueError(f"仅支持16位PCM的WAV文件: {path}")
+                rate = wav.getframerate()
+                channels = wav.getnchannels()
+                samples = np.frombuffer(
+                    wav.readframes(wav.getnframes()), dtype=np.int16
+                )
+            if channels > 1:
+                # 多声道只取第一个声道
+                samples = samples[::channels]
+            if not pieces:
+                self._input_rate = rate
+            elif rate != self._input_rate:
+                samples = StreamingResampler(rate, self._input_rate).process(samples)
+            pieces.append(samples)
+            pieces.append(
+                np.zeros(int(self._input_rate * self.gap_ms / 1000), dtype=np.int16)
+            )
+            logger.info(f"加载输入音频: {path} ({len(samples) / self._input_rate:.2f}秒)")
+        if not pieces:
+            return b""
+        return np.concatenate(pieces).tobytes()
+
+    def input_sample_rate(self):
+        return self._input_rate
+
+    def _make_source(self, rate):
+        if rate != self._input_rate:
+            logger.warning(f"输入流采样率{rate}Hz与WAV文件{self._input_rate}Hz不一致")
+
+        def source(num_frames):
+            size = num_frames * 2
+            pcm = self._input_pcm
+            if self.loop and pcm and self._input_pos >= len(pcm):
+                self._input_pos = 0
+            data = pcm[self._input_pos : self._input_pos + size]
+            self._input_pos += len(data)
+            if self._input_pos >= len(pcm) and not self.finished.is_set():
+                self.finished.set()
+                logger.info("输入音频已全部播放")
+            return data + bytes(size - len(data))
+
+        return source
+
+    def _make_sink(self, rate):
+        if self.output_file is None:
+            return lambda data: None
+
+        with self._writer_lock:
+            if self._writer is None:
+                self.output_file.parent.mkdir(parents=True, exist_ok=True)
+                self._writer = wave.open(str(self.output_file), "wb")
+                self._writer.setnchannels(1)
+                self._writer.setsampwidth(2)
+                self._writer.setframerate(rate)
+                logger.info(f"输出音频将录制到: {self.output_file}")
+
+        def sink(data):
+            with self._writer_lock:
+                if self._writer is not None:
+                    self._writer.writeframes(data)
+
+        return sink
+
+    def terminate(self):
+        super().terminate()
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+def create_audio_backend(config):
+    """根据AUDIO_OPTIONS创建音频后端
+
+    Args:
+        config: ConfigManager实例
+
+    Returns:
+        pyaudio.PyAudio或VirtualAudioBackend实例
+    """
+    backend_type = config.get_config(
+        "AUDIO_OPTIONS.BACKEND", AudioBackendType.PYAUDIO
+    )
+    realtime = config.get_config("AUDIO_OPTIONS.BACKEND_REALTIME", True)
+
+    if backend_type == AudioBackendType.WAV:
+        logger.info("使用WAV文件音频后端")
+        return WavFileAudioBackend(
+            input_files=config.get_config("AUDIO_OPTIONS.WAV_INPUT", []),
+            output_file=config.get_config("AUDIO_OPTIONS.WAV_OUTPUT", None),
+            realtime=realtime,
+            gap_ms=config.get_config("AUDIO_OPTIONS.WAV_INPUT_GAP_MS", 1000),
+        )
+    if backend_type == AudioBackendType.NULL:
+        logger.info("使用空音频后端")
+        return NullAudioBackend(
+            realtime=realtime,
+            loopback=config.get_config("AUDIO_OPTIONS.LOOPBACK", False),
+        )
+
+    if backend_type != AudioBackendType.PYAUDIO:
+        logger.warning(f"未知的音频后端 {backend_type}，使用PyAudio")
+    if pyaudio is None:
+        raise RuntimeError("未安装PyAudio，请安装后重试或改用wav/null音频后端")
+    return pyaudio.PyAudio()
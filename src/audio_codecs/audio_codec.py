@@ -1,53 +1,138 @@
-import queue
 import threading
 import time
 import platform
 
 import numpy as np
-import pyaudio
-import scipy.signal
 
 # 在导入opuslib之前先设置opus库
 from src.utils.opus_loader import setup_opus
 setup_opus()
 import opuslib
 
+from src.audio_codecs.audio_backends import (PA_CONTINUE, PA_INPUT_OVERFLOW,
+                                             PA_INT16, create_audio_backend)
+from src.audio_codecs.capture_bus import CaptureBus, DropPolicy
+from src.audio_codecs.jitter_buffer import FrameStatus, JitterBuffer
+from src.audio_codecs.opus_controller import OpusEncoderController, OpusProfile
+from src.audio_codecs.opus_decoder import OpusFrameDecoder
+from src.audio_codecs.resampler import StreamingResampler
+from src.audio_codecs.ring_buffer import AudioRingBuffer
 from src.constants.constants import AudioConfig
+from src.utils.config_manager import ConfigManager
+from src.utils.latency_tracer import LatencyTracer, TracePoint
 from src.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 
+class CaptureMode:
+    """音频采集模式"""
+
+    BLOCKING = "blocking"  # 主循环中阻塞读取输入流
+    CALLBACK = "callback"  # PortAudio回调写入环形缓冲区
+
+
+class PlaybackMode:
+    """音频播放模式"""
+
+    BLOCKING = "blocking"  # 播放线程阻塞写入输出流
+    CALLBACK = "callback"  # PortAudio回调从环形缓冲区取数据
+
+
 class AudioCodec:
     """音频编解码器类，处理音频的录制和播放（严格兼容版）"""
 
     def __init__(self):
+        config = ConfigManager.get_instance()
         self.audio = None
         self.input_stream = None
         self.output_stream = None
         self.opus_encoder = None
         self.opus_decoder = None
-        # 设置队列最大大小，防止内存溢出（约10秒音频缓冲）
+        # 根据网络反馈和编码耗时调整编码参数
+        self.encoder_controller = None
+        # 自适应抖动缓冲区，最多保存约10秒音频，防止内存溢出
         max_queue_size = int(10 * 1000 / AudioConfig.FRAME_DURATION)
-        self.audio_decode_queue = queue.Queue(maxsize=max_queue_size)
+        self.audio_decode_queue = JitterBuffer(
+            AudioConfig.FRAME_DURATION,
+            min_depth=config.get_config("AUDIO_OPTIONS.JITTER_MIN_DEPTH", 1),
+            max_depth=config.get_config("AUDIO_OPTIONS.JITTER_MAX_DEPTH", 10),
+            capacity=max_queue_size,
+        )
+        # 最近一次解码出的帧长（样本数），用于FEC/PLC
+        self._last_decoded_samples = None
+        self._latency_tracer = LatencyTracer.get_instance()
 
         # 状态管理（保留原始变量名）
         self._is_closing = False
         self._is_input_paused = False
         self._input_paused_lock = threading.Lock()
         self._stream_lock = threading.Lock()
+        # 输出流单独加锁，播放不会等待持有_stream_lock的采集线程
+        self._output_lock = threading.Lock()
 
         # 音频重采样相关
         self.actual_input_sample_rate = AudioConfig.INPUT_SAMPLE_RATE
         self.need_resample = False
         self.resample_ratio = 1.0
-        self.resample_buffer = np.array([], dtype=np.float32)
+        self._input_resampler = None
+        # 重采样输出按帧长重新切分的缓冲区
+        self._resample_fifo = None
+        self._resample_frame = np.empty(AudioConfig.INPUT_FRAME_SIZE, dtype=np.int16)
+
+        # 采集模式：回调模式下由PortAudio回调写入预分配的环形缓冲区
+        self.capture_mode = config.get_config(
+            "AUDIO_OPTIONS.CAPTURE_MODE", CaptureMode.BLOCKING
+        )
+        if self.capture_mode not in (CaptureMode.BLOCKING, CaptureMode.CALLBACK):
+            logger.warning(f"未知的采集模式 {self.capture_mode}，使用阻塞模式")
+            self.capture_mode = CaptureMode.BLOCKING
+        self._capture_buffer_ms = config.get_config(
+            "AUDIO_OPTIONS.CAPTURE_BUFFER_MS", 500
+        )
+        self._capture_ring = None
+        self._capture_frame = None
+        self._frame_ready = threading.Event()
+        # 播放模式：回调模式下解码后的PCM写入环形缓冲区，由PortAudio回调取走
+        self.playback_mode = config.get_config(
+            "AUDIO_OPTIONS.PLAYBACK_MODE", PlaybackMode.BLOCKING
+        )
+        if self.playback_mode not in (PlaybackMode.BLOCKING, PlaybackMode.CALLBACK):
+            logger.warning(f"未知的播放模式 {self.playback_mode}，使用阻塞模式")
+            self.playback_mode = PlaybackMode.BLOCKING
+        self._playback_buffer_ms = config.get_config(
+            "AUDIO_OPTIONS.PLAYBACK_BUFFER_MS", 200
+        )
+        self._playback_ring = None
+        self._playback_frame = None
+        # 清空请求由回调线程执行，保持环形缓冲区单生产者/单消费者
+        self._playback_flush = False
+        self.playback_underruns = 0
+        # 播放环形缓冲区放不下一帧时置位，回调腾出空间后清除并通知
+        self._playback_space_wanted = False
+        # 写入播放环形缓冲区后置位，回调取走数据时才记录首次播放打点
+        self._playback_mark_pending = False
+        # 回声消除阶段，播放的PCM作为参考信号，在采集帧发布前处理
+        self._echo_canceller = None
+        # 采集总线有新帧时的通知回调（在采集线程中调用，需轻量）
+        self.on_input_frame_ready = None
+        # 播放环形缓冲区重新放得下一帧时的通知回调（在输出回调中调用，需轻量）
+        self.on_playback_space_available = None
+
+        # 采集总线：采集线程从设备读取每帧一次，扇出给编码、唤醒词、VAD等订阅者
+        self.capture_bus = CaptureBus()
+        # 编码发送只关心最新的音频，积压超过两帧即丢弃最旧的帧
+        self._encoder_subscription = self.capture_bus.subscribe(
+            "encoder", max_frames=2, drop_policy=DropPolicy.DROP_OLDEST
+        )
+        self._capture_thread = None
 
         self._initialize_audio()
 
     def _initialize_audio(self):
         try:
-            self.audio = pyaudio.PyAudio()
+            # 音频后端：真实声卡(PyAudio)或用于无声卡环境的WAV文件/空设备
+            self.audio = create_audio_backend(ConfigManager.get_instance())
 
             # 初始化流（优化实现）
             self.input_stream = self._create_stream(is_input=True)
@@ -59,16 +144,52 @@ class AudioCodec:
                 AudioConfig.CHANNELS,
                 AudioConfig.OPUS_APPLICATION,
             )
-            self.opus_decoder = opuslib.Decoder(
-                AudioConfig.OUTPUT_SAMPLE_RATE, AudioConfig.CHANNELS
+            config = ConfigManager.get_instance()
+            self.encoder_controller = OpusEncoderController(
+                self.opus_encoder,
+                AudioConfig.FRAME_DURATION,
+                profile=config.get_config(
+                    "AUDIO_OPTIONS.OPUS_PROFILE", OpusProfile.AUTO
+                ),
+                adaptive=config.get_config("AUDIO_OPTIONS.OPUS_ADAPTIVE", True),
+            )
+            self.opus_decoder = OpusFrameDecoder(
+                AudioConfig.OUTPUT_SAMPLE_RATE,
+                AudioConfig.CHANNELS,
+                AudioConfig.MAX_DECODE_FRAME_SIZE,
             )
 
+            self._echo_canceller = self._create_echo_canceller(config)
+
+            self._start_capture_thread()
+
             logger.info("音频设备和编解码器初始化成功")
         except Exception as e:
             logger.error(f"初始化音频设备失败: {e}")
             self.close()
             raise
 
+    def _create_echo_canceller(self, config):
+        """按AUDIO_OPTIONS.AEC_ENABLED创建回声消除阶段，APM库不可用时返回None"""
+        if not config.get_config("AUDIO_OPTIONS.AEC_ENABLED", False):
+            return None
+        try:
+            from src.audio_processing.echo_cancellation import \
+                EchoCancellationStage
+
+            stage = EchoCancellationStage(
+                AudioConfig.INPUT_SAMPLE_RATE,
+                AudioConfig.OUTPUT_SAMPLE_RATE,
+                AudioConfig.FRAME_DURATION,
+                delay_ms=config.get_config("AUDIO_OPTIONS.AEC_DELAY_MS", 50),
+                max_load=config.get_config("AUDIO_OPTIONS.AEC_MAX_LOAD", 0.5),
+            )
+            logger.info("回声消除已启用")
+            return stage
+        except Exception as e:
+            logger.warning(f"回声消除不可用，已关闭: {e}")
+            return None
+
     def _create_stream(self, is_input=True):
         """流创建逻辑"""
         try:
@@ -133,6 +254,12 @@ class AudioCodec:
                     self.need_resample = True
                     self.resample_ratio = AudioConfig.INPUT_SAMPLE_RATE / default_rate
                     logger.info(f"重采样比例: {self.resample_ratio:.4f}")
+                    self._input_resampler = StreamingResampler(
+                        default_rate, AudioConfig.INPUT_SAMPLE_RATE
+                    )
+                    self._resample_fifo = AudioRingBuffer(
+                        AudioConfig.INPUT_FRAME_SIZE * 4
+                    )
                     sample_rate = default_rate
                 else:
                     self.actual_input_sample_rate = AudioConfig.INPUT_SAMPLE_RATE
@@ -150,7 +277,7 @@ class AudioCodec:
                 frame_size = AudioConfig.INPUT_FRAME_SIZE if is_input else AudioConfig.OUTPUT_FRAME_SIZE
 
             params = {
-                "format": pyaudio.paInt16,
+                "format": PA_INT16,
                 "channels": AudioConfig.CHANNELS,
                 "rate": sample_rate,
                 "input": is_input,
@@ -159,6 +286,28 @@ class AudioCodec:
                 "stream_callback": None,
             }
 
+            # 回调采集模式：预分配环形缓冲区，由PortAudio回调线程写入
+            if is_input and self.capture_mode == CaptureMode.CALLBACK:
+                capacity = max(
+                    frame_size * 4,
+                    int(sample_rate * self._capture_buffer_ms / 1000),
+                )
+                self._capture_ring = AudioRingBuffer(capacity)
+                self._capture_frame = np.empty(frame_size, dtype=np.int16)
+                self._frame_ready.clear()
+                params["stream_callback"] = self._input_callback
+
+            # 回调播放模式：环形缓冲区至少能放下一个最长的解码帧
+            if not is_input and self.playback_mode == PlaybackMode.CALLBACK:
+                if self._playback_ring is None:
+                    capacity = max(
+                        AudioConfig.MAX_DECODE_FRAME_SIZE + frame_size * 2,
+                        int(sample_rate * self._playback_buffer_ms / 1000),
+                    )
+                    self._playback_ring = AudioRingBuffer(capacity)
+                self._playback_frame = np.zeros(frame_size, dtype=np.int16)
+                params["stream_callback"] = self._output_callback
+
             # 添加设备索引
             if is_input and device_index is not None:
                 params["input_device_index"] = device_index
@@ -202,6 +351,84 @@ class AudioCodec:
             else:
                 raise
 
+    def _input_callback(self, in_data, frame_count, time_info, status):
+        """PortAudio输入回调，只做环形缓冲区写入，不持有任何锁"""
+        if status & PA_INPUT_OVERFLOW:
+            logger.debug("音频输入溢出")
+        ring = self._capture_ring
+        if ring is not None and in_data:
+            if not ring.write(in_data):
+                logger.debug("采集环形缓冲区已满，丢弃本次回调数据")
+            if ring.available() >= len(self._capture_frame):
+                self._frame_ready.set()
+        return None, PA_CONTINUE
+
+    def _output_callback(self, in_data, frame_count, time_info, status):
+        """PortAudio输出回调，从播放环形缓冲区取数据，不足部分补静音
+
+        只有首次播放打点和腾出空间的通知会短暂加锁，其余路径不持有任何锁。
+        """
+        out = self._playback_frame
+        if out is None or len(out) < frame_count:
+            out = self._playback_frame = np.zeros(frame_count, dtype=np.int16)
+        out = out[:frame_count]
+
+        ring = self._playback_ring
+        if ring is None:
+            out.fill(0)
+            return out.tobytes(), PA_CONTINUE
+        if self._playback_flush:
+            ring.skip(ring.available())
+            self._playback_flush = False
+
+        available = min(ring.available(), frame_count)
+        if available:
+            ring.read(available, out=out)
+            if self._playback_mark_pending:
+                self._playback_mark_pending = False
+                self._latency_tracer.mark(TracePoint.FIRST_PLAYBACK)
+        if available < frame_count:
+            out[available:] = 0
+            if available:
+                # 播放中途数据断流，说明解码跟不上
+                self.playback_underruns += 1
+        if (
+            self._playback_space_wanted
+            and ring.free_space() >= AudioConfig.MAX_DECODE_FRAME_SIZE
+        ):
+            self._playback_space_wanted = False
+            callback = self.on_playback_space_available
+            if callback is not None:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.debug(f"播放空间通知回调失败: {e}")
+        echo_canceller = self._echo_canceller
+        if available and echo_canceller is not None:
+            echo_canceller.add_reference(out)
+        return out.tobytes(), PA_CONTINUE
+
+    def _get_input_frame_size(self):
+        """设备采样率下每帧的样本数"""
+        if self.need_resample:
+            return int(
+                AudioConfig.INPUT_FRAME_SIZE
+                * (self.actual_input_sample_rate / AudioConfig.INPUT_SAMPLE_RATE)
+            )
+        return AudioConfig.INPUT_FRAME_SIZE
+
+    def _wait_for_ring_frame(self, timeout=None):
+        """等待环形缓冲区中有完整的一帧（仅回调采集模式）
+
+        Returns:
+            bool: 是否有可读的完整帧
+        """
+        ring = self._capture_ring
+        if ring is not None and ring.available() >= self._get_input_frame_size():
+            return True
+        self._frame_ready.clear()
+        return self._frame_ready.wait(timeout)
+
     def pause_input(self):
         with self._input_paused_lock:
             self._is_input_paused = True
@@ -216,11 +443,80 @@ class AudioCodec:
         with self._input_paused_lock:
             return self._is_input_paused
 
+    def _start_capture_thread(self):
+        """启动采集线程"""
+        if self._capture_thread and self._capture_thread.is_alive():
+            return
+        self._capture_thread = threading.Thread(
+            target=self._capture_loop, daemon=True, name="AudioCapture"
+        )
+        self._capture_thread.start()
+
+    def _capture_loop(self):
+        """采集线程：从设备读取每一帧并发布到采集总线"""
+        frame_duration = AudioConfig.FRAME_DURATION / 1000
+        while not self._is_closing:
+            try:
+                data = self._read_device_frame()
+            except Exception as e:
+                logger.error(f"音频采集失败: {e}")
+                data = None
+
+            if data is None:
+                # 回调模式下等待本身带超时，阻塞模式读取失败时按帧时长退避
+                if self.capture_mode == CaptureMode.BLOCKING:
+                    time.sleep(frame_duration)
+                continue
+
+            echo_canceller = self._echo_canceller
+            if echo_canceller is not None:
+                data = echo_canceller.process(data)
+
+            self.capture_bus.publish(data)
+            if self.on_input_frame_ready and not self.is_input_paused():
+                try:
+                    self.on_input_frame_ready()
+                except Exception as e:
+                    logger.debug(f"帧就绪回调失败: {e}")
+
+    def _read_device_frame(self):
+        """从设备读取一帧16kHz PCM（仅采集线程调用）"""
+        if self.capture_mode == CaptureMode.CALLBACK:
+            if not self._wait_for_ring_frame(timeout=0.5):
+                return None
+            return self._read_ring_frame()
+        return self._read_stream_frame()
+
     def read_audio(self):
-        """读取音频数据，支持重采样"""
+        """从采集总线取出一帧并编码（非阻塞）
+
+        Returns:
+            bytes: Opus数据，没有新帧或输入暂停时返回None
+        """
         if self.is_input_paused():
+            # 暂停期间采集到的音频不再发送
+            self._encoder_subscription.clear()
             return None
 
+        frame = self._encoder_subscription.get_nowait()
+        if frame is None:
+            return None
+        try:
+            controller = self.encoder_controller
+            start = time.perf_counter()
+            # 整帧视图的obj就是采集线程发布的bytes，无需拷贝
+            data = self.opus_encoder.encode(frame.obj, AudioConfig.INPUT_FRAME_SIZE)
+            if controller:
+                # 编码参数只在编码线程中调整，避免与encode并发
+                controller.record_encode_time(time.perf_counter() - start)
+                controller.maybe_update()
+            return data
+        except Exception as e:
+            logger.error(f"音频编码失败: {e}")
+            return None
+
+    def _read_stream_frame(self):
+        """阻塞读取输入流的一帧，支持重采样（阻塞采集模式）"""
         try:
             with self._stream_lock:
                 # 流状态检查优化
@@ -229,10 +525,7 @@ class AudioCodec:
                         return None
 
                 # 计算实际需要读取的帧大小
-                if self.need_resample:
-                    actual_frame_size = int(AudioConfig.INPUT_FRAME_SIZE * (self.actual_input_sample_rate / AudioConfig.INPUT_SAMPLE_RATE))
-                else:
-                    actual_frame_size = AudioConfig.INPUT_FRAME_SIZE
+                actual_frame_size = self._get_input_frame_size()
 
                 # 动态缓冲区调整
                 available = self.input_stream.get_read_available()
@@ -259,64 +552,176 @@ class AudioCodec:
                 # 重采样处理
                 if self.need_resample:
                     data = self._resample_audio(data)
-                    if data is None:
-                        return None
 
-                return self.opus_encoder.encode(data, AudioConfig.INPUT_FRAME_SIZE)
+                return data
 
         except Exception as e:
             logger.error(f"音频读取失败: {e}")
-            self._reinitialize_stream(is_input=True)
+            if not self._is_closing:
+                self._reinitialize_stream(is_input=True)
+            return None
+
+    def _read_ring_frame(self):
+        """从采集环形缓冲区非阻塞读取一帧16kHz PCM（回调采集模式）
+
+        环形缓冲区只支持单个消费者，只能由采集线程读取，其他模块通过采集总线获取音频
+
+        Returns:
+            bytes: 一帧PCM数据，不足一帧时返回None
+        """
+        if threading.current_thread() is not self._capture_thread:
+            logger.error("采集环形缓冲区只能由采集线程读取，请订阅采集总线")
+            return None
+
+        if not self.input_stream or not self.input_stream.is_active():
+            with self._stream_lock:
+                if not self.input_stream or not self.input_stream.is_active():
+                    if not self._reinitialize_stream(is_input=True):
+                        return None
+
+        ring = self._capture_ring
+        if ring is None:
+            return None
+
+        try:
+            actual_frame_size = self._get_input_frame_size()
+
+            # 积压过多时丢弃最旧的数据以降低延迟
+            available = ring.available()
+            if available > actual_frame_size * 2:
+                skipped = ring.skip(available - int(actual_frame_size * 1.5))
+                logger.debug(f"跳过{skipped}个样本减少延迟")
+
+            frame = ring.read(actual_frame_size, out=self._capture_frame)
+            if frame is None:
+                return None
+
+            data = frame.tobytes()
+            if self.need_resample:
+                data = self._resample_audio(data)
+            return data
+        except Exception as e:
+            logger.error(f"读取采集缓冲区失败: {e}")
             return None
 
     def play_audio(self):
-        """播放音频（简化版本，解码失败直接丢弃）"""
+        """从抖动缓冲区取帧解码并播放，缺包时使用FEC或PLC补偿
+
+        回调播放模式下只把PCM写入播放环形缓冲区，缓冲区放不下一帧时
+        剩余的包留在抖动缓冲区中，输出回调腾出空间后通过on_playback_space_available唤醒。
+
+        Returns:
+            int: 本次处理的帧数
+        """
+        processed_count = 0
         try:
             if self.audio_decode_queue.empty():
-                return
+                return 0
 
-            # 逐个处理音频数据，失败直接丢弃
-            processed_count = 0
             max_process_per_call = 5  # 限制单次处理数量，避免阻塞
+            ring = (
+                self._playback_ring
+                if self.playback_mode == PlaybackMode.CALLBACK
+                else None
+            )
 
-            while (
-                not self.audio_decode_queue.empty()
-                and processed_count < max_process_per_call
-            ):
-                try:
-                    opus_data = self.audio_decode_queue.get_nowait()
+            while processed_count < max_process_per_call:
+                if (
+                    ring is not None
+                    and ring.free_space() < AudioConfig.MAX_DECODE_FRAME_SIZE
+                ):
+                    # 先登记再复查，回调在两次检查之间腾出的空间不会漏掉通知
+                    self._playback_space_wanted = True
+                    if ring.free_space() < AudioConfig.MAX_DECODE_FRAME_SIZE:
+                        break
+                    self._playback_space_wanted = False
+                status, opus_data = self.audio_decode_queue.pop()
+                if status is None:
+                    break
+                processed_count += 1
 
-                    # 解码音频数据，失败直接跳过
-                    try:
-                        pcm = self.opus_decoder.decode(
-                            opus_data, AudioConfig.OUTPUT_FRAME_SIZE
-                        )
-                    except opuslib.OpusError as e:
-                        logger.warning(f"音频解码失败，丢弃此帧: {e}")
-                        processed_count += 1
-                        continue
+                pcm = self._decode_frame(status, opus_data)
+                if pcm is None:
+                    continue
 
-                    # 播放音频数据，失败直接丢弃
-                    try:
-                        with self._stream_lock:
-                            if self.output_stream and self.output_stream.is_active():
-                                self.output_stream.write(
-                                    np.frombuffer(pcm, dtype=np.int16).tobytes()
-                                )
-                            else:
-                                logger.warning("输出流未激活，丢弃此帧")
-                    except OSError as e:
-                        logger.warning(f"音频播放失败，丢弃此帧: {e}")
-                        if "Stream closed" in str(e):
-                            self._reinitialize_stream(is_input=False)
-
-                    processed_count += 1
-
-                except queue.Empty:
-                    break
+                if ring is not None:
+                    ring.write(pcm)
+                    # 写入环形缓冲区时还没有播放，由输出回调取走时打点
+                    self._playback_mark_pending = True
+                else:
+                    self._write_output(pcm)
 
         except Exception as e:
             logger.error(f"播放音频时发生未预期错误: {e}")
+        return processed_count
+
+    def playback_wait_timeout(self):
+        """play_audio没有处理任何帧时，距离可以继续处理还要等待的时间
+
+        Returns:
+            float: 秒数；没有待播放的数据，或播放环形缓冲区放不下一帧时返回None，
+            分别由新数据入队和on_playback_space_available唤醒
+        """
+        if self._playback_space_wanted:
+            return None
+        return self.audio_decode_queue.time_until_next()
+
+    def _write_output(self, pcm):
+        """阻塞写入输出流（阻塞播放模式），失败直接丢弃"""
+        try:
+            with self._output_lock:
+                if self.output_stream and self.output_stream.is_active():
+                    # PyAudio的write只接受不可变的bytes，这是唯一的一次拷贝
+                    self.output_stream.write(pcm.tobytes())
+                    self._latency_tracer.mark(TracePoint.FIRST_PLAYBACK)
+                    if self._echo_canceller is not None:
+                        self._echo_canceller.add_reference(pcm)
+                else:
+                    logger.warning("输出流未激活，丢弃此帧")
+        except OSError as e:
+            logger.warning(f"音频播放失败，丢弃此帧: {e}")
+            if "Stream closed" in str(e):
+                self._reinitialize_stream(is_input=False)
+
+    def _decode_frame(self, status, opus_data):
+        """按抖动缓冲区的出队结果解码一帧
+
+        Returns:
+            numpy int16数组，指向解码器内部缓冲区，下次解码前有效；
+            无法解码或补偿时返回None
+        """
+        if status == FrameStatus.PACKET:
+            try:
+                pcm = self.opus_decoder.decode(
+                    opus_data, AudioConfig.MAX_DECODE_FRAME_SIZE
+                )
+                samples = len(pcm)
+                if samples != self._last_decoded_samples:
+                    self._last_decoded_samples = samples
+                    self.audio_decode_queue.frame_duration_ms = (
+                        samples * 1000 / AudioConfig.OUTPUT_SAMPLE_RATE
+                    )
+                return pcm
+            except opuslib.OpusError as e:
+                # 损坏的包按丢包处理，走PLC
+                logger.warning(f"音频解码失败，使用丢包隐藏: {e}")
+                status = FrameStatus.PLC
+
+        # 丢包补偿需要知道帧长，尚未成功解码过任何帧时无法补偿
+        if not self._last_decoded_samples:
+            return None
+
+        try:
+            if status == FrameStatus.FEC:
+                # 用下一个包中的带内FEC数据恢复丢失的帧
+                return self.opus_decoder.decode(
+                    opus_data, self._last_decoded_samples, decode_fec=True
+                )
+            # 空数据包触发Opus解码器的丢包隐藏
+            return self.opus_decoder.decode(b"", self._last_decoded_samples)
+        except opuslib.OpusError as e:
+            logger.debug(f"丢包补偿失败: {e}")
+            return None
 
     def close(self):
         """（优化资源释放顺序和线程安全性）"""
@@ -331,7 +736,7 @@ class AudioCodec:
             self.clear_audio_queue()
 
             # 安全停止和关闭流
-            with self._stream_lock:
+            with self._stream_lock, self._output_lock:
                 # 先关闭输入流
                 if self.input_stream:
                     try:
@@ -369,6 +774,20 @@ class AudioCodec:
                     finally:
                         self.audio = None
 
+            # 唤醒并等待采集线程退出，关闭所有订阅
+            self._capture_ring = None
+            self._frame_ready.set()
+            if (
+                self._capture_thread
+                and self._capture_thread is not threading.current_thread()
+            ):
+                self._capture_thread.join(timeout=1.0)
+            self._capture_thread = None
+            self.capture_bus.close()
+            if self._echo_canceller is not None:
+                self._echo_canceller.close()
+                self._echo_canceller = None
+
             # 清理编解码器
             self.opus_encoder = None
             self.opus_decoder = None
@@ -378,20 +797,16 @@ class AudioCodec:
             logger.error(f"关闭音频编解码器过程中发生错误: {e}")
         # 移除冗余的状态重置
 
-    def write_audio(self, opus_data):
-        """将Opus数据写入播放队列，处理队列满的情况"""
-        try:
-            # 非阻塞方式放入队列
-            self.audio_decode_queue.put_nowait(opus_data)
-        except queue.Full:
-            # 队列满时，移除最旧的数据，添加新数据
+    def write_audio(self, opus_data, sequence=None):
+        """将Opus数据写入抖动缓冲区
+
+        Args:
+            opus_data: Opus数据包
+            sequence: 数据包序号（MQTT/UDP通道提供），None时按到达顺序排列
+        """
+        if self.audio_decode_queue.qsize() >= self.audio_decode_queue.maxsize:
             logger.warning("音频播放队列已满，丢弃最旧的音频帧")
-            try:
-                self.audio_decode_queue.get_nowait()  # 移除最旧的
-                self.audio_decode_queue.put_nowait(opus_data)  # 添加新的
-            except queue.Empty:
-                # 如果队列突然变空，直接添加
-                self.audio_decode_queue.put_nowait(opus_data)
+        self.audio_decode_queue.put(opus_data, sequence)
 
     # has_pending_audio 方法已移除（可直接使用 not audio_decode_queue.empty()）
 
@@ -403,12 +818,38 @@ class AudioCodec:
             "current_size": queue_size,
             "max_size": max_size,
             "is_empty": queue_size == 0,
+            "jitter_buffer": self.audio_decode_queue.get_stats(),
+            "capture_bus": self.capture_bus.get_stats(),
+            "playback": self.get_playback_stats(),
+            "echo_cancellation": (
+                self._echo_canceller.get_stats() if self._echo_canceller else None
+            ),
+        }
+
+    def get_playback_stats(self):
+        """获取播放环形缓冲区状态（仅回调播放模式有缓冲区）"""
+        ring = self._playback_ring
+        return {
+            "mode": self.playback_mode,
+            "buffered_ms": (
+                round(ring.available() * 1000 / AudioConfig.OUTPUT_SAMPLE_RATE, 1)
+                if ring is not None
+                else 0.0
+            ),
+            "underruns": self.playback_underruns,
         }
 
+    def _has_buffered_playback(self):
+        """抖动缓冲区或播放环形缓冲区中是否还有未播放的音频"""
+        ring = self._playback_ring
+        return not self.audio_decode_queue.empty() or (
+            ring is not None and ring.available() > 0
+        )
+
     def wait_for_audio_complete(self, timeout=5.0):
         """等待音频播放完成（简化版）"""
         start = time.time()
-        while not self.audio_decode_queue.empty() and time.time() - start < timeout:
+        while self._has_buffered_playback() and time.time() - start < timeout:
             time.sleep(0.1)
 
         if not self.audio_decode_queue.empty():
@@ -416,22 +857,29 @@ class AudioCodec:
             logger.warning(f"音频播放超时，剩余队列: {remaining} 帧")
 
     def clear_audio_queue(self):
-        with self._stream_lock:
-            cleared_count = 0
-            while not self.audio_decode_queue.empty():
-                try:
-                    self.audio_decode_queue.get_nowait()
-                    cleared_count += 1
-                except queue.Empty:
-                    break
+        with self._output_lock:
+            cleared_count = self.audio_decode_queue.clear()
             if cleared_count > 0:
                 logger.info(f"清空音频队列，丢弃 {cleared_count} 帧音频数据")
+        # 已解码的PCM由回调线程丢弃
+        if self._playback_ring is not None:
+            self._playback_flush = True
 
     # start_streams 方法已移除（功能冗余，可直接调用各流的 start_stream）
 
+    def ensure_output_stream_active(self):
+        """确保输出流处于活跃状态，必要时重新初始化"""
+        output_stream = self.output_stream
+        if output_stream and not output_stream.is_active():
+            try:
+                output_stream.start_stream()
+            except Exception as e:
+                logger.warning(f"启动输出流失败，尝试重新初始化: {e}")
+                self._reinitialize_stream(is_input=False)
+
     def stop_streams(self):
         """安全停止流（优化错误处理）"""
-        with self._stream_lock:
+        with self._stream_lock, self._output_lock:
             for name, stream in [
                 ("输入", self.input_stream),
                 ("输出", self.output_stream),
@@ -446,32 +894,25 @@ class AudioCodec:
                         logger.warning(f"停止{name}流失败: {e}")
 
     def _resample_audio(self, audio_data):
-        """音频重采样处理"""
+        """音频重采样处理
+
+        使用流式多相滤波器，滤波器状态在帧之间保持连续；
+        输出按INPUT_FRAME_SIZE重新切分，不足一帧时返回None。
+        """
         try:
-            # 将字节数据转换为numpy数组
-            audio_samples = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32)
-            
-            # 添加到重采样缓冲区
-            self.resample_buffer = np.concatenate([self.resample_buffer, audio_samples])
-            
-            # 计算需要的输入样本数以产生目标输出样本数
-            input_samples_needed = int(AudioConfig.INPUT_FRAME_SIZE / self.resample_ratio)
-            
-            if len(self.resample_buffer) < input_samples_needed:
-                # 缓冲区样本不足，返回None等待更多数据
+            resampled = self._input_resampler.process(audio_data)
+            if not self._resample_fifo.write(resampled):
+                # 消费端长时间未读取，丢弃积压后重新写入
+                self._resample_fifo.skip(self._resample_fifo.available())
+                self._resample_fifo.write(resampled)
+
+            frame = self._resample_fifo.read(
+                AudioConfig.INPUT_FRAME_SIZE, out=self._resample_frame
+            )
+            if frame is None:
                 return None
-            
-            # 提取需要的样本进行重采样
-            samples_to_process = self.resample_buffer[:input_samples_needed]
-            self.resample_buffer = self.resample_buffer[input_samples_needed:]
-            
-            # 使用scipy进行重采样
-            resampled = scipy.signal.resample(samples_to_process, AudioConfig.INPUT_FRAME_SIZE)
-            
-            # 转换回int16并返回字节数据
-            resampled_int16 = np.clip(resampled, -32768, 32767).astype(np.int16)
-            return resampled_int16.tobytes()
-            
+            return frame.tobytes()
+
         except Exception as e:
             logger.error(f"音频重采样失败: {e}")
             return None
@@ -0,0 +1,160 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from src.constants.constants import AudioConfig, DeviceState
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class AsyncAudioPipeline:
+    """asyncio原生的音频会话管线
+
+    采集→编码→发送、接收→解码→播放两条链路都作为协程运行在同一个事件循环上，
+    发送直接在循环内await，不再为每一帧创建跨线程Future和Task。
+    设备读取由AudioCodec的采集线程完成，阻塞的播放写入放到专用的单线程执行器中。
+    """
+
+    def __init__(self, audio_codec, protocol, loop):
+        """初始化音频管线
+
+        Args:
+            audio_codec: AudioCodec实例
+            protocol: 通信协议实例
+            loop: 运行管线的事件循环
+        """
+        self.audio_codec = audio_codec
+        self.protocol = protocol
+        self.loop = loop
+
+        self.device_state = DeviceState.IDLE
+        self.running = False
+        self._tasks = []
+
+        # 播放写入使用独立的单线程执行器，不阻塞事件循环
+        self._playback_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="AudioPlayback"
+        )
+
+        # 以下事件只在事件循环线程中访问
+        self._listening = asyncio.Event()
+        self._capture_ready = asyncio.Event()
+        self._playback_ready = asyncio.Event()
+        # 跨线程唤醒合并标志，避免每帧都投递一次回调
+        self._capture_wakeup_pending = False
+
+    def start(self):
+        """启动管线协程（需在事件循环线程中调用）"""
+        if self.running:
+            return
+        self.running = True
+        self._tasks = [
+            self.loop.create_task(self._capture_loop()),
+            self.loop.create_task(self._playback_loop()),
+        ]
+        logger.info("异步音频管线已启动")
+
+    async def stop(self):
+        """停止管线并释放执行器"""
+        if not self.running:
+            return
+        self.running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._playback_executor.shutdown(wait=False)
+        logger.info("异步音频管线已停止")
+
+    def notify_capture_ready(self):
+        """采集回调通知有完整帧可读（可在任意线程调用）"""
+        if self._capture_wakeup_pending:
+            return
+        self._capture_wakeup_pending = True
+        self.loop.call_soon_threadsafe(self._wake_capture)
+
+    def _wake_capture(self):
+        self._capture_wakeup_pending = False
+        self._capture_ready.set()
+
+    def notify_playback_ready(self):
+        """有新的音频数据入队（需在事件循环线程中调用）"""
+        self._playback_ready.set()
+
+    def notify_playback_space_available(self):
+        """播放环形缓冲区腾出了空间（在输出回调中调用）"""
+        self.loop.call_soon_threadsafe(self._playback_ready.set)
+
+    def set_device_state(self, state):
+        """同步设备状态（可在任意线程调用）"""
+        self.loop.call_soon_threadsafe(self._apply_device_state, state)
+
+    def _apply_device_state(self, state):
+        self.device_state = state
+        if state == DeviceState.LISTENING:
+            self._listening.set()
+        else:
+            self._listening.clear()
+        if state == DeviceState.SPEAKING:
+            self._playback_ready.set()
+
+    async def _capture_loop(self):
+        """采集→编码→发送"""
+        frame_duration = AudioConfig.FRAME_DURATION / 1000
+        while self.running:
+            try:
+                await self._listening.wait()
+                await self._capture_ready.wait()
+                self._capture_ready.clear()
+
+                # 从采集总线取帧和编码都是非阻塞的，直接在循环内完成
+                while self.device_state == DeviceState.LISTENING:
+                    encoded_data = self.audio_codec.read_audio()
+                    if not encoded_data:
+                        break
+                    await self._send_audio(encoded_data)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"音频采集管线出错: {e}")
+                await asyncio.sleep(frame_duration)
+
+    async def _send_audio(self, encoded_data):
+        if self.protocol and self.protocol.is_audio_channel_opened():
+            await self.protocol.send_audio(encoded_data)
+
+    async def _playback_loop(self):
+        """解码→播放"""
+        timeout = None
+        while self.running:
+            try:
+                if timeout is None:
+                    await self._playback_ready.wait()
+                else:
+                    # 有新数据入队或下一帧到期时继续
+                    try:
+                        await asyncio.wait_for(self._playback_ready.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                self._playback_ready.clear()
+                timeout = None
+                while (
+                    self.device_state == DeviceState.SPEAKING
+                    and not self.audio_codec.audio_decode_queue.empty()
+                ):
+                    played = await self.loop.run_in_executor(
+                        self._playback_executor, self._play_pending
+                    )
+                    if not played:
+                        # 等抖动缓冲区的下一帧到期，或等输出回调腾出播放空间
+                        timeout = self.audio_codec.playback_wait_timeout()
+                        break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"音频播放管线出错: {e}")
+
+    def _play_pending(self):
+        """在播放执行器中解码并写入输出流"""
+        self.audio_codec.ensure_output_stream_active()
+        return self.audio_codec.play_audio()
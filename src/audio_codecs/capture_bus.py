@@ -0,0 +1,158 @@
+import threading
+from collections import deque
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class DropPolicy:
+    """订阅队列已满时的丢弃策略"""
+
+    DROP_OLDEST = "drop_oldest"  # 丢弃最旧的帧，保证拿到最新音频
+    DROP_NEWEST = "drop_newest"  # 丢弃新到的帧，保证音频连续
+
+
+class CaptureSubscription:
+    """采集总线的一个订阅者，拥有独立的有界队列和丢弃策略"""
+
+    def __init__(self, bus, name, max_frames, drop_policy):
+        self.bus = bus
+        self.name = name
+        self.max_frames = max(1, int(max_frames))
+        self.drop_policy = drop_policy
+        self.delivered = 0
+        self.dropped = 0
+        self.closed = False
+
+        self._frames = deque()
+        self._cond = threading.Condition()
+
+    def _offer(self, frame):
+        """总线投递一帧（采集线程调用）"""
+        with self._cond:
+            if len(self._frames) >= self.max_frames:
+                self.dropped += 1
+                if self.drop_policy == DropPolicy.DROP_NEWEST:
+                    return
+                self._frames.popleft()
+            self._frames.append(frame)
+            self.delivered += 1
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """等待并取出一帧
+
+        Returns:
+            memoryview: 只读的帧视图，超时或订阅已关闭时返回None
+        """
+        with self._cond:
+            if not self._frames and not self.closed:
+                self._cond.wait(timeout)
+            if self._frames:
+                return self._frames.popleft()
+            return None
+
+    def get_nowait(self):
+        """非阻塞取出一帧，没有数据时返回None"""
+        with self._cond:
+            if self._frames:
+                return self._frames.popleft()
+            return None
+
+    def clear(self):
+        """清空队列，返回丢弃的帧数"""
+        with self._cond:
+            count = len(self._frames)
+            self._frames.clear()
+            return count
+
+    def qsize(self):
+        return len(self._frames)
+
+    def close(self):
+        """取消订阅并唤醒等待中的读取方"""
+        self.bus.unsubscribe(self)
+
+    def _mark_closed(self):
+        with self._cond:
+            self.closed = True
+            self._frames.clear()
+            self._cond.notify_all()
+
+    def get_stats(self):
+        return {
+            "queued": len(self._frames),
+            "max_frames": self.max_frames,
+            "drop_policy": self.drop_policy,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+class CaptureBus:
+    """麦克风采集扇出总线
+
+    设备上的每一帧只读取一次，发布时包装为只读memoryview，
+    同一份数据零拷贝地投递给所有订阅者（编码发送、唤醒词、VAD等）。
+    订阅者如需更小的分析窗口，直接对memoryview切片即可，同样不产生拷贝。
+    整帧视图的obj属性就是发布时的bytes对象。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 写时复制，发布时无需加锁遍历
+        self._subscribers = ()
+        self.frames_published = 0
+
+    def subscribe(self, name, max_frames=10, drop_policy=DropPolicy.DROP_OLDEST):
+        """新增订阅
+
+        Args:
+            name: 订阅者名称，用于日志和统计
+            max_frames: 队列最多缓存的帧数
+            drop_policy: 队列已满时的丢弃策略
+
+        Returns:
+            CaptureSubscription
+        """
+        subscription = CaptureSubscription(self, name, max_frames, drop_policy)
+        with self._lock:
+            self._subscribers = self._subscribers + (subscription,)
+        logger.info(f"采集总线新增订阅: {name} (队列{max_frames}帧, {drop_policy})")
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """取消订阅"""
+        with self._lock:
+            self._subscribers = tuple(
+                s for s in self._subscribers if s is not subscription
+            )
+        subscription._mark_closed()
+        logger.info(f"采集总线取消订阅: {subscription.name}")
+
+    def publish(self, frame):
+        """发布一帧PCM数据（采集线程调用）
+
+        Args:
+            frame: 一帧PCM的bytes，发布后不可再修改
+        """
+        view = memoryview(frame)
+        for subscription in self._subscribers:
+            subscription._offer(view)
+        self.frames_published += 1
+
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def close(self):
+        """关闭总线，取消所有订阅"""
+        for subscription in self._subscribers:
+            self.unsubscribe(subscription)
+
+    def get_stats(self):
+        """获取各订阅者的统计信息"""
+        return {
+            "frames_published": self.frames_published,
+            "subscribers": {s.name: s.get_stats() for s in self._subscribers},
+        }
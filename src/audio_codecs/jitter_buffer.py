@@ -0,0 +1,245 @@
+import math
+import threading
+import time
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class FrameStatus:
+    """抖动缓冲区出队结果类型"""
+
+    PACKET = "packet"  # 正常数据包
+    FEC = "fec"  # 当前包丢失，用下一包的带内FEC恢复
+    PLC = "plc"  # 当前包丢失且无FEC可用，需要丢包隐藏
+
+
+class JitterBuffer:
+    """按序号排序的自适应抖动缓冲区
+
+    - 有序号时（MQTT/UDP nonce中的序列号）按序号重排，没有序号时按到达顺序编号
+    - 迟到和重复的数据包直接丢弃
+    - 目标缓冲深度根据到达抖动（RFC 3550算法，只统计迟到方向）自适应调整
+    - 缺包时按目标深度/最长等待时间决定何时放弃等待，交给解码器做FEC或PLC
+    """
+
+    def __init__(self, frame_duration_ms, min_depth=1, max_depth=10, capacity=500):
+        """初始化抖动缓冲区
+
+        Args:
+            frame_duration_ms: 每个数据包的时长(毫秒)
+            min_depth: 最小目标缓冲深度(包数)
+            max_depth: 最大目标缓冲深度(包数)
+            capacity: 缓冲区最多保存的数据包数量
+        """
+        self.frame_duration_ms = frame_duration_ms
+        self.min_depth = max(1, int(min_depth))
+        self.max_depth = max(self.min_depth, int(max_depth))
+        self.maxsize = int(capacity)
+        self.target_depth = self.min_depth
+
+        self._lock = threading.Lock()
+        self._packets = {}
+        self._next_seq = None  # 下一个应播放的序号
+        self._arrival_seq = 0  # 无序号时的到达编号
+        self._buffering = True  # 是否处于预缓冲阶段
+        self._wait_since = None  # 开始等待（预缓冲或缺包）的时间
+
+        # 抖动估计
+        self._jitter_ms = 0.0
+        self._last_arrival = None
+        self._last_arrival_seq = None
+
+        self._stats = self._new_stats()
+
+    @staticmethod
+    def _new_stats():
+        return {
+            "received": 0,
+            "played": 0,
+            "fec": 0,
+            "plc": 0,
+            "late": 0,
+            "duplicates": 0,
+            "overflow_drops": 0,
+            "underruns": 0,
+        }
+
+    def put(self, data, sequence=None):
+        """放入数据包
+
+        Args:
+            data: Opus数据包
+            sequence: 数据包序号，None表示按到达顺序编号
+
+        Returns:
+            bool: 是否被接收（迟到或重复的数据包返回False）
+        """
+        now = time.monotonic()
+        with self._lock:
+            if sequence is None:
+                sequence = self._arrival_seq
+            self._arrival_seq = sequence + 1
+            self._stats["received"] += 1
+
+            if self._next_seq is not None and sequence < self._next_seq:
+                self._stats["late"] += 1
+                return False
+            if sequence in self._packets:
+                self._stats["duplicates"] += 1
+                return False
+
+            self._update_jitter(sequence, now)
+
+            if len(self._packets) >= self.maxsize:
+                # 缓冲区已满，丢弃最旧的数据包
+                oldest = min(self._packets)
+                del self._packets[oldest]
+                self._stats["overflow_drops"] += 1
+                if self._next_seq is not None and self._next_seq <= oldest:
+                    self._next_seq = oldest + 1
+
+            self._packets[sequence] = data
+            return True
+
+    def _update_jitter(self, sequence, now):
+        """更新到达抖动估计和目标缓冲深度"""
+        if self._last_arrival is not None and sequence > self._last_arrival_seq:
+            expected_ms = (sequence - self._last_arrival_seq) * self.frame_duration_ms
+            actual_ms = (now - self._last_arrival) * 1000
+            # 只关心比预期更晚到达的情况，服务端突发推送不会抬高抖动
+            lateness = max(0.0, actual_ms - expected_ms)
+            self._jitter_ms += (lateness - self._jitter_ms) / 16
+            target = self.min_depth + math.ceil(
+                2 * self._jitter_ms / self.frame_duration_ms
+            )
+            self.target_depth = min(self.max_depth, target)
+        if self._last_arrival_seq is None or sequence > self._last_arrival_seq:
+            self._last_arrival = now
+            self._last_arrival_seq = sequence
+
+    def pop(self):
+        """取出下一帧
+
+        Returns:
+            (status, data): status为FrameStatus之一；PACKET/FEC时data为要解码的数据包，
+            PLC时data为None。没有可播放的帧时返回(None, None)
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not self._packets:
+                if not self._buffering:
+                    self._stats["underruns"] += 1
+                self._buffering = True
+                self._wait_since = None
+                return None, None
+
+            if self._next_seq is None:
+                self._next_seq = min(self._packets)
+
+            max_wait = self.target_depth * self.frame_duration_ms / 1000
+
+            # 预缓冲：攒够目标深度（或等待超时）后再开始播放
+            if self._buffering:
+                if self._wait_since is None:
+                    self._wait_since = now
+                if (
+                    len(self._packets) < self.target_depth
+                    and now - self._wait_since < max_wait
+                ):
+                    return None, None
+                self._buffering = False
+                self._wait_since = None
+                if self._next_seq not in self._packets:
+                    # 预缓冲期间更早的包没到，从最早的包开始
+                    self._next_seq = min(self._packets)
+
+            seq = self._next_seq
+            data = self._packets.pop(seq, None)
+            if data is not None:
+                self._next_seq = seq + 1
+                self._wait_since = None
+                self._stats["played"] += 1
+                return FrameStatus.PACKET, data
+
+            # 序号跳变过大（如服务端重置序号），直接跳到最早的包重新同步
+            earliest = min(self._packets)
+            if earliest - seq > self.max_depth:
+                logger.debug(f"序号从{seq}跳变到{earliest}，重新同步")
+                self._next_seq = earliest + 1
+                self._wait_since = None
+                self._stats["played"] += 1
+                return FrameStatus.PACKET, self._packets.pop(earliest)
+
+            # 缺包：缓冲足够深或等待超时才放弃，否则继续等待迟到的包
+            if self._wait_since is None:
+                self._wait_since = now
+            if (
+                len(self._packets) < self.target_depth
+                and now - self._wait_since < max_wait
+            ):
+                return None, None
+
+            self._wait_since = None
+            self._next_seq = seq + 1
+            next_data = self._packets.get(seq + 1)
+            if next_data is not None:
+                self._stats["fec"] += 1
+                return FrameStatus.FEC, next_data
+            self._stats["plc"] += 1
+            return FrameStatus.PLC, None
+
+    def time_until_next(self):
+        """距离pop()可以取出下一帧还要等待的时间
+
+        Returns:
+            float: 秒数，0表示现在就可以取出；缓冲区为空时返回None，由新包入队唤醒
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not self._packets:
+                return None
+            if len(self._packets) >= self.target_depth:
+                return 0.0
+            if not self._buffering:
+                seq = self._next_seq
+                if seq in self._packets or min(self._packets) - seq > self.max_depth:
+                    return 0.0
+
+            max_wait = self.target_depth * self.frame_duration_ms / 1000
+            if self._wait_since is None:
+                return max_wait
+            return max(0.0, self._wait_since + max_wait - now)
+
+    def clear(self):
+        """清空缓冲区，返回丢弃的数据包数量"""
+        with self._lock:
+            count = len(self._packets)
+            self._packets.clear()
+            self._next_seq = None
+            self._arrival_seq = 0
+            self._buffering = True
+            self._wait_since = None
+            self._last_arrival = None
+            self._last_arrival_seq = None
+            return count
+
+    def qsize(self):
+        return len(self._packets)
+
+    def empty(self):
+        return not self._packets
+
+    def get_stats(self):
+        """获取统计信息"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(
+                {
+                    "depth": len(self._packets),
+                    "target_depth": self.target_depth,
+                    "jitter_ms": round(self._jitter_ms, 2),
+                }
+            )
+            return stats
@@ -0,0 +1,253 @@
+import os
+import platform
+import time
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class OpusProfile:
+    """编码器预设"""
+
+    AUTO = "auto"  # 根据硬件自动选择
+    BALANCED = "balanced"  # 桌面电脑：高复杂度，码率范围较大
+    LOW_CPU = "low_cpu"  # 树莓派等弱CPU设备：低复杂度，丢包较严重时才开启FEC
+
+
+# 带内FEC只存在于SILK层，开启后编码器不再使用更省CPU的CELT模式，
+# 因此弱CPU预设在预期丢包更高时才开启FEC
+PROFILE_SETTINGS = {
+    OpusProfile.BALANCED: {
+        "bitrate": 24000,
+        "min_bitrate": 12000,
+        "max_bitrate": 32000,
+        "complexity": 10,
+        "min_complexity": 5,
+        "fec_on_percent": 2,
+    },
+    OpusProfile.LOW_CPU: {
+        "bitrate": 16000,
+        "min_bitrate": 12000,
+        "max_bitrate": 24000,
+        "complexity": 1,
+        "min_complexity": 0,
+        "fec_on_percent": 5,
+    },
+}
+
+
+def detect_profile():
+    """Linux下的ARM设备且核心数不超过4时视为弱CPU设备"""
+    machine = platform.machine().lower()
+    if (
+        platform.system() == "Linux"
+        and machine.startswith(("arm", "aarch64"))
+        and (os.cpu_count() or 1) <= 4
+    ):
+        return OpusProfile.LOW_CPU
+    return OpusProfile.BALANCED
+
+
+class OpusEncoderController:
+    """根据网络反馈和编码耗时动态调整Opus编码参数
+
+    每隔update_interval秒（在编码线程中）评估一次：
+
+    - 码率：发送队列积压或丢帧时乘性降低，链路空闲且丢包低时加性恢复
+    - 预期丢包率和带内FEC：按平滑后的丢包率设置，FEC开关带滞回，避免频繁切换
+    - 复杂度：平均编码耗时超过帧时长的30%时降低，低于10%时逐步恢复到预设值
+
+    网络反馈由feedback_provider提供，返回Protocol.get_network_stats格式的字典。
+    """
+
+    MAX_LOSS_PERCENT = 30
+
+    def __init__(
+        self,
+        encoder,
+        frame_duration_ms,
+        profile=OpusProfile.AUTO,
+        adaptive=True,
+        update_interval=1.0,
+    ):
+        """
+        Args:
+            encoder: opuslib.Encoder实例
+            frame_duration_ms: 每帧时长（毫秒），用于评估编码耗时
+            profile: 编码器预设，见OpusProfile
+            adaptive: 是否根据反馈动态调整，关闭时只应用预设
+            update_interval: 评估间隔（秒）
+        """
+        if profile == OpusProfile.AUTO:
+            profile = detect_profile()
+        if profile not in PROFILE_SETTINGS:
+            logger.warning(f"未知的Opus编码预设 {profile}，使用balanced")
+            profile = OpusProfile.BALANCED
+
+        self.encoder = encoder
+        self.frame_duration_ms = frame_duration_ms
+        self.profile = profile
+        self.adaptive = adaptive
+        self.update_interval = update_interval
+        # 返回网络统计字典的可调用对象
+        self.feedback_provider = None
+
+        settings = PROFILE_SETTINGS[profile]
+        self.min_bitrate = settings["min_bitrate"]
+        self.max_bitrate = settings["max_bitrate"]
+        self.max_complexity = settings["complexity"]
+        self.min_complexity = settings["min_complexity"]
+        # FEC开关的滞回区间
+        self.fec_on_percent = settings["fec_on_percent"]
+        self.fec_off_percent = max(1, self.fec_on_percent // 2)
+
+        self.bitrate = settings["bitrate"]
+        self.complexity = self.max_complexity
+        self.inband_fec = False
+        self.packet_loss_perc = 0
+
+        self._loss = 0.0
+        self._encode_ms = None
+        self._last_update = time.monotonic()
+        self._last_sent = None
+        self._last_dropped = None
+        self.adjustments = 0
+
+        self._apply()
+        logger.info(
+            f"Opus编码预设: {profile}, 码率{self.bitrate}, 复杂度{self.complexity}, "
+            f"自适应{'开启' if adaptive else '关闭'}"
+        )
+
+    def record_encode_time(self, seconds):
+        """记录一帧的编码耗时（编码线程调用）"""
+        encode_ms = seconds * 1000
+        if self._encode_ms is None:
+            self._encode_ms = encode_ms
+        else:
+            self._encode_ms += (encode_ms - self._encode_ms) / 16
+
+    def maybe_update(self):
+        """距上次评估超过update_interval时调整参数（编码线程调用）
+
+        Returns:
+            bool: 参数是否有变化
+        """
+        if not self.adaptive:
+            return False
+        now = time.monotonic()
+        if now - self._last_update < self.update_interval:
+            return False
+        self._last_update = now
+
+        feedback = None
+        if self.feedback_provider:
+            try:
+                feedback = self.feedback_provider()
+            except Exception as e:
+                logger.debug(f"获取网络统计失败: {e}")
+        return self.update(feedback)
+
+    def update(self, feedback):
+        """根据一次网络反馈和编码耗时调整参数
+
+        Args:
+            feedback: 网络统计字典，可包含loss_rate、queue_depth、queue_capacity、
+                      audio_sent、audio_dropped；没有网络反馈时为None
+
+        Returns:
+            bool: 参数是否有变化
+        """
+        previous = (
+            self.bitrate,
+            self.complexity,
+            self.inband_fec,
+            self.packet_loss_perc,
+        )
+        if feedback:
+            self._update_network(feedback)
+        self._update_complexity()
+
+        changed = previous != (
+            self.bitrate,
+            self.complexity,
+            self.inband_fec,
+            self.packet_loss_perc,
+        )
+        if changed:
+            self.adjustments += 1
+            self._apply()
+            logger.info(
+                f"调整Opus编码参数: 码率{self.bitrate}, 复杂度{self.complexity}, "
+                f"FEC{'开启' if self.inband_fec else '关闭'}, "
+                f"预期丢包{self.packet_loss_perc}%"
+            )
+        return changed
+
+    def _update_network(self, feedback):
+        # 本周期内发送队列丢弃的帧对服务端而言等同于丢包
+        drop_rate = 0.0
+        sent = feedback.get("audio_sent")
+        dropped = feedback.get("audio_dropped")
+        if sent is not None and dropped is not None:
+            if self._last_sent is not None:
+                delta_sent = max(0, sent - self._last_sent)
+                delta_dropped = max(0, dropped - self._last_dropped)
+                if delta_sent + delta_dropped:
+                    drop_rate = delta_dropped / (delta_sent + delta_dropped)
+            self._last_sent = sent
+            self._last_dropped = dropped
+
+        loss = max(feedback.get("loss_rate") or 0.0, drop_rate)
+        self._loss += (loss - self._loss) / 2
+        self.packet_loss_perc = min(self.MAX_LOSS_PERCENT, round(self._loss * 100))
+        if self.packet_loss_perc >= self.fec_on_percent:
+            self.inband_fec = True
+        elif self.packet_loss_perc < self.fec_off_percent:
+            self.inband_fec = False
+
+        capacity = feedback.get("queue_capacity") or 0
+        fill = feedback.get("queue_depth", 0) / capacity if capacity else 0.0
+        if fill >= 0.5 or drop_rate > 0:
+            self.bitrate = max(self.min_bitrate, int(self.bitrate * 0.75))
+        elif fill <= 0.1 and self._loss < 0.05:
+            self.bitrate = min(self.max_bitrate, self.bitrate + 2000)
+
+    def _update_complexity(self):
+        if self._encode_ms is None:
+            return
+        budget = self.frame_duration_ms
+        if self._encode_ms > budget * 0.3:
+            self.complexity = max(self.min_complexity, self.complexity - 2)
+        elif self._encode_ms < budget * 0.1:
+            self.complexity = min(self.max_complexity, self.complexity + 1)
+
+    def _apply(self):
+        """把当前参数写入编码器"""
+        try:
+            # 编码器已创建说明opus库已加载
+            from opuslib.api import ctl
+            from opuslib.api.encoder import encoder_ctl
+
+            encoder = self.encoder
+            encoder.bitrate = self.bitrate
+            encoder.complexity = self.complexity
+            # opuslib的inband_fec属性setter丢失了参数，直接调用ctl
+            encoder_ctl(encoder.encoder_state, ctl.set_inband_fec, int(self.inband_fec))
+            encoder.packet_loss_perc = self.packet_loss_perc
+        except Exception as e:
+            logger.error(f"设置Opus编码参数失败: {e}")
+
+    def get_stats(self):
+        """获取当前编码参数和调整次数"""
+        return {
+            "profile": self.profile,
+            "adaptive": self.adaptive,
+            "bitrate": self.bitrate,
+            "complexity": self.complexity,
+            "inband_fec": self.inband_fec,
+            "packet_loss_perc": self.packet_loss_perc,
+            "encode_ms": round(self._encode_ms, 3) if self._encode_ms else None,
+            "adjustments": self.adjustments,
+        }
@@ -0,0 +1,65 @@
+import ctypes
+
+import numpy as np
+
+# 在导入opuslib之前先设置opus库
+from src.utils.opus_loader import setup_opus
+
+setup_opus()
+import opuslib
+from opuslib.api import c_int16_pointer
+from opuslib.api.decoder import libopus_decode
+
+
+class OpusFrameDecoder:
+    """解码到预分配缓冲区的Opus解码器
+
+    opuslib.Decoder.decode每帧都会新建ctypes数组，再经Python列表和array.array
+    转换成bytes。这里直接调用opus_decode，把PCM写入构造时分配好的numpy数组，
+    返回其切片视图，解码一帧不产生任何中间对象。
+
+    返回的视图在下一次decode前有效，调用方需在此之前写入输出流或拷贝走。
+    """
+
+    def __init__(self, sample_rate, channels, max_frame_size):
+        """
+        Args:
+            sample_rate: 输出采样率
+            channels: 声道数
+            max_frame_size: 单帧最大样本数（每声道），决定预分配缓冲区大小
+        """
+        self.decoder = opuslib.Decoder(sample_rate, channels)
+        self.channels = channels
+        self.max_frame_size = max_frame_size
+        self._pcm = np.zeros(max_frame_size * channels, dtype=np.int16)
+        self._pcm_pointer = ctypes.cast(self._pcm.ctypes.data, c_int16_pointer)
+
+    def decode(self, opus_data, frame_size, decode_fec=False):
+        """解码一帧
+
+        Args:
+            opus_data: Opus数据包，空数据触发丢包隐藏(PLC)
+            frame_size: 期望输出的样本数（每声道），不超过max_frame_size
+            decode_fec: 是否用该包中的带内FEC数据恢复前一帧
+
+        Returns:
+            numpy int16数组视图，指向内部缓冲区
+
+        Raises:
+            opuslib.OpusError: 解码失败
+        """
+        frame_size = min(frame_size, self.max_frame_size)
+        if opus_data and not isinstance(opus_data, bytes):
+            # c_char_p只接受bytes
+            opus_data = bytes(opus_data)
+        result = libopus_decode(
+            self.decoder.decoder_state,
+            opus_data or None,
+            len(opus_data) if opus_data else 0,
+            self._pcm_pointer,
+            frame_size,
+            int(decode_fec),
+        )
+        if result < 0:
+            raise opuslib.OpusError(result)
+        return self._pcm[: result * self.channels]
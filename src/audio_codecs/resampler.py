@@ -0,0 +1,196 @@
+import math
+
+import numpy as np
+import scipy.signal
+from numpy.lib.stride_tricks import as_strided
+
+# 与scipy.signal.resample_poly相同的滤波器设计参数
+_HALF_LEN_FACTOR = 10
+_KAISER_BETA = 5.0
+
+# 滤波器组按(输入采样率, 输出采样率)缓存，多个实例共享
+_filter_bank_cache = {}
+
+
+def _design_filter_bank(up, down):
+    """设计多相FIR滤波器组
+
+    Returns:
+        numpy数组，形状为(up, taps_per_phase)，每行是一个相位的系数（已反转，
+        便于直接与输入窗口做点积）
+    """
+    key = (up, down)
+    bank = _filter_bank_cache.get(key)
+    if bank is not None:
+        return bank
+
+    max_rate = max(up, down)
+    half_len = _HALF_LEN_FACTOR * max_rate
+    taps = scipy.signal.firwin(
+        2 * half_len + 1, 1.0 / max_rate, window=("kaiser", _KAISER_BETA)
+    )
+    taps *= up
+
+    # 补零到up的整数倍后拆分为多相结构：bank[p, k] = h[p + k * up]
+    taps_per_phase = math.ceil(len(taps) / up)
+    padded = np.zeros(taps_per_phase * up, dtype=np.float64)
+    padded[: len(taps)] = taps
+    bank = padded.reshape(taps_per_phase, up).T[:, ::-1]
+    bank = np.ascontiguousarray(bank, dtype=np.float32)
+
+    _filter_bank_cache[key] = bank
+    return bank
+
+
+class StreamingResampler:
+    """流式多相FIR重采样器
+
+    滤波器组预先计算并缓存，帧与帧之间保留滤波器历史样本，
+    不会像逐帧FFT重采样那样在帧边界产生失真。
+    采样位置按up/down周期重复，整帧计算归结为一次跨步视图的矩阵乘法，
+    系数矩阵按相位缓存，输出写入预分配的缓冲区。
+
+    适用于44.1k/48k→16k的麦克风采集以及16k→24k/48k等任意有理数比例。
+    """
+
+    # 系数矩阵缓存的最大条目数（固定帧长时通常只有一个）
+    _MAX_MATRIX_CACHE = 8
+    # 每个周期至少产生的输出样本数
+    _MIN_CYCLE_OUTPUTS = 32
+
+    def __init__(self, input_rate, output_rate):
+        """初始化重采样器
+
+        Args:
+            input_rate: 输入采样率
+            output_rate: 输出采样率
+        """
+        self.input_rate = int(input_rate)
+        self.output_rate = int(output_rate)
+        g = math.gcd(self.input_rate, self.output_rate)
+        self.up = self.output_rate // g
+        self.down = self.input_rate // g
+        self.passthrough = self.up == self.down
+
+        if self.passthrough:
+            self._bank = None
+            self._taps = 1
+        else:
+            self._bank = _design_filter_bank(self.up, self.down)
+            self._taps = self._bank.shape[1]
+
+        # 输入缓冲区：前taps-1个样本为上一帧留下的滤波器历史
+        self._history = self._taps - 1
+        self._input = np.zeros(self._history, dtype=np.float32)
+        self._output = np.empty(0, dtype=np.float32)
+        self._output_int16 = np.empty(0, dtype=np.int16)
+        # 矩阵乘法的一个周期：消耗cycle_in个输入，产生cycle_out个输出。
+        # up较小时（如48k→16k）把多个up/down周期合并，让每行矩阵乘法足够宽
+        group = max(1, -(-self._MIN_CYCLE_OUTPUTS // self.up))
+        self._cycle_out = self.up * group
+        self._cycle_in = self.down * group
+        # 一个周期内所有输出窗口覆盖的输入跨度
+        self._span = self._cycle_in + self._taps - 1
+
+        # 下一个输出样本的位置，单位为1/up个输入样本，相对于本帧第一个新样本
+        self._t = 0
+        self._matrices = {}
+
+    def reset(self):
+        """清空滤波器历史"""
+        self._input[: self._history] = 0
+        self._t = 0
+
+    def output_length(self, input_length):
+        """处理input_length个输入样本会产生的输出样本数"""
+        if self.passthrough:
+            return input_length
+        end = input_length * self.up
+        if self._t >= end:
+            return 0
+        return -(-(end - self._t) // self.down)
+
+    def _ensure_capacity(self, n_in, n_out):
+        cycles = -(-n_out // self._cycle_out)
+        # 最后一个周期可能越过本帧末尾，多出的输出会被丢弃，这里预留读取空间
+        needed = self._history + max(n_in, cycles * self._cycle_in) + self._span
+        if len(self._input) < needed:
+            grown = np.zeros(needed, dtype=np.float32)
+            grown[: self._history] = self._input[: self._history]
+            self._input = grown
+        if len(self._output) < cycles * self._cycle_out:
+            self._output = np.empty(cycles * self._cycle_out, dtype=np.float32)
+            self._output_int16 = np.empty(cycles * self._cycle_out, dtype=np.int16)
+
+    def _get_matrix(self):
+        """获取(或计算)当前相位下一个周期的系数矩阵
+
+        每消耗down个输入样本产生up个输出样本，采样位置以此为周期重复。
+        输出c*cycle_out+j的输入窗口从c*cycle_in+offset[j]开始，因此整帧可以写成
+        (周期数, span)的跨步视图与(span, cycle_out)系数矩阵的一次矩阵乘法。
+        """
+        matrix = self._matrices.get(self._t)
+        if matrix is not None:
+            return matrix
+
+        positions = self._t + np.arange(self._cycle_out, dtype=np.int64) * self.down
+        offsets = positions // self.up
+        phases = positions % self.up
+        matrix = np.zeros((self._span, self._cycle_out), dtype=np.float32)
+        for j in range(self._cycle_out):
+            matrix[offsets[j] : offsets[j] + self._taps, j] = self._bank[phases[j]]
+
+        if len(self._matrices) >= self._MAX_MATRIX_CACHE:
+            self._matrices.clear()
+        self._matrices[self._t] = matrix
+        return matrix
+
+    def process(self, samples):
+        """重采样一段int16音频
+
+        Args:
+            samples: int16的numpy数组或bytes类数据
+
+        Returns:
+            numpy int16数组，指向内部缓冲区，下次调用前有效
+        """
+        if not isinstance(samples, np.ndarray):
+            samples = np.frombuffer(samples, dtype=np.int16)
+        if self.passthrough:
+            return samples
+
+        n_in = len(samples)
+        n_out = self.output_length(n_in)
+        self._ensure_capacity(n_in, n_out)
+
+        buf = self._input
+        buf[self._history : self._history + n_in] = samples
+
+        if n_out > 0:
+            cycles = -(-n_out // self._cycle_out)
+            # 窗口起点为 输入索引 - (taps - 1)，缓冲区开头正好是taps-1个历史样本
+            windows = as_strided(
+                buf,
+                shape=(cycles, self._span),
+                strides=(buf.strides[0] * self._cycle_in, buf.strides[0]),
+                writeable=False,
+            )
+            out = self._output[: cycles * self._cycle_out]
+            np.matmul(
+                windows, self._get_matrix(), out=out.reshape(cycles, self._cycle_out)
+            )
+            out = out[:n_out]
+            np.rint(out, out=out)
+            np.clip(out, -32768, 32767, out=out)
+            result = self._output_int16[:n_out]
+            np.copyto(result, out, casting="unsafe")
+        else:
+            result = self._output_int16[:0]
+
+        # 保留最后taps-1个样本作为下一帧的滤波器历史
+        total = self._history + n_in
+        if self._history:
+            buf[: self._history] = buf[total - self._history : total]
+        self._t += n_out * self.down - n_in * self.up
+        return result
+
@@ -0,0 +1,99 @@
+import numpy as np
+
+
+class AudioRingBuffer:
+    """预分配的PCM环形缓冲区（单生产者/单消费者，无锁）
+
+    生产者（通常是PortAudio回调线程）只修改写指针，消费者只修改读指针，
+    两个指针都是单调递增的样本计数，在GIL下的整数赋值是原子的，
+    因此读写双方无需加锁。
+    """
+
+    def __init__(self, capacity, dtype=np.int16):
+        """初始化环形缓冲区
+
+        Args:
+            capacity: 缓冲区容量（样本数）
+            dtype: 样本数据类型，默认int16
+        """
+        self.capacity = int(capacity)
+        self.dtype = np.dtype(dtype)
+        self._buffer = np.zeros(self.capacity, dtype=self.dtype)
+        self._write_pos = 0  # 累计写入样本数，仅生产者修改
+        self._read_pos = 0  # 累计读取样本数，仅消费者修改
+        self.overruns = 0  # 缓冲区满导致丢弃的写入次数
+
+    def available(self):
+        """可读取的样本数"""
+        return self._write_pos - self._read_pos
+
+    def free_space(self):
+        """可写入的样本数"""
+        return self.capacity - self.available()
+
+    def write(self, samples):
+        """写入样本（生产者调用）
+
+        缓冲区空间不足时整块丢弃并计数，保证不会覆盖消费者尚未读取的数据。
+
+        Args:
+            samples: numpy数组或bytes类数据
+
+        Returns:
+            bool: 是否写入成功
+        """
+        if not isinstance(samples, np.ndarray):
+            samples = np.frombuffer(samples, dtype=self.dtype)
+        count = len(samples)
+        if count == 0:
+            return True
+        if count > self.free_space():
+            self.overruns += 1
+            return False
+
+        start = self._write_pos % self.capacity
+        first = min(count, self.capacity - start)
+        self._buffer[start : start + first] = samples[:first]
+        if first < count:
+            self._buffer[: count - first] = samples[first:]
+
+        # 数据拷贝完成后再发布写指针
+        self._write_pos += count
+        return True
+
+    def read(self, count, out=None):
+        """读取指定数量的样本（消费者调用）
+
+        Args:
+            count: 需要读取的样本数
+            out: 可选的预分配输出数组，长度不小于count
+
+        Returns:
+            numpy数组，数据不足时返回None
+        """
+        if count > self.available():
+            return None
+        if out is None:
+            out = np.empty(count, dtype=self.dtype)
+        else:
+            out = out[:count]
+
+        start = self._read_pos % self.capacity
+        first = min(count, self.capacity - start)
+        out[:first] = self._buffer[start : start + first]
+        if first < count:
+            out[first:] = self._buffer[: count - first]
+
+        self._read_pos += count
+        return out
+
+    def skip(self, count):
+        """丢弃最旧的样本（消费者调用），返回实际丢弃的样本数"""
+        count = min(int(count), self.available())
+        if count > 0:
+            self._read_pos += count
+        return count
+
+    def reset(self):
+        """清空缓冲区，仅在生产者停止时调用"""
+        self._read_pos = self._write_pos = 0
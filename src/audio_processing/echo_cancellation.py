@@ -0,0 +1,122 @@
+import time
+
+import numpy as np
+
+from src.audio_codecs.resampler import StreamingResampler
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class EchoCancellationStage:
+    """采集路径中的回声消除(AEC)阶段
+
+    - 播放端：送入输出设备的PCM重采样到采集采样率，写入WebRTCProcessor的参考信号环形缓冲区
+    - 采集端：每帧在发布到采集总线之前按APM的10ms分块处理，每块前送入一块参考信号，
+      编码、唤醒词和VAD拿到的都是消除回声后的音频，播放TTS时也能被打断
+
+    处理耗时按占帧时长的比例做滑动平均，超过max_load时自动旁路，保证不拖慢采集节拍。
+    """
+
+    def __init__(
+        self,
+        capture_rate,
+        playback_rate,
+        frame_duration_ms,
+        delay_ms=50,
+        max_load=0.5,
+    ):
+        """
+        Args:
+            capture_rate: 采集（处理）采样率
+            playback_rate: 播放采样率，参考信号会重采样到capture_rate
+            frame_duration_ms: 采集帧时长（毫秒），需为10ms的整数倍
+            delay_ms: 播放到采集之间的设备延迟估计
+            max_load: 处理耗时占帧时长的上限，超过时旁路
+
+        Raises:
+            RuntimeError: WebRTC APM库不可用
+        """
+        from src.audio_processing import webrtc_processing
+
+        if webrtc_processing.apm_lib is None:
+            raise RuntimeError("WebRTC APM库未加载")
+        if frame_duration_ms % 10:
+            raise RuntimeError(f"帧时长{frame_duration_ms}ms不是10ms的整数倍")
+
+        self.processor = webrtc_processing.WebRTCProcessor(
+            sample_rate=capture_rate, channels=1, frame_size=capture_rate // 100
+        )
+        if not self.processor.apm:
+            raise RuntimeError("WebRTC处理器初始化失败")
+        self.processor.set_stream_delay(delay_ms)
+
+        self.capture_rate = capture_rate
+        self.frame_duration_ms = frame_duration_ms
+        self.max_load = max_load
+        self.bypassed = False
+
+        self._reference_resampler = StreamingResampler(playback_rate, capture_rate)
+        self._output = np.zeros(
+            capture_rate * frame_duration_ms // 1000, dtype=np.int16
+        )
+        self._load = 0.0
+        self._process_ms = 0.0
+        self.frames = 0
+
+    def add_reference(self, pcm):
+        """写入一段已送入输出设备的播放PCM（播放线程调用）"""
+        if self.bypassed:
+            return
+        try:
+            self.processor.add_reference_data(self._reference_resampler.process(pcm))
+        except Exception as e:
+            logger.debug(f"写入回声参考信号失败: {e}")
+
+    def process(self, data):
+        """处理一帧采集音频（采集线程调用）
+
+        Args:
+            data: 采集采样率下的一帧PCM（bytes）
+
+        Returns:
+            bytes: 消除回声后的PCM，旁路时原样返回
+        """
+        if self.bypassed:
+            return data
+
+        start = time.perf_counter()
+        samples = np.frombuffer(data, dtype=np.int16)
+        if len(samples) > len(self._output):
+            self._output = np.zeros(len(samples), dtype=np.int16)
+        result = self.processor.process_capture_frame(samples, self._output)
+        if result is samples:
+            return data
+        output = result.tobytes()
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        frame_ms = len(samples) * 1000 / self.capture_rate
+        self._process_ms += (elapsed_ms - self._process_ms) / 16
+        self._load += (elapsed_ms / frame_ms - self._load) / 16
+        self.frames += 1
+        # 前几帧包含APM的初始化开销，积累足够样本后再判断
+        if self.frames >= 50 and self._load > self.max_load:
+            self.bypassed = True
+            logger.warning(
+                f"回声消除耗时占帧时长{self._load:.0%}，超过上限{self.max_load:.0%}，已旁路"
+            )
+        return output
+
+    def get_stats(self):
+        """获取处理帧数、平均耗时和负载"""
+        return {
+            "frames": self.frames,
+            "process_ms": round(self._process_ms, 3),
+            "load": round(self._load, 3),
+            "bypassed": self.bypassed,
+            **self.processor.get_reference_stats(),
+        }
+
+    def close(self):
+        self.bypassed = True
+        self.processor.close()
@@ -0,0 +1,154 @@
+import bisect
+import os
+import re
+
+from pypinyin import Style, lazy_pinyin
+from pypinyin.constants import PHRASES_DICT, RE_HANS
+from pypinyin.contrib.tone_convert import to_finals, to_normal
+from pypinyin.seg import mmseg
+from pypinyin.seg.simpleseg import simple_seg
+
+# 匹配前去掉的字符：只保留汉字和字母数字
+_CLEAN_PATTERN = re.compile(r"[^\u4e00-\u9fff\w]")
+# pypinyin按正向最大匹配分词，一个词的切分最多取决于其后词库最长词长度的文字
+_SEG_LOOKAHEAD = max(map(len, PHRASES_DICT), default=1) + 1
+
+
+class IncrementalPinyinConverter:
+    """按语句增量计算识别文本的拼音变体
+
+    Vosk的部分识别结果在一句话内逐字变长，整句重新转换时每次都要对全部文字做4次
+    lazy_pinyin。这里保存当前语句逐字的拼音表和分词边界，新文本与上次文本的公共前缀
+    直接复用，只转换新增的字：
+
+    - 多音字的读音依赖分词结果，新增的字可能改变前缀末尾几个字的切分。从公共前缀末尾
+      往前超过词库最长词长度的分词边界处重新转换，结果与整句转换一致
+    - 每段文字只调用一次带声调的lazy_pinyin，无声调、首字母和韵母由声调拼音推导，
+      推导结果按音节缓存
+    - 逐字拼音表最多保存max_chars个字，更长的文本每次整句转换
+
+    识别器开始新的语句时调用reset()。文本被识别器改写时从分歧处重新转换，结果不受影响。
+    """
+
+    # 音节推导缓存的最大条目数
+    _MAX_SYLLABLES = 4096
+
+    def __init__(self, max_chars=256):
+        """
+        Args:
+            max_chars: 逐字拼音表保存的最大字数
+        """
+        self.max_chars = max_chars
+        # 声调拼音 -> (无声调拼音, 首字母, 韵母)
+        self._syllables = {}
+        self._stats = {"texts": 0, "converted_chars": 0, "reused_chars": 0, "resets": 0}
+        self.reset()
+
+    def reset(self):
+        """开始新的语句，清空逐字拼音表"""
+        self._text = ""
+        self._normal = []
+        self._initials = []
+        self._tone = []
+        self._finals = []
+        # 当前文本中各词的起始位置（升序）
+        self._boundaries = []
+        self._variants = None
+        self._stats["resets"] += 1
+
+    def convert(self, text):
+        """获取文本的拼音变体
+
+        Args:
+            text: 识别文本
+
+        Returns:
+            dict: standard、initials、tone、finals四种拼音变体，没有可转换的字时为空字典。
+                  文本未变化时返回同一个字典，调用方不应修改
+        """
+        cleaned = _CLEAN_PATTERN.sub("", text) if text else ""
+        if not cleaned:
+            return {}
+
+        stats = self._stats
+        stats["texts"] += 1
+        if cleaned == self._text:
+            stats["reused_chars"] += len(cleaned)
+            return self._variants
+
+        if len(cleaned) > self.max_chars:
+            self.reset()
+            stats["converted_chars"] += len(cleaned)
+            columns = ([], [], [], [])
+            self._append(cleaned, 0, [], *columns)
+            return self._join(*columns)
+
+        # 起点之前的词在公共前缀内就已切分完毕，不受新增文字影响
+        common = len(os.path.commonprefix((self._text, cleaned)))
+        boundaries = self._boundaries
+        i = bisect.bisect_right(boundaries, common - _SEG_LOOKAHEAD)
+        start = boundaries[i - 1] if i else 0
+        del boundaries[bisect.bisect_left(boundaries, start) :]
+        columns = (self._normal, self._initials, self._tone, self._finals)
+        for column in columns:
+            del column[start:]
+        self._append(cleaned[start:], start, boundaries, *columns)
+        stats["converted_chars"] += len(cleaned) - start
+        stats["reused_chars"] += start
+
+        self._text = cleaned
+        self._variants = self._join(*columns)
+        return self._variants
+
+    def _append(self, chunk, offset, boundaries, normal, initials, tone, finals):
+        """转换从offset开始的一段文字，逐字追加到各变体列表，并记录分词边界"""
+        position = offset
+        for run in simple_seg(chunk):
+            if RE_HANS.match(run):
+                # 与lazy_pinyin内部相同的分词
+                words = list(mmseg.seg.cut(run))
+                for word in words:
+                    boundaries.append(position)
+                    position += len(word)
+                syllables = lazy_pinyin(words, style=Style.TONE)
+                if len(syllables) != len(run):
+                    # 连续的无拼音字会合并为一项，逐字转换以保持逐字对齐
+                    syllables = [lazy_pinyin(char, style=Style.TONE)[0] for char in run]
+            else:
+                # 字母数字原样保留，每个字符都是分词边界
+                boundaries.extend(range(position, position + len(run)))
+                position += len(run)
+                syllables = run
+
+            for char, syllable in zip(run, syllables):
+                derived = self._syllables.get(syllable)
+                if derived is None:
+                    if syllable == char:
+                        derived = (char, char, char)
+                    else:
+                        plain = to_normal(syllable)
+                        derived = (plain, plain[:1], to_finals(syllable))
+                    if len(self._syllables) >= self._MAX_SYLLABLES:
+                        self._syllables.clear()
+                    self._syllables[syllable] = derived
+                normal.append(derived[0])
+                initials.append(derived[1])
+                tone.append(syllable)
+                finals.append(derived[2])
+
+    @staticmethod
+    def _join(normal, initials, tone, finals):
+        return {
+            "standard": "".join(normal).lower(),
+            "initials": "".join(initials).lower(),
+            "tone": "".join(tone).lower(),
+            "finals": "".join(finals).lower(),
+        }
+
+    def get_stats(self):
+        """获取转换的文本数、实际转换和复用的字数"""
+        stats = dict(self._stats)
+        total = stats["converted_chars"] + stats["reused_chars"]
+        stats["reuse_ratio"] = round(stats["reused_chars"] / total, 3) if total else 0.0
+        stats["syllables_cached"] = len(self._syllables)
+        return stats
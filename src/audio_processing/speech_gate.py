@@ -0,0 +1,185 @@
+from collections import deque
+
+import numpy as np
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class GateMode:
+    """语音门限的判决方式"""
+
+    OFF = "off"  # 不做门限，所有音频都交给识别器
+    ENERGY = "energy"  # 向量化RMS与自适应噪声底比较
+    WEBRTCVAD = "webrtcvad"  # RMS初筛后再用webrtcvad确认
+
+
+class SpeechGate:
+    """唤醒词识别器前的语音门限
+
+    Kaldi识别是常驻设备上最大的稳态CPU开销，而绝大部分时间麦克风里只有环境噪声。
+    门限每帧先做廉价的语音判断，只有可能有语音时才把音频交给识别器：
+
+    - 噪声底：静音帧的RMS以快降慢升的方式跟踪，门限取噪声底的noise_ratio倍且不低于min_rms
+    - 预卷：门关闭时保留最近pre_roll_ms的帧，开门时连同当前帧一起放行，唤醒词首音节不会丢失
+    - 拖尾：语音帧消失后继续放行hangover_ms，让识别器完整收尾；拖尾结束时通知调用方结束本段
+    """
+
+    def __init__(
+        self,
+        sample_rate=16000,
+        mode=GateMode.ENERGY,
+        min_rms=150,
+        noise_ratio=3.0,
+        pre_roll_ms=300,
+        hangover_ms=600,
+        vad_aggressiveness=2,
+    ):
+        """
+        Args:
+            sample_rate: 采样率
+            mode: 判决方式，见GateMode
+            min_rms: 语音RMS的最低门限（int16幅度）
+            noise_ratio: 语音RMS相对噪声底的倍数
+            pre_roll_ms: 开门时补发的历史音频时长
+            hangover_ms: 语音消失后继续放行的时长
+            vad_aggressiveness: webrtcvad的激进程度(0-3)
+        """
+        self.sample_rate = sample_rate
+        self.min_rms = float(min_rms)
+        self.noise_ratio = float(noise_ratio)
+        self.pre_roll_ms = pre_roll_ms
+        self.hangover_ms = hangover_ms
+
+        self.vad = None
+        if mode == GateMode.WEBRTCVAD:
+            try:
+                import webrtcvad
+
+                self.vad = webrtcvad.Vad(vad_aggressiveness)
+            except Exception as e:
+                logger.warning(f"webrtcvad不可用，语音门限改用能量判决: {e}")
+                mode = GateMode.ENERGY
+        elif mode not in (GateMode.OFF, GateMode.ENERGY):
+            logger.warning(f"未知的语音门限模式 {mode}，使用energy")
+            mode = GateMode.ENERGY
+        self.mode = mode
+        # webrtcvad只接受10/20/30ms的帧，较长的帧按20ms切片
+        self._vad_chunk_bytes = sample_rate * 20 // 1000 * 2
+
+        self._pre_roll = deque()
+        self._pre_roll_bytes = int(sample_rate * pre_roll_ms / 1000) * 2
+        self._buffered_bytes = 0
+        self.noise_floor = None
+        self._stats = {
+            "frames": 0,
+            "frames_passed": 0,
+            "segments": 0,
+        }
+        self.reset()
+
+    def reset(self):
+        """关门并清空预卷缓冲区，噪声底保留"""
+        self.is_open = False
+        self._pre_roll.clear()
+        self._buffered_bytes = 0
+        self._hangover_left_ms = 0.0
+
+    def threshold(self):
+        """当前的语音RMS门限"""
+        if self.noise_floor is None:
+            return self.min_rms
+        return max(self.min_rms, self.noise_floor * self.noise_ratio)
+
+    def _is_speech(self, frame, samples):
+        x = samples.astype(np.float32)
+        rms = float(np.sqrt(np.dot(x, x) / len(x))) if len(x) else 0.0
+
+        speech = rms >= self.threshold()
+        if not speech:
+            # 噪声底快降慢升，短暂的噪声不会把门限抬高
+            if self.noise_floor is None or rms < self.noise_floor:
+                self.noise_floor = rms if self.noise_floor is None else (
+                    self.noise_floor + (rms - self.noise_floor) * 0.5
+                )
+            else:
+                self.noise_floor += (rms - self.noise_floor) * 0.02
+            return False
+
+        # 语音帧也极缓慢地抬高噪声底，环境噪声持续变大时门不会一直开着
+        if self.noise_floor is not None:
+            self.noise_floor += (rms - self.noise_floor) * 0.001
+        if self.vad is None:
+            return True
+        chunk = self._vad_chunk_bytes
+        for offset in range(0, len(frame) - chunk + 1, chunk):
+            if self.vad.is_speech(frame[offset : offset + chunk], self.sample_rate):
+                return True
+        return False
+
+    def process(self, frame):
+        """处理一帧音频
+
+        Args:
+            frame: 一帧16位PCM（bytes）
+
+        Returns:
+            tuple: (data, ended)
+                data: 需要交给识别器的音频，门关闭时为None；刚开门时包含预卷音频
+                ended: 本帧是否结束了一段语音（拖尾耗尽），调用方应取出最终结果
+        """
+        stats = self._stats
+        stats["frames"] += 1
+        if self.mode == GateMode.OFF:
+            stats["frames_passed"] += 1
+            return frame, False
+
+        samples = np.frombuffer(frame, dtype=np.int16)
+        frame_ms = len(samples) * 1000 / self.sample_rate
+        speech = self._is_speech(frame, samples)
+
+        if self.is_open:
+            if speech:
+                self._hangover_left_ms = self.hangover_ms
+            else:
+                self._hangover_left_ms -= frame_ms
+                if self._hangover_left_ms <= 0:
+                    self.is_open = False
+                    return None, True
+            stats["frames_passed"] += 1
+            return frame, False
+
+        if not speech:
+            # 门关闭：只保留最近pre_roll_ms的帧
+            self._pre_roll.append(frame)
+            self._buffered_bytes += len(frame)
+            while (
+                self._pre_roll
+                and self._buffered_bytes - len(self._pre_roll[0]) >= self._pre_roll_bytes
+            ):
+                self._buffered_bytes -= len(self._pre_roll.popleft())
+            return None, False
+
+        self.is_open = True
+        self._hangover_left_ms = self.hangover_ms
+        stats["segments"] += 1
+        stats["frames_passed"] += len(self._pre_roll) + 1
+        self._pre_roll.append(frame)
+        data = b"".join(self._pre_roll)
+        self._pre_roll.clear()
+        self._buffered_bytes = 0
+        return data, False
+
+    def get_stats(self):
+        """获取放行比例、语音段数和当前噪声底"""
+        stats = dict(self._stats)
+        stats["mode"] = self.mode
+        stats["pass_ratio"] = (
+            round(stats["frames_passed"] / stats["frames"], 3) if stats["frames"] else 0.0
+        )
+        stats["noise_floor"] = (
+            round(self.noise_floor, 1) if self.noise_floor is not None else None
+        )
+        stats["threshold"] = round(self.threshold(), 1)
+        return stats
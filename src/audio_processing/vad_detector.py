@@ -3,10 +3,10 @@ import threading
 import time
 
 import numpy as np
-import pyaudio
 import webrtcvad
 
-from src.constants.constants import AbortReason, DeviceState
+from src.audio_codecs.capture_bus import DropPolicy
+from src.constants.constants import AbortReason, AudioConfig, DeviceState
 
 # 配置日志
 logger = logging.getLogger("VADDetector")
@@ -33,8 +33,8 @@ class VADDetector:
         self.vad = webrtcvad.Vad()
         self.vad.set_mode(3)  # 设置最高灵敏度
 
-        # 参数设置
-        self.sample_rate = 48000  # 采样率48kHz
+        # 参数设置（直接分析采集总线上的16kHz音频，按20ms切片）
+        self.sample_rate = AudioConfig.INPUT_SAMPLE_RATE
         self.frame_duration = 20  # 毫秒
         self.frame_size = int(self.sample_rate * self.frame_duration / 1000)
         self.speech_window = 5  # 连续检测到多少帧语音才触发打断
@@ -48,9 +48,8 @@ class VADDetector:
         self.silence_count = 0
         self.triggered = False
 
-        # 创建独立的PyAudio实例和流，避免与主音频流冲突
-        self.pa = None
-        self.stream = None
+        # AudioCodec采集总线上的订阅，不再单独打开麦克风
+        self.subscription = None
 
     def start(self):
         """启动VAD检测器"""
@@ -88,6 +87,9 @@ class VADDetector:
 
     def resume(self):
         """恢复VAD检测"""
+        # 丢弃暂停期间积压的音频
+        if self.subscription:
+            self.subscription.clear()
         self.paused = False
         # 重置状态
         self.speech_count = 0
@@ -100,104 +102,85 @@ class VADDetector:
         return self.running and not self.paused
 
     def _initialize_audio_stream(self):
-        """初始化独立的音频流"""
+        """订阅AudioCodec的采集总线"""
         try:
-            # 创建PyAudio实例
-            self.pa = pyaudio.PyAudio()
-
-            # 获取默认输入设备
-            device_index = None
-            for i in range(self.pa.get_device_count()):
-                device_info = self.pa.get_device_info_by_index(i)
-                if device_info["maxInputChannels"] > 0:
-                    device_index = i
-                    break
-
-            if device_index is None:
-                logger.error("找不到可用的输入设备")
-                return False
-
-            # 创建输入流
-            self.stream = self.pa.open(
-                format=pyaudio.paInt16,
-                channels=1,  # 单声道
-                rate=self.sample_rate,  # 48kHz采样率
-                input=True,
-                input_device_index=device_index,
-                frames_per_buffer=self.frame_size,
-                start=True,
-            )
-
-            logger.info(f"VAD检测器音频流已初始化，使用设备索引: {device_index}")
+            if self.subscription is None or self.subscription.closed:
+                # 打断检测只关心最近的音频，积压时丢弃最旧的帧
+                self.subscription = self.audio_codec.capture_bus.subscribe(
+                    "vad", max_frames=5, drop_policy=DropPolicy.DROP_OLDEST
+                )
+            logger.info("VAD检测器已订阅采集总线")
             return True
 
         except Exception as e:
-            logger.error(f"初始化VAD音频流失败: {e}")
+            logger.error(f"订阅采集总线失败: {e}")
             return False
 
     def _close_audio_stream(self):
-        """关闭音频流"""
+        """取消采集总线订阅"""
         try:
-            if self.stream:
-                self.stream.stop_stream()
-                self.stream.close()
-                self.stream = None
-
-            if self.pa:
-                self.pa.terminate()
-                self.pa = None
+            if self.subscription:
+                self.subscription.close()
+                self.subscription = None
 
-            logger.info("VAD检测器音频流已关闭")
+            logger.info("VAD检测器已取消采集总线订阅")
         except Exception as e:
-            logger.error(f"关闭VAD音频流失败: {e}")
+            logger.error(f"取消采集总线订阅失败: {e}")
 
     def _detection_loop(self):
         """VAD检测主循环"""
         logger.info("VAD检测循环已启动")
+        frame_bytes = self.frame_size * 2  # 16位音频，每个样本2字节
 
         while self.running:
-            # 如果暂停或者音频流未初始化，则跳过
-            if self.paused or not self.stream:
+            # 如果暂停或者未订阅采集总线，则跳过
+            if self.paused or not self.subscription:
                 time.sleep(0.1)
                 continue
 
             try:
+                # 读取一帧采集数据（等待本身带超时，无需额外休眠）
+                frame = self._read_audio_frame()
+                if frame is None:
+                    continue
+
                 # 只在说话状态下进行检测
-                if self.app.device_state == DeviceState.SPEAKING:
-                    # 读取音频帧
-                    frame = self._read_audio_frame()
-                    if not frame:
-                        time.sleep(0.01)
-                        continue
+                if self.app.device_state != DeviceState.SPEAKING:
+                    # 不在说话状态，重置状态
+                    self._reset_state()
+                    continue
+
+                # 按VAD窗口零拷贝切片
+                for offset in range(0, len(frame) - frame_bytes + 1, frame_bytes):
+                    chunk = frame[offset : offset + frame_bytes]
 
                     # 检测是否是语音
-                    is_speech = self._detect_speech(frame)
+                    is_speech = self._detect_speech(chunk)
 
                     # 如果检测到语音并且达到触发条件，处理打断
                     if is_speech:
-                        self._handle_speech_frame(frame)
+                        self._handle_speech_frame(chunk)
                     else:
-                        self._handle_silence_frame(frame)
-                else:
-                    # 不在说话状态，重置状态
-                    self._reset_state()
+                        self._handle_silence_frame(chunk)
+                    if self.paused:
+                        break
 
             except Exception as e:
                 logger.error(f"VAD检测循环出错: {e}")
 
-            time.sleep(0.01)  # 小延迟，减少CPU使用
-
         logger.info("VAD检测循环已结束")
 
     def _read_audio_frame(self):
-        """读取一帧音频数据"""
+        """从采集总线读取一帧音频数据
+
+        Returns:
+            memoryview: 一帧16kHz PCM的只读视图，超时返回None
+        """
         try:
-            if not self.stream or not self.stream.is_active():
+            subscription = self.subscription
+            if not subscription:
                 return None
-
-            # 读取音频数据
-            data = self.stream.read(self.frame_size, exception_on_overflow=False)
-            return data
+            return subscription.get(timeout=0.1)
         except Exception as e:
             logger.error(f"读取音频帧失败: {e}")
             return None
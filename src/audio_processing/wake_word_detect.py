@@ -1,23 +1,32 @@
 import difflib
 import json
 import os
-import re
 import threading
 import time
-from functools import lru_cache
 from pathlib import Path
 
 from pypinyin import Style, lazy_pinyin
 from vosk import KaldiRecognizer, Model, SetLogLevel
 import numpy as np
 
+from src.audio_processing.pinyin_converter import IncrementalPinyinConverter
+from src.audio_processing.speech_gate import GateMode, SpeechGate
+from src.audio_processing.wake_word_matcher import MatcherMode, WakeWordMatcher
 from src.constants.constants import AudioConfig
 from src.utils.config_manager import ConfigManager
+from src.utils.latency_tracer import LatencyTracer, TracePoint
 from src.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 
+class RecognizerMode:
+    """Vosk识别器的解码方式"""
+
+    OPEN = "open"  # 开放词表：识别任意文本，再用拼音模糊匹配唤醒词
+    GRAMMAR = "grammar"  # 语法约束：只在唤醒词和[unk]之间解码，结果直接比对
+
+
 class WakeWordDetector:
     """唤醒词检测类"""
 
@@ -32,6 +41,10 @@ class WakeWordDetector:
         self.stream = None
         self.external_stream = False
         self.stream_lock = threading.Lock()
+        # AudioCodec采集总线上的订阅，存在时不再直接读取输入流
+        self._subscription = None
+        # 识别器前的语音门限，静音时不调用Kaldi
+        self.speech_gate = None
 
         # 配置检查
         config = ConfigManager.get_instance()
@@ -55,6 +68,9 @@ class WakeWordDetector:
         # 预计算拼音变体以提升性能
         self.wake_word_patterns = self._build_wake_word_patterns()
 
+        # 预编译的匹配器，legacy模式下为None，逐个唤醒词计算相似度
+        self.matcher = self._create_matcher(config)
+
         # 匹配参数
         self.similarity_threshold = config.get_config(
             "WAKE_WORD_OPTIONS.SIMILARITY_THRESHOLD", 0.8
@@ -66,6 +82,19 @@ class WakeWordDetector:
         # 性能优化：缓存最近的识别结果
         self._recent_texts = []
         self._max_recent_cache = 10
+        # 当前语句的增量拼音转换，部分结果逐字变长时只转换新增的字
+        self._pinyin = IncrementalPinyinConverter()
+
+        # 识别器解码方式，语法模式下保存去掉空格的语法短语 -> 唤醒词
+        self.recognizer_mode = config.get_config(
+            "WAKE_WORD_OPTIONS.RECOGNIZER_MODE", RecognizerMode.OPEN
+        )
+        if self.recognizer_mode not in (RecognizerMode.OPEN, RecognizerMode.GRAMMAR):
+            logger.warning(f"未知的识别器模式 {self.recognizer_mode}，使用open")
+            self.recognizer_mode = RecognizerMode.OPEN
+        self._grammar_phrases = {}
+
+        self.speech_gate = self._create_speech_gate(config)
 
         # 模型初始化
         self._init_model(config)
@@ -83,14 +112,111 @@ class WakeWordDetector:
             logger.info(f"加载语音识别模型: {model_path}")
             SetLogLevel(-1)
             self.model = Model(model_path=model_path)
-            self.recognizer = KaldiRecognizer(self.model, self.sample_rate)
-            self.recognizer.SetWords(True)
-            logger.info(f"模型加载完成，已配置 {len(self.wake_words)} 个唤醒词")
+            self.recognizer = self._create_recognizer(model_path)
+            logger.info(
+                f"模型加载完成，已配置 {len(self.wake_words)} 个唤醒词，"
+                f"识别器模式: {self.recognizer_mode}"
+            )
 
         except Exception as e:
             logger.error(f"初始化失败: {e}", exc_info=True)
             self.enabled = False
 
+    def _create_recognizer(self, model_path):
+        """按识别器模式创建KaldiRecognizer"""
+        if self.recognizer_mode == RecognizerMode.GRAMMAR:
+            recognizer = KaldiRecognizer(
+                self.model, self.sample_rate, self._build_grammar(model_path)
+            )
+        else:
+            self._grammar_phrases = {}
+            recognizer = KaldiRecognizer(self.model, self.sample_rate)
+        recognizer.SetWords(True)
+        return recognizer
+
+    def _build_grammar(self, model_path):
+        """构建语法约束识别器使用的JSON语法
+
+        语法由唤醒词和[unk]组成，解码图只包含这些短语，其余语音都落到[unk]。
+        语法中的词必须在模型词表里，唤醒词按词表做正向最大匹配切分
+        （如"你好小智"切为"你好 小智"）；模型没有词表文件时按原样使用。
+
+        Returns:
+            str: JSON格式的短语列表
+        """
+        vocabulary = self._load_vocabulary(model_path)
+        phrases = []
+        self._grammar_phrases = {}
+        for word in self.wake_words:
+            tokens = self._segment_words(word, vocabulary) if vocabulary else [word]
+            if vocabulary:
+                missing = [token for token in tokens if token not in vocabulary]
+                if missing:
+                    logger.warning(
+                        f"唤醒词 '{word}' 中的 {missing} 不在模型词表中，语法模式下无法识别"
+                    )
+            phrases.append(" ".join(tokens))
+            self._grammar_phrases["".join(tokens)] = word
+
+        logger.info(f"唤醒词语法: {phrases}")
+        return json.dumps(phrases + ["[unk]"], ensure_ascii=False)
+
+    def _load_vocabulary(self, model_path):
+        """读取模型词表graph/words.txt，不存在时返回None"""
+        words_file = Path(model_path) / "graph" / "words.txt"
+        if not words_file.exists():
+            logger.warning(f"模型缺少词表文件 {words_file}，唤醒词按原样加入语法")
+            return None
+        with open(words_file, encoding="utf-8") as f:
+            return {line.split(maxsplit=1)[0] for line in f if line.strip()}
+
+    @staticmethod
+    def _segment_words(text, vocabulary, max_word_length=6):
+        """按词表做正向最大匹配分词，词表中没有的字单独成词"""
+        tokens = []
+        i = 0
+        while i < len(text):
+            for length in range(min(max_word_length, len(text) - i), 0, -1):
+                token = text[i : i + length]
+                if length == 1 or token in vocabulary:
+                    tokens.append(token)
+                    i += length
+                    break
+        return tokens
+
+    def _create_matcher(self, config):
+        """按WAKE_WORD_OPTIONS.MATCHER创建唤醒词匹配器，legacy模式返回None"""
+        mode = config.get_config("WAKE_WORD_OPTIONS.MATCHER", MatcherMode.COMPILED)
+        if mode == MatcherMode.LEGACY:
+            logger.info("唤醒词匹配器: legacy")
+            return None
+        if mode != MatcherMode.COMPILED:
+            logger.warning(f"未知的唤醒词匹配器 {mode}，使用compiled")
+        return WakeWordMatcher(self.wake_word_patterns)
+
+    def _create_speech_gate(self, config):
+        """按WAKE_WORD_OPTIONS.SPEECH_GATE创建语音门限，MODE为off时返回None"""
+        mode = config.get_config("WAKE_WORD_OPTIONS.SPEECH_GATE.MODE", GateMode.ENERGY)
+        if mode == GateMode.OFF:
+            logger.info("唤醒词语音门限已关闭")
+            return None
+        gate = SpeechGate(
+            self.sample_rate,
+            mode=mode,
+            min_rms=config.get_config("WAKE_WORD_OPTIONS.SPEECH_GATE.MIN_RMS", 150),
+            noise_ratio=config.get_config(
+                "WAKE_WORD_OPTIONS.SPEECH_GATE.NOISE_RATIO", 3.0
+            ),
+            pre_roll_ms=config.get_config(
+                "WAKE_WORD_OPTIONS.SPEECH_GATE.PRE_ROLL_MS", 300
+            ),
+            hangover_ms=config.get_config(
+                "WAKE_WORD_OPTIONS.SPEECH_GATE.HANGOVER_MS", 600
+            ),
+        )
+        logger.info(f"唤醒词语音门限: {gate.mode}")
+        return gate
+
     def _get_model_path(self, config):
         """获取模型路径"""
         from src.utils.resource_finder import resource_finder
@@ -171,6 +297,18 @@ class WakeWordDetector:
         if not self.audio_codec or not hasattr(self.audio_codec, "input_stream"):
             logger.error("AudioCodec无效或输入流不可用")
             return False
+
+        # 通过采集总线获取音频，与编码发送共享同一次设备读取
+        capture_bus = getattr(self.audio_codec, "capture_bus", None)
+        if capture_bus is not None:
+            if self._subscription is None or self._subscription.closed:
+                self._subscription = capture_bus.subscribe(
+                    "wake_word", max_frames=50
+                )
+            self.stream = self.audio_codec.input_stream
+            self.external_stream = True
+            return self._start_detection_thread("AudioCodec")
+
         try:
             self.audio_codec._reinitialize_stream(is_input=True)
         except Exception as e:
@@ -303,8 +441,19 @@ class WakeWordDetector:
                     return None
             return None
 
+    def _uses_capture_bus(self):
+        """是否通过AudioCodec的采集总线获取音频（输入流由采集线程独占）"""
+        return self._subscription is not None
+
     def _read_audio_data(self):
         """读取音频数据"""
+        if self._uses_capture_bus():
+            frame = self._subscription.get(timeout=0.5)
+            if frame is None:
+                return None
+            # 整帧视图的obj就是采集线程发布的bytes，直接交给识别器
+            return frame.obj
+
         try:
             stream = self._get_active_stream()
             if not stream:
@@ -360,6 +509,15 @@ class WakeWordDetector:
 
     def _process_audio_data(self, data):
         """优化的音频数据处理"""
+        gate = self.speech_gate
+        if gate is not None:
+            data, ended = gate.process(data)
+            if ended:
+                self._finish_segment()
+            if data is None:
+                # 没有语音，不调用识别器
+                return
+
         try:
             # 处理完整识别结果
             if self.recognizer.AcceptWaveform(data):
@@ -368,6 +526,8 @@ class WakeWordDetector:
                     # 过滤过短的文本以减少误触发
                     if len(text) >= 2:
                         self._check_wake_word(text)
+                # 识别器已开始新的语句
+                self._pinyin.reset()
 
             # 处理部分识别结果（降低频率以提升性能）
             if hasattr(self, "_partial_check_counter"):
@@ -390,6 +550,16 @@ class WakeWordDetector:
         except Exception as e:
             logger.error(f"音频数据处理错误: {e}")
 
+    def _finish_segment(self):
+        """语音段结束：取出最终结果，识别器随之重置，下一段从干净的状态开始"""
+        try:
+            result = json.loads(self.recognizer.FinalResult())
+            if (text := result.get("text", "").strip()) and len(text) >= 2:
+                self._check_wake_word(text)
+            self._pinyin.reset()
+        except Exception as e:
+            logger.error(f"获取最终识别结果失败: {e}")
+
     def _build_wake_word_patterns(self):
         """构建唤醒词的拼音模式，包括多种变体"""
         patterns = {}
@@ -417,25 +587,11 @@ class WakeWordDetector:
 
         return patterns
 
-    @lru_cache(maxsize=128)
     def _get_text_pinyin_variants(self, text):
-        """获取文本的拼音变体（带缓存）"""
+        """获取文本的拼音变体（同一语句内增量转换）"""
         if not text or not text.strip():
             return {}
-
-        # 清理文本
-        cleaned_text = re.sub(r"[^\u4e00-\u9fff\w]", "", text)
-        if not cleaned_text:
-            return {}
-
-        return {
-            "standard": "".join(lazy_pinyin(cleaned_text, style=Style.NORMAL)).lower(),
-            "initials": "".join(
-                lazy_pinyin(cleaned_text, style=Style.FIRST_LETTER)
-            ).lower(),
-            "tone": "".join(lazy_pinyin(cleaned_text, style=Style.TONE)).lower(),
-            "finals": "".join(lazy_pinyin(cleaned_text, style=Style.FINALS)).lower(),
-        }
+        return self._pinyin.convert(text)
 
     def _calculate_similarity(self, text_variants, pattern):
         """计算文本与唤醒词模式的相似度"""
@@ -524,11 +680,30 @@ class WakeWordDetector:
         if len(self._recent_texts) > self._max_recent_cache:
             self._recent_texts.pop(0)
 
+        if self._grammar_phrases:
+            # 语法模式下识别结果只可能是语法短语或[unk]，直接比对
+            normalized = text.replace("[unk]", "").replace(" ", "")
+            for phrase, wake_word in self._grammar_phrases.items():
+                if phrase in normalized:
+                    self._on_wake_word_detected(wake_word, text, 1.0, "grammar")
+                    return
+            return
+
         # 获取文本的拼音变体
         text_variants = self._get_text_pinyin_variants(text)
         if not text_variants or not any(text_variants.values()):
             return
 
+        if self.matcher is not None:
+            match = self.matcher.match(
+                text_variants, self.similarity_threshold, self.max_edit_distance
+            )
+            if match:
+                wake_word, similarity, match_type = match
+                logger.debug(f"原始文本: '{text}', 拼音变体: {text_variants}")
+                self._on_wake_word_detected(wake_word, text, similarity, match_type)
+            return
+
         best_match = None
         best_similarity = 0.0
         best_match_info = None
@@ -544,14 +719,22 @@ class WakeWordDetector:
 
         # 触发检测
         if best_match:
-            logger.info(
-                f"检测到唤醒词 '{best_match}' (相似度: {best_similarity:.3f}, 匹配类型: {best_match_info})"
-            )
             logger.debug(f"原始文本: '{text}', 拼音变体: {text_variants}")
-            self._trigger_callbacks(best_match, text)
-            self.recognizer.Reset()
-            # 清空缓存避免重复触发
-            self._recent_texts.clear()
+            self._on_wake_word_detected(
+                best_match, text, best_similarity, best_match_info
+            )
+
+    def _on_wake_word_detected(self, wake_word, text, similarity, match_type):
+        """命中唤醒词：通知回调并重置识别器"""
+        logger.info(
+            f"检测到唤醒词 '{wake_word}' (相似度: {similarity:.3f}, 匹配类型: {match_type})"
+        )
+        LatencyTracer.get_instance().mark(TracePoint.WAKE_WORD)
+        self._trigger_callbacks(wake_word, text)
+        self.recognizer.Reset()
+        # 清空缓存避免重复触发
+        self._recent_texts.clear()
+        self._pinyin.reset()
 
     def stop(self):
         """停止检测"""
@@ -560,8 +743,12 @@ class WakeWordDetector:
             self.detection_thread.join(timeout=2.0)
             self.detection_thread = None
 
-        # 确保正确关闭音频流
-        if self.audio_codec and hasattr(self.audio_codec, "input_stream"):
+        if self._uses_capture_bus():
+            # 输入流由AudioCodec的采集线程管理，这里只取消订阅
+            self._subscription.close()
+            self._subscription = None
+        elif self.audio_codec and hasattr(self.audio_codec, "input_stream"):
+            # 确保正确关闭音频流
             try:
                 stream = self.audio_codec.input_stream
                 if stream:
@@ -597,6 +784,12 @@ class WakeWordDetector:
     def resume(self):
         """恢复检测"""
         if self.running and self.paused:
+            if self._uses_capture_bus():
+                # 丢弃暂停期间积压的音频
+                self._subscription.clear()
+            if self.speech_gate is not None:
+                self.speech_gate.reset()
+            self._pinyin.reset()
             self.paused = False
 
     def on_detected(self, callback):
@@ -649,21 +842,24 @@ class WakeWordDetector:
 
     def get_performance_stats(self):
         """获取性能统计信息"""
-        cache_info = self._get_text_pinyin_variants.cache_info()
         return {
             "enabled": self.enabled,
             "wake_words_count": len(self.wake_words),
+            "recognizer_mode": self.recognizer_mode,
+            "matcher": (
+                self.matcher.get_stats()
+                if self.matcher
+                else {"mode": MatcherMode.LEGACY}
+            ),
             "similarity_threshold": self.similarity_threshold,
             "max_edit_distance": self.max_edit_distance,
-            "cache_hits": cache_info.hits,
-            "cache_misses": cache_info.misses,
-            "cache_size": cache_info.currsize,
+            "pinyin": self._pinyin.get_stats(),
             "recent_texts_count": len(self._recent_texts),
+            "speech_gate": self.speech_gate.get_stats() if self.speech_gate else None,
         }
 
     def clear_cache(self):
         """清空缓存"""
-        self._get_text_pinyin_variants.cache_clear()
         self._recent_texts.clear()
         logger.info("缓存已清空")
 
@@ -712,6 +908,12 @@ class WakeWordDetector:
 
     def _reset_stream(self):
         """重置音频流"""
+        if self._uses_capture_bus():
+            # 输入流的重建由AudioCodec采集线程负责，这里只丢弃积压数据
+            self._subscription.clear()
+            stream = self.audio_codec.input_stream
+            return bool(stream and stream.is_active())
+
         try:
             if self.audio_codec:
                 logger.info("尝试重新初始化音频流")
@@ -794,6 +996,10 @@ class WakeWordDetector:
                     logger.warning("音频流未激活")
                     return False
 
+                # 输入流由采集线程独占读取，流处于活动状态即可
+                if self._uses_capture_bus():
+                    return True
+
                 # 尝试读取一小段数据来验证麦克风是否工作
                 try:
                     test_data = stream.read(1024, exception_on_overflow=False)
@@ -0,0 +1,315 @@
+from collections import defaultdict
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 参与匹配的拼音变体，顺序与逐个比较的旧实现一致
+VARIANT_TYPES = ("standard", "tone", "initials", "finals")
+# 在识别文本中做子串搜索的变体，其余变体在长文本中几乎总能找到相近片段，只与整个文本比较
+SUBSTRING_VARIANTS = ("standard", "tone")
+
+
+class MatcherMode:
+    """唤醒词匹配器的实现方式"""
+
+    COMPILED = "compiled"  # 预编译索引 + 位并行编辑距离
+    LEGACY = "legacy"  # 逐个唤醒词计算difflib相似度和编辑距离
+
+
+def _build_peq(pattern):
+    """Myers算法的字符位掩码表：字符 -> 该字符在pattern中出现位置的位集"""
+    peq = {}
+    for i, char in enumerate(pattern):
+        peq[char] = peq.get(char, 0) | (1 << i)
+    return peq
+
+
+def bounded_edit_distance(peq, length, text, max_distance, substring=False):
+    """Myers位并行算法计算有上限的编辑距离
+
+    DP矩阵的列差分向量以整数位集表示，每读入text的一个字符只做常数次位运算。
+    当前分数减去剩余字符数仍大于max_distance时提前结束。
+
+    Args:
+        peq: _build_peq(pattern)的结果
+        length: pattern长度
+        text: 待比较文本
+        max_distance: 编辑距离上限
+        substring: 为True时计算pattern与text任一子串之间的最小编辑距离，
+                   否则计算与整个text的编辑距离
+
+    Returns:
+        int: 编辑距离，超过max_distance时返回max_distance + 1
+    """
+    if not substring and abs(len(text) - length) > max_distance:
+        return max_distance + 1
+    mask = (1 << length) - 1
+    high = 1 << (length - 1)
+    # 整串比较时第0行为0,1,2...，水平差恒为+1；子串搜索时文本可以从任意位置开始，为0
+    carry = 0 if substring else 1
+    pv = mask
+    mv = 0
+    score = length
+    best = length
+    remaining = len(text)
+    for char in text:
+        remaining -= 1
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+            if score < best:
+                best = score
+                if substring and best == 0:
+                    return 0
+        ph = ((ph << 1) | carry) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+        if score - remaining > max_distance:
+            if not substring:
+                return max_distance + 1
+            break
+    if not substring:
+        best = score
+    return best if best <= max_distance else max_distance + 1
+
+
+def _is_subsequence(pattern, text):
+    it = iter(text)
+    return all(char in it for char in pattern)
+
+
+def _split_pieces(text, parts):
+    """把text切成parts段长度尽量相等的连续片段"""
+    base, extra = divmod(len(text), parts)
+    pieces = []
+    start = 0
+    for i in range(parts):
+        end = start + base + (1 if i < extra else 0)
+        pieces.append(text[start:end])
+        start = end
+    return pieces
+
+
+def _bigrams(text):
+    return [text[i : i + 2] for i in range(len(text) - 1)]
+
+
+class _CompiledPattern:
+    __slots__ = ("wake_word", "text", "length", "peq", "grams")
+
+    def __init__(self, wake_word, text):
+        self.wake_word = wake_word
+        self.text = text
+        self.length = len(text)
+        self.peq = _build_peq(text)
+        self.grams = _bigrams(text)
+
+
+class WakeWordMatcher:
+    """预编译的唤醒词匹配器
+
+    由_build_wake_word_patterns的结果构建一次：
+
+    - 每个唤醒词的每种拼音变体预先计算Myers算法的字符位掩码表
+    - 编辑距离不超过k时，把pattern切成k+1段，至少有一段原样出现在文本中（鸽巢原理）。
+      按变体类型以这些片段建立n-gram索引，查询时只在文本上滑动窗口查表，
+      没有片段命中的唤醒词不做编辑距离计算
+    - 命中索引的候选再做一次bigram计数：文本中至少包含pattern的(m-1) - 2k个bigram
+      （q-gram引理），达不到的同样跳过
+    - 首字母变体的子序列匹配用字母倒排索引预筛，只检查字母全部出现在文本中的唤醒词
+
+    相似度：精确命中为1.0；否则为1 - d/m，d为编辑距离，上限取max_edit_distance、m//2
+    和相似度阈值允许的距离中的最小值；首字母变体为文本的子序列时为0.85。
+    标准和音调拼音在文本中做子串搜索（精确命中即包含该子串，d取与任一子串的最小编辑距离）；
+    首字母和韵母变体字母表小、区分度低，只与整个文本比较。
+    查询耗时主要取决于文本长度和通过预筛的候选数，不再与唤醒词总数成正比。
+    """
+
+    SUBSEQUENCE_SIMILARITY = 0.85
+
+    def __init__(self, wake_word_patterns):
+        """
+        Args:
+            wake_word_patterns: 唤醒词 -> 各拼音变体的字典
+        """
+        self.wake_words = list(wake_word_patterns)
+        self._order = {word: i for i, word in enumerate(self.wake_words)}
+        # 变体类型 -> [_CompiledPattern]
+        self._patterns = {variant: [] for variant in VARIANT_TYPES}
+        # 首字母 -> [pattern序号]，用于子序列匹配的预筛
+        self._initial_letters = defaultdict(list)
+        self._initial_letter_counts = []
+
+        for word, pattern in wake_word_patterns.items():
+            for variant in VARIANT_TYPES:
+                text = pattern.get(variant, "")
+                if not text:
+                    continue
+                compiled = self._patterns[variant]
+                compiled.append(_CompiledPattern(word, text))
+                if variant == "initials":
+                    letters = set(text)
+                    for letter in letters:
+                        self._initial_letters[letter].append(len(compiled) - 1)
+                    self._initial_letter_counts.append(len(letters))
+
+        # (阈值, 编辑距离上限) -> _get_index的结果
+        self._indexes = {}
+        self._stats = {"texts": 0, "candidates": 0, "distance_checks": 0}
+        logger.debug(f"唤醒词匹配器已编译: {len(self.wake_words)} 个唤醒词")
+
+    def _get_index(self, threshold, max_edit_distance):
+        """按阈值和编辑距离上限构建片段索引（带缓存，参数不变时只构建一次）
+
+        Returns:
+            dict: 变体类型 -> (各pattern的距离上限, 片段 -> pattern序号列表, 片段长度列表)
+        """
+        key = (threshold, max_edit_distance)
+        index = self._indexes.get(key)
+        if index is not None:
+            return index
+
+        index = {}
+        for variant, patterns in self._patterns.items():
+            limits = []
+            pieces = defaultdict(list)
+            for pid, compiled in enumerate(patterns):
+                # 相似度1 - d/m需达到阈值，距离超过该值的匹配不会被采用
+                by_threshold = int((1.0 - threshold) * compiled.length + 1e-9)
+                k = min(max_edit_distance, compiled.length // 2, by_threshold)
+                limits.append(k)
+                for piece in set(_split_pieces(compiled.text, k + 1)):
+                    pieces[piece].append(pid)
+            lengths = sorted({len(piece) for piece in pieces})
+            index[variant] = (limits, dict(pieces), lengths)
+        if len(self._indexes) >= 8:
+            self._indexes.clear()
+        self._indexes[key] = index
+        return index
+
+    def _candidates(self, variant, text, index):
+        """在文本上滑动窗口查片段索引，再按长度和bigram计数筛选
+
+        Returns:
+            list: (pattern, 距离上限)
+        """
+        limits, pieces, lengths = index
+        n = len(text)
+        found = set()
+        for length in lengths:
+            for i in range(n - length + 1):
+                pids = pieces.get(text[i : i + length])
+                if pids:
+                    found.update(pids)
+
+        patterns = self._patterns[variant]
+        substring = variant in SUBSTRING_VARIANTS
+        text_grams = None
+        candidates = []
+        for pid in found:
+            compiled = patterns[pid]
+            k = limits[pid]
+            # 子串搜索要求文本不短于m-k，整串比较要求长度差不超过k
+            if substring:
+                if compiled.length - k > n:
+                    continue
+            elif abs(n - compiled.length) > k:
+                continue
+            if k and len(compiled.grams) > 2 * k:
+                if text_grams is None:
+                    text_grams = set(_bigrams(text))
+                shared = sum(1 for gram in compiled.grams if gram in text_grams)
+                if shared < len(compiled.grams) - 2 * k:
+                    continue
+            candidates.append((compiled, k))
+        return candidates
+
+    def _subsequence_candidates(self, text):
+        letter_hits = defaultdict(int)
+        for letter in set(text):
+            for pid in self._initial_letters.get(letter, ()):
+                letter_hits[pid] += 1
+        patterns = self._patterns["initials"]
+        return [
+            patterns[pid]
+            for pid, hits in letter_hits.items()
+            if hits == self._initial_letter_counts[pid]
+        ]
+
+    def match(self, text_variants, threshold, max_edit_distance):
+        """在所有唤醒词中查找最佳匹配
+
+        Args:
+            text_variants: 识别文本的拼音变体字典
+            threshold: 相似度阈值
+            max_edit_distance: 编辑距离上限
+
+        Returns:
+            tuple: (唤醒词, 相似度, 匹配类型)，没有达到阈值的匹配时返回None
+        """
+        stats = self._stats
+        stats["texts"] += 1
+        index = self._get_index(threshold, max_edit_distance)
+        # 唤醒词 -> (相似度, 匹配类型)
+        best = {}
+
+        def offer(word, similarity, match_type):
+            current = best.get(word)
+            if current is None or similarity > current[0]:
+                best[word] = (similarity, match_type)
+
+        for variant in VARIANT_TYPES:
+            text = text_variants.get(variant, "")
+            if not text:
+                continue
+            substring = variant in SUBSTRING_VARIANTS
+
+            for compiled, k in self._candidates(variant, text, index[variant]):
+                stats["candidates"] += 1
+                word = compiled.wake_word
+                if word in best and best[word][0] >= 1.0:
+                    continue
+                if (compiled.text in text) if substring else (compiled.text == text):
+                    best[word] = (1.0, f"exact_{variant}")
+                    continue
+                if k <= 0:
+                    continue
+                stats["distance_checks"] += 1
+                distance = bounded_edit_distance(
+                    compiled.peq, compiled.length, text, k, substring
+                )
+                if distance <= k:
+                    offer(word, 1.0 - distance / compiled.length, variant)
+
+            if variant == "initials":
+                for compiled in self._subsequence_candidates(text):
+                    if len(compiled.text) >= 2 and _is_subsequence(compiled.text, text):
+                        offer(compiled.wake_word, self.SUBSEQUENCE_SIMILARITY, variant)
+
+        result = None
+        for word, (similarity, match_type) in best.items():
+            if similarity < threshold:
+                continue
+            if (
+                result is None
+                or similarity > result[1]
+                or (similarity == result[1] and self._order[word] < self._order[result[0]])
+            ):
+                result = (word, similarity, match_type)
+        return result
+
+    def get_stats(self):
+        """获取匹配的文本数、通过预筛的候选数和编辑距离计算次数"""
+        return {
+            "mode": MatcherMode.COMPILED,
+            "wake_words": len(self.wake_words),
+            **self._stats,
+        }
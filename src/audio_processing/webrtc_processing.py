@@ -16,42 +16,51 @@ WebRTC音频处理模块
 """
 
 import ctypes
-import os
-import sys
+import platform
 import threading
 from ctypes import (POINTER, Structure, byref, c_bool, c_float, c_int, c_short,
                     c_void_p)
 
 import numpy as np
 
+from src.audio_codecs.ring_buffer import AudioRingBuffer
 from src.utils.logging_config import get_logger
-from src.utils.path_resolver import find_resource
+from src.utils.resource_finder import find_file
 
 logger = get_logger(__name__)
 
 
 # 获取DLL文件的绝对路径
 def get_webrtc_dll_path():
-    """获取WebRTC APM库的路径"""
-    dll_path = find_resource("libs/webrtc_apm/win/x86_64/libwebrtc_apm.dll")
-    if dll_path:
-        return str(dll_path)
-
-    # 备用方案：使用原有逻辑
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(os.path.dirname(current_dir))
-    fallback_path = os.path.join(
-        project_root, "libs", "webrtc_apm", "win", "x86_64", "libwebrtc_apm.dll"
-    )
-    logger.warning(f"未找到WebRTC库，使用备用路径: {fallback_path}")
-    return fallback_path
+    """获取当前平台的WebRTC APM库路径，没有对应的库文件时返回None"""
+    system = platform.system()
+    machine = platform.machine().lower()
+    is_arm = machine.startswith(("arm", "aarch64"))
+
+    if system == "Windows":
+        relative_path = "libs/webrtc_apm/win/x86_64/libwebrtc_apm.dll"
+    elif system == "Darwin":
+        arch = "arm64" if is_arm else "x64"
+        relative_path = f"libs/webrtc_apm/mac/{arch}/libwebrtc_apm.dylib"
+    elif system == "Linux" and not is_arm:
+        relative_path = "libs/webrtc_apm/linux/x64/libwebrtc_apm.so"
+    else:
+        logger.warning(f"当前平台没有可用的WebRTC APM库: {system} {machine}")
+        return None
+
+    dll_path = find_file(relative_path)
+    if dll_path is None:
+        logger.warning(f"未找到WebRTC APM库: {relative_path}")
+        return None
+    return str(dll_path)
 
 
 # 加载WebRTC APM库
 try:
     dll_path = get_webrtc_dll_path()
-    apm_lib = ctypes.CDLL(dll_path)
-    logger.info(f"成功加载WebRTC APM库: {dll_path}")
+    apm_lib = ctypes.CDLL(dll_path) if dll_path else None
+    if apm_lib:
+        logger.info(f"成功加载WebRTC APM库: {dll_path}")
 except Exception as e:
     logger.error(f"加载WebRTC APM库失败: {e}")
     apm_lib = None
@@ -335,17 +344,21 @@ def create_optimized_apm_config():
 class WebRTCProcessor:
     """WebRTC音频处理器，提供实时回声消除和音频增强功能"""
 
-    def __init__(self, sample_rate=48000, channels=1, frame_size=480):
+    def __init__(
+        self, sample_rate=48000, channels=1, frame_size=480, max_reference_ms=200
+    ):
         """初始化WebRTC处理器
 
         Args:
             sample_rate: 采样率，默认48000Hz
             channels: 声道数，默认1（单声道）
             frame_size: 帧大小，默认480样本（10ms @ 48kHz）
+            max_reference_ms: 参考信号最大积压（毫秒），超出部分视为时钟漂移丢弃
         """
         self.sample_rate = sample_rate
         self.channels = channels
         self.frame_size = frame_size
+        self.max_reference_samples = int(sample_rate * max_reference_ms / 1000)
 
         # WebRTC APM实例
         self.apm = None
@@ -357,10 +370,19 @@ class WebRTCProcessor:
 
         # 初始化状态
         self._initialized = False
-
-        # 参考信号缓冲区（用于回声消除）
-        self._reference_buffer = []
-        self._reference_lock = threading.Lock()
+        # 播放到采集之间的设备延迟估计
+        self.stream_delay_ms = 50
+
+        # 参考信号环形缓冲区（用于回声消除），约1秒，播放线程写入、采集线程读取
+        self._reference_ring = AudioRingBuffer(max(sample_rate, frame_size * 4))
+        self._reference_frame = np.zeros(frame_size, dtype=np.int16)
+        # 预分配的输出缓冲区，APM要求每次调用都提供
+        self._output_frame = np.zeros(frame_size, dtype=np.int16)
+        self._reference_output = np.zeros(frame_size, dtype=np.int16)
+        self._output_pointer = self._output_frame.ctypes.data_as(POINTER(c_short))
+        self._reference_output_pointer = self._reference_output.ctypes.data_as(
+            POINTER(c_short)
+        )
 
         # 初始化WebRTC APM
         self._initialize()
@@ -394,7 +416,7 @@ class WebRTCProcessor:
                     logger.warning(f"应用WebRTC配置失败，错误码: {result}")
 
                 # 设置延迟
-                apm_lib.WebRTC_APM_SetStreamDelayMs(self.apm, 50)
+                apm_lib.WebRTC_APM_SetStreamDelayMs(self.apm, self.stream_delay_ms)
 
                 self._initialized = True
                 logger.info("WebRTC处理器初始化成功")
@@ -433,10 +455,6 @@ class WebRTCProcessor:
                 # 创建输入指针
                 input_ptr = input_array.ctypes.data_as(POINTER(c_short))
 
-                # 创建输出缓冲区
-                output_array = np.zeros(self.frame_size, dtype=np.int16)
-                output_ptr = output_array.ctypes.data_as(POINTER(c_short))
-
                 # 处理参考信号（如果提供）
                 if reference_data:
                     self._process_reference_stream(reference_data)
@@ -447,14 +465,14 @@ class WebRTCProcessor:
                     input_ptr,
                     self.stream_config,
                     self.stream_config,
-                    output_ptr,
+                    self._output_pointer,
                 )
 
                 if result != 0:
                     logger.debug(f"WebRTC处理警告，错误码: {result}")
                     # 即使有警告，也返回处理后的数据
 
-                return output_array.tobytes()
+                return self._output_frame.tobytes()
 
         except Exception as e:
             logger.error(f"处理捕获流失败: {e}")
@@ -468,7 +486,10 @@ class WebRTCProcessor:
         """
         try:
             # 转换参考数据为numpy数组
-            ref_array = np.frombuffer(reference_data, dtype=np.int16)
+            if isinstance(reference_data, np.ndarray):
+                ref_array = reference_data
+            else:
+                ref_array = np.frombuffer(reference_data, dtype=np.int16)
 
             # 检查数据长度
             if len(ref_array) != self.frame_size:
@@ -484,17 +505,13 @@ class WebRTCProcessor:
             # 创建参考信号指针
             ref_ptr = ref_array.ctypes.data_as(POINTER(c_short))
 
-            # 创建参考输出缓冲区（虽然不使用但必须提供）
-            ref_output_array = np.zeros(self.frame_size, dtype=np.int16)
-            ref_output_ptr = ref_output_array.ctypes.data_as(POINTER(c_short))
-
-            # 处理参考流
+            # 处理参考流，输出缓冲区虽然不使用但必须提供
             result = apm_lib.WebRTC_APM_ProcessReverseStream(
                 self.apm,
                 ref_ptr,
                 self.stream_config,
                 self.stream_config,
-                ref_output_ptr,
+                self._reference_output_pointer,
             )
 
             if result != 0:
@@ -504,28 +521,86 @@ class WebRTCProcessor:
             logger.error(f"处理参考流失败: {e}")
 
     def add_reference_data(self, reference_data):
-        """添加参考数据到缓冲区
+        """添加参考数据到缓冲区（播放线程调用）
+
+        参考数据可以是任意长度，处理时按frame_size切分，缓冲区满时整块丢弃。
 
         Args:
-            reference_data: 参考音频数据（bytes）
+            reference_data: 与处理器采样率相同的参考音频（bytes或int16 numpy数组）
         """
-        with self._reference_lock:
-            self._reference_buffer.append(reference_data)
-            # 保持缓冲区大小合理（约1秒的数据）
-            max_buffer_size = self.sample_rate // self.frame_size
-            if len(self._reference_buffer) > max_buffer_size:
-                self._reference_buffer = self._reference_buffer[-max_buffer_size:]
+        self._reference_ring.write(reference_data)
 
     def get_reference_data(self):
-        """获取并移除最旧的参考数据
+        """取出最旧的一个10ms参考帧（采集线程调用）
+
+        积压超过max_reference_ms时先丢弃最旧的数据，避免播放与采集的时钟漂移
+        让参考信号越来越滞后。
 
         Returns:
-            参考音频数据（bytes），如果缓冲区为空返回None
+            numpy int16数组，指向内部缓冲区；不足一帧时返回None
         """
-        with self._reference_lock:
-            if self._reference_buffer:
-                return self._reference_buffer.pop(0)
-            return None
+        ring = self._reference_ring
+        backlog = ring.available() - self.max_reference_samples
+        if backlog > 0:
+            ring.skip(backlog)
+        return ring.read(self.frame_size, out=self._reference_frame)
+
+    def get_reference_stats(self):
+        """获取参考信号缓冲区的积压样本数和溢出次数"""
+        return {
+            "reference_buffered": self._reference_ring.available(),
+            "reference_overruns": self._reference_ring.overruns,
+        }
+
+    def set_stream_delay(self, delay_ms):
+        """设置播放到采集之间的设备延迟（毫秒）"""
+        self.stream_delay_ms = int(delay_ms)
+        if self._initialized and self.apm:
+            with self._lock:
+                apm_lib.WebRTC_APM_SetStreamDelayMs(self.apm, self.stream_delay_ms)
+
+    def process_capture_frame(self, samples, out):
+        """按10ms分块处理一帧麦克风音频，每块之前先送入一块对齐的参考信号
+
+        Args:
+            samples: int16 numpy数组，长度为frame_size的整数倍
+            out: 预分配的输出数组，长度与samples相同
+
+        Returns:
+            numpy int16数组（即out）；未初始化或长度不合法时返回samples
+        """
+        frame_size = self.frame_size
+        if (
+            not self._initialized
+            or not self.apm
+            or len(samples) % frame_size
+            or len(out) < len(samples)
+        ):
+            return samples
+
+        try:
+            with self._lock:
+                for start in range(0, len(samples), frame_size):
+                    reference = self.get_reference_data()
+                    if reference is not None:
+                        self._process_reference_stream(reference)
+
+                    chunk = samples[start : start + frame_size]
+                    result = apm_lib.WebRTC_APM_ProcessStream(
+                        self.apm,
+                        chunk.ctypes.data_as(POINTER(c_short)),
+                        self.stream_config,
+                        self.stream_config,
+                        out[start : start + frame_size].ctypes.data_as(
+                            POINTER(c_short)
+                        ),
+                    )
+                    if result != 0:
+                        logger.debug(f"WebRTC处理警告，错误码: {result}")
+            return out[: len(samples)]
+        except Exception as e:
+            logger.error(f"处理捕获帧失败: {e}")
+            return samples
 
     def close(self):
         """关闭WebRTC处理器，释放资源"""
@@ -535,8 +610,7 @@ class WebRTCProcessor:
         try:
             with self._lock:
                 # 清理参考缓冲区
-                with self._reference_lock:
-                    self._reference_buffer.clear()
+                self._reference_ring.reset()
 
                 # 销毁流配置
                 if self.stream_config:
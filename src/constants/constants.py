@@ -1,8 +1,11 @@
-import platform
-
 from src.utils.config_manager import ConfigManager
+from src.utils.logging_config import get_logger
 
 config = ConfigManager.get_instance()
+logger = get_logger(__name__)
+
+# 支持配置的帧时长（毫秒），均为合法的Opus帧长
+SUPPORTED_FRAME_DURATIONS = (20, 40, 60)
 
 
 class ListeningMode:
@@ -71,8 +74,8 @@ def get_frame_duration() -> int:
             # Windows通常支持较小的缓冲区
             return 20
         elif system == "Linux":
-            # Linux可能需要稍大的缓冲区以减少延迟(如果发现不行改为60)
-            return 25
+            # Linux需要稍大的缓冲区以减少欠载(如果发现不行改为60)
+            return 40
         elif system == "Darwin":  # macOS
             # macOS通常有良好的音频性能
             return 20
@@ -84,6 +87,28 @@ def get_frame_duration() -> int:
         return 20  # 如果获取失败，返回默认值20ms
 
 
+def resolve_frame_duration() -> int:
+    """读取AUDIO_OPTIONS.FRAME_DURATION配置
+
+    可以配置为20/40/60毫秒，或"auto"按服务器和平台自动选择。
+    帧越长，每秒的数据包越少，系统调用、加密和消息封装的开销随之减少，但延迟增加。
+
+    返回:
+        int: 帧长度(毫秒)
+    """
+    value = config.get_config("AUDIO_OPTIONS.FRAME_DURATION", 20)
+    if value == "auto":
+        value = get_frame_duration()
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        value = None
+    if value not in SUPPORTED_FRAME_DURATIONS:
+        logger.warning(f"不支持的帧时长 {value}，使用20ms")
+        return 20
+    return value
+
+
 class AudioConfig:
     """音频配置类"""
 
@@ -91,15 +116,16 @@ class AudioConfig:
     OUTPUT_SAMPLE_RATE = 24000 if is_official_server(config.get_config("SYSTEM_OPTIONS.NETWORK.OTA_VERSION_URL")) else 16000
     CHANNELS = 1
 
-    # ✅ 固定帧时长为 20ms（推荐值）
-    FRAME_DURATION = 20
+    # 帧时长由配置决定（默认20ms），采集/播放缓冲、编码帧长、hello和抖动缓冲区都以此为准
+    FRAME_DURATION = resolve_frame_duration()
+
+    # 合法的 Opus 编码帧尺寸
+    INPUT_FRAME_SIZE = int(INPUT_SAMPLE_RATE * FRAME_DURATION / 1000)  # 20ms为320
 
-    # ✅ 合法的 Opus 编码帧尺寸
-    INPUT_FRAME_SIZE = int(INPUT_SAMPLE_RATE * FRAME_DURATION / 1000)  # 960
+    OUTPUT_FRAME_SIZE = int(OUTPUT_SAMPLE_RATE * FRAME_DURATION / 1000)
 
-    OUTPUT_FRAME_SIZE = (
-        4096 if platform.system() == "Linux" else int(OUTPUT_SAMPLE_RATE * FRAME_DURATION / 1000)
-    )
+    # 服务端下行帧长可能与本地不同，解码缓冲区按Opus最大帧长(120ms)分配
+    MAX_DECODE_FRAME_SIZE = int(OUTPUT_SAMPLE_RATE * 120 / 1000)
 
     OPUS_APPLICATION = 2049  # OPUS_APPLICATION_AUDIO
     OPUS_FRAME_SIZE = INPUT_FRAME_SIZE
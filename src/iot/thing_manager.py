@@ -1,8 +1,8 @@
-import json
 import logging
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from src.iot.thing import Thing
+from src.utils import json_codec
 
 
 class ThingManager:
@@ -21,19 +21,22 @@ class ThingManager:
     def add_thing(self, thing: Thing) -> None:
         self.things.append(thing)
 
+    def get_descriptors(self) -> List[Dict]:
+        """获取所有设备的描述列表，由协议层统一序列化"""
+        return [thing.get_descriptor_json() for thing in self.things]
+
     def get_descriptors_json(self) -> str:
-        descriptors = [thing.get_descriptor_json() for thing in self.things]
-        return json.dumps(descriptors)
+        return json_codec.dumps(self.get_descriptors())
 
-    def get_states_json(self, delta=False) -> Tuple[bool, str]:
+    def get_states(self, delta=False) -> Tuple[bool, List[Dict]]:
         """
-        获取所有设备的状态JSON
+        获取所有设备的状态列表
 
         Args:
             delta: 是否只返回变化的部分，True表示只返回变化的部分
 
         Returns:
-            Tuple[str, bool]: 返回JSON字符串和是否有状态变化的布尔值
+            Tuple[bool, List[Dict]]: 是否有状态变化，以及状态列表
         """
         if not delta:
             self.last_states.clear()
@@ -59,9 +62,22 @@ class ThingManager:
             if isinstance(state_json, dict):
                 states.append(state_json)
             else:
-                states.append(json.loads(state_json))  # 转换JSON字符串为字典
+                states.append(json_codec.loads(state_json))  # 转换JSON字符串为字典
+
+        return changed, states
 
-        return changed, json.dumps(states)
+    def get_states_json(self, delta=False) -> Tuple[bool, str]:
+        """
+        获取所有设备的状态JSON
+
+        Args:
+            delta: 是否只返回变化的部分，True表示只返回变化的部分
+
+        Returns:
+            Tuple[bool, str]: 是否有状态变化，以及JSON字符串
+        """
+        changed, states = self.get_states(delta)
+        return changed, json_codec.dumps(states)
 
     def get_states_json_str(self) -> str:
         """
@@ -0,0 +1,67 @@
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+_BLOCK_SIZE = 16
+_COUNTER_MASK = (1 << 128) - 1
+
+
+class AesCtrCipher:
+    """可复用的AES-CTR加解密器
+
+    cryptography的CTR上下文绑定单个nonce，每个包都要重新构造Cipher。
+    这里改为每个会话只创建一个AES-ECB上下文，用它加密计数器块得到密钥流，
+    再与数据异或，结果与modes.CTR完全一致（计数器按128位整体递增）。
+
+    加密和解密是同一个运算。上下文不是线程安全的，发送和接收应各用一个实例。
+    """
+
+    def __init__(self, key):
+        """
+        Args:
+            key: bytes或十六进制字符串形式的AES密钥
+        """
+        if isinstance(key, str):
+            key = bytes.fromhex(key)
+        self._encryptor = Cipher(algorithms.AES(key), modes.ECB()).encryptor()
+        # 按块数缓存的系数，用一次大整数运算生成连续计数器块
+        self._ones = {}
+        self._offsets = {}
+
+    def _counter_blocks(self, nonce, blocks):
+        base = int.from_bytes(nonce, "big")
+        if base + blocks - 1 > _COUNTER_MASK:
+            # 计数器回绕，逐块生成
+            return b"".join(
+                ((base + i) & _COUNTER_MASK).to_bytes(_BLOCK_SIZE, "big")
+                for i in range(blocks)
+            )
+
+        ones = self._ones.get(blocks)
+        if ones is None:
+            # (base+0, base+1, ...)拼接 = base * Σ2^(128k) + Σ i * 2^(128(n-1-i))
+            ones = sum(1 << (128 * k) for k in range(blocks))
+            self._offsets[blocks] = sum(
+                i << (128 * (blocks - 1 - i)) for i in range(blocks)
+            )
+            self._ones[blocks] = ones
+        return (base * ones + self._offsets[blocks]).to_bytes(
+            blocks * _BLOCK_SIZE, "big"
+        )
+
+    def process(self, nonce, data):
+        """加密或解密一个数据包
+
+        Args:
+            nonce: 16字节的初始计数器（bytes/bytearray）
+            data: 明文或密文（任意bytes-like对象）
+
+        Returns:
+            bytes: 处理后的数据
+        """
+        size = len(data)
+        if not size:
+            return b""
+        blocks = (size + _BLOCK_SIZE - 1) // _BLOCK_SIZE
+        keystream = self._encryptor.update(self._counter_blocks(nonce, blocks))
+        return (
+            int.from_bytes(data, "big") ^ int.from_bytes(keystream[:size], "big")
+        ).to_bytes(size, "big")
@@ -1,8 +1,6 @@
 import asyncio
-import json
 import logging
-import socket
-import threading
+import struct
 import time
 import uuid
 
@@ -11,7 +9,11 @@ from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 
 from src.constants.constants import AudioConfig
+from src.protocols.aes_ctr import AesCtrCipher
+from src.protocols.mqtt_publisher import PublishTracker
 from src.protocols.protocol import Protocol
+from src.protocols.sequence_window import SequenceWindow
+from src.utils import json_codec
 from src.utils.config_manager import ConfigManager
 from src.utils.logging_config import get_logger
 
@@ -19,24 +21,71 @@ from src.utils.logging_config import get_logger
 logger = get_logger(__name__)
 
 
+class UdpAudioProtocol(asyncio.DatagramProtocol):
+    """UDP音频通道的数据报协议，把收到的包直接交给MqttProtocol处理"""
+
+    def __init__(self, owner):
+        self.owner = owner
+
+    def datagram_received(self, data, addr):
+        self.owner._on_udp_packet(data)
+
+    def error_received(self, exc):
+        # 如ICMP端口不可达，不影响后续收发
+        logger.warning(f"UDP通道错误: {exc}")
+
+    def connection_lost(self, exc):
+        if exc:
+            logger.error(f"UDP通道异常关闭: {exc}")
+
+
 class MqttProtocol(Protocol):
-    def __init__(self, loop):
+    def __init__(self, loop, mqtt_info=None):
+        """
+        Args:
+            loop: 事件循环
+            mqtt_info: MQTT连接信息，None时使用OTA下发并保存在配置中的信息
+        """
         super().__init__()
         self.loop = loop
         self.config = ConfigManager.get_instance()  # 在这里实例化
+        self.mqtt_info = mqtt_info
         self.mqtt_client = None
-        self.udp_socket = None
-        self.udp_thread = None
-        self.udp_running = False
+        # UDP音频通道，收发都在事件循环上完成
+        self.udp_transport = None
+        self.udp_packets_received = 0
 
         # MQTT配置
         self.endpoint = None
+        self.port = 8883
+        self.use_tls = True
+        # 只能在本地配置中开启：允许按连接信息中的port和tls使用非TLS连接（本地测试服务器）。
+        # OTA下发的MQTT_INFO不能关闭TLS
+        self.allow_insecure = self.config.get_config(
+            "SYSTEM_OPTIONS.NETWORK.MQTT_ALLOW_INSECURE", False
+        )
         self.client_id = None
         self.username = None
         self.password = None
         self.publish_topic = None
         self.subscribe_topic = None
 
+        # 控制消息发布：按消息类型选择QoS，回执通过Future异步等待
+        self.publish_tracker = PublishTracker(loop)
+        self.default_qos = self.config.get_config(
+            "SYSTEM_OPTIONS.NETWORK.MQTT_PUBLISH.QOS", 0
+        )
+        self.qos_by_type = (
+            self.config.get_config("SYSTEM_OPTIONS.NETWORK.MQTT_PUBLISH.QOS_BY_TYPE", {})
+            or {}
+        )
+        self.max_inflight = self.config.get_config(
+            "SYSTEM_OPTIONS.NETWORK.MQTT_PUBLISH.MAX_INFLIGHT", 20
+        )
+        self.publish_timeout = self.config.get_config(
+            "SYSTEM_OPTIONS.NETWORK.MQTT_PUBLISH.TIMEOUT", 10
+        )
+
         # UDP配置
         self.udp_server = ""
         self.udp_port = 0
@@ -44,6 +93,12 @@ class MqttProtocol(Protocol):
         self.aes_nonce = None
         self.local_sequence = 0
         self.remote_sequence = 0
+        # 下行音频的序号窗口：丢弃重复/迟到包并统计丢包、乱序和抖动
+        self.sequence_window = SequenceWindow()
+        # 每个会话解析一次密钥和nonce，发送和接收各用一个加解密上下文
+        self._send_cipher = None
+        self._receive_cipher = None
+        self._send_nonce = None
 
         # 事件
         self.server_hello_event = asyncio.Event()
@@ -56,7 +111,9 @@ class MqttProtocol(Protocol):
         # 首先尝试获取MQTT配置
         try:
             # 尝试从OTA服务器获取MQTT配置
-            mqtt_config = self.config.get_config("SYSTEM_OPTIONS.NETWORK.MQTT_INFO")
+            mqtt_config = self.mqtt_info or self.config.get_config(
+                "SYSTEM_OPTIONS.NETWORK.MQTT_INFO"
+            )
 
             print(mqtt_config)
 
@@ -67,6 +124,12 @@ class MqttProtocol(Protocol):
             self.password = mqtt_config.get("password")
             self.publish_topic = mqtt_config.get("publish_topic")
             self.subscribe_topic = mqtt_config.get("subscribe_topic")
+            if self.allow_insecure:
+                self.port = int(mqtt_config.get("port", 8883))
+                self.use_tls = mqtt_config.get("tls", True) is not False
+            else:
+                self.port = 8883
+                self.use_tls = True
 
             logger.info(f"已从OTA服务器获取MQTT配置: {self.endpoint}")
         except Exception as e:
@@ -92,25 +155,37 @@ class MqttProtocol(Protocol):
                 self.mqtt_client.disconnect()
             except:
                 pass
+            self.publish_tracker.fail_all()
 
         # 创建新的MQTT客户端
-        self.mqtt_client = mqtt.Client(client_id=self.client_id)
+        if hasattr(mqtt, "CallbackAPIVersion"):
+            # paho-mqtt 2.x需要显式指定回调API版本
+            self.mqtt_client = mqtt.Client(
+                mqtt.CallbackAPIVersion.VERSION1, client_id=self.client_id
+            )
+        else:
+            self.mqtt_client = mqtt.Client(client_id=self.client_id)
         self.mqtt_client.username_pw_set(self.username, self.password)
+        # QoS 1/2消息的在途上限，超出部分由paho排队
+        self.mqtt_client.max_inflight_messages_set(self.max_inflight)
 
         # 配置TLS加密连接
-        try:
-            self.mqtt_client.tls_set(
-                ca_certs=None,
-                certfile=None,
-                keyfile=None,
-                cert_reqs=mqtt.ssl.CERT_REQUIRED,
-                tls_version=mqtt.ssl.PROTOCOL_TLS,
-            )
-        except Exception as e:
-            logger.error(f"TLS配置失败，无法安全连接到MQTT服务器: {e}")
-            if self.on_network_error:
-                await self.on_network_error(f"TLS配置失败: {str(e)}")
-            return False
+        if self.use_tls:
+            try:
+                self.mqtt_client.tls_set(
+                    ca_certs=None,
+                    certfile=None,
+                    keyfile=None,
+                    cert_reqs=mqtt.ssl.CERT_REQUIRED,
+                    tls_version=mqtt.ssl.PROTOCOL_TLS,
+                )
+            except Exception as e:
+                logger.error(f"TLS配置失败，无法安全连接到MQTT服务器: {e}")
+                if self.on_network_error:
+                    await self.on_network_error(f"TLS配置失败: {str(e)}")
+                return False
+        else:
+            logger.warning("MQTT未启用TLS（MQTT_ALLOW_INSECURE），仅应用于本地测试")
 
         # 创建连接Future
         connect_future = self.loop.create_future()
@@ -129,9 +204,8 @@ class MqttProtocol(Protocol):
 
         def on_message_callback(client, userdata, msg):
             try:
-                payload = msg.payload.decode("utf-8")
-
-                self._handle_mqtt_message(payload)
+                # json_codec直接解析bytes，无需先解码
+                self._handle_mqtt_message(msg.payload)
             except Exception as e:
                 logger.error(f"处理MQTT消息时出错: {e}")
 
@@ -147,8 +221,9 @@ class MqttProtocol(Protocol):
                 logger.info(f"MQTT连接已断开，返回码: {rc}")
                 self.connected = False
 
-                # 停止UDP接收线程
-                self._stop_udp_receiver()
+                # 关闭UDP通道、结束在途消息（只能在事件循环线程中操作）
+                self.loop.call_soon_threadsafe(self._stop_udp_receiver)
+                self.loop.call_soon_threadsafe(self.publish_tracker.fail_all)
 
                 # 通知音频通道关闭
                 if self.on_audio_channel_closed:
@@ -162,11 +237,12 @@ class MqttProtocol(Protocol):
         self.mqtt_client.on_connect = on_connect_callback
         self.mqtt_client.on_message = on_message_callback
         self.mqtt_client.on_disconnect = on_disconnect_callback
+        self.mqtt_client.on_publish = self.publish_tracker.on_publish
 
         try:
             # 连接MQTT服务器
-            logger.info(f"正在连接MQTT服务器: {self.endpoint}")
-            self.mqtt_client.connect_async(self.endpoint, 8883, 90)
+            logger.info(f"正在连接MQTT服务器: {self.endpoint}:{self.port}")
+            self.mqtt_client.connect_async(self.endpoint, self.port, 90)
             self.mqtt_client.loop_start()
 
             # 等待连接完成
@@ -186,7 +262,7 @@ class MqttProtocol(Protocol):
             }
 
             # 发送消息并等待响应
-            if not await self.send_text(json.dumps(hello_message)):
+            if not await self.send_json(hello_message):
                 logger.error("发送hello消息失败")
                 return False
 
@@ -198,24 +274,16 @@ class MqttProtocol(Protocol):
                     await self.on_network_error("等待响应超时")
                 return False
 
-            # 创建UDP套接字
+            # 创建UDP通道
             try:
-                if self.udp_socket:
-                    self.udp_socket.close()
-
-                self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                self.udp_socket.settimeout(0.5)
-
-                # 启动UDP接收线程
-                if self.udp_thread and self.udp_thread.is_alive():
-                    self.udp_running = False
-                    self.udp_thread.join(1.0)
-
-                self.udp_running = True
-                self.udp_thread = threading.Thread(target=self._udp_receive_thread)
-                self.udp_thread.daemon = True
-                self.udp_thread.start()
-
+                self._stop_udp_receiver()
+                self.udp_packets_received = 0
+                # 连接到服务端地址后只接收来自该地址的数据包
+                self.udp_transport, _ = await self.loop.create_datagram_endpoint(
+                    lambda: UdpAudioProtocol(self),
+                    remote_addr=(self.udp_server, self.udp_port),
+                )
+                logger.info(f"UDP音频通道已建立: {self.udp_server}:{self.udp_port}")
                 return True
             except Exception as e:
                 logger.error(f"创建UDP套接字失败: {e}")
@@ -232,7 +300,7 @@ class MqttProtocol(Protocol):
     def _handle_mqtt_message(self, payload):
         """处理MQTT消息"""
         try:
-            data = json.loads(payload)
+            data = json_codec.loads(payload)
             msg_type = data.get("type")
 
             if msg_type == "goodbye":
@@ -264,10 +332,16 @@ class MqttProtocol(Protocol):
                 self.udp_port = udp.get("port")
                 self.aes_key = udp.get("key")
                 self.aes_nonce = udp.get("nonce")
+                self._setup_udp_crypto()
 
                 # 重置序列号
                 self.local_sequence = 0
                 self.remote_sequence = 0
+                audio_params = data.get("audio_params") or {}
+                self.sequence_window.frame_duration_ms = audio_params.get(
+                    "frame_duration", AudioConfig.FRAME_DURATION
+                )
+                self.sequence_window.reset()
 
                 logger.info(
                     f"收到服务器hello响应，UDP服务器: {self.udp_server}:{self.udp_port}"
@@ -295,123 +369,120 @@ class MqttProtocol(Protocol):
                             self.on_incoming_json(json_data)
 
                     self.loop.call_soon_threadsafe(process_json)
-        except json.JSONDecodeError:
+        except json_codec.JSONDecodeError:
             logger.error(f"无效的JSON数据: {payload}")
         except Exception as e:
             logger.error(f"处理MQTT消息时出错: {e}")
 
-    def _udp_receive_thread(self):
-        """UDP接收线程
-
-        参考 audio_player.py 的实现方式
-        """
-        logger.info(
-            f"UDP接收线程已启动，监听来自 {self.udp_server}:{self.udp_port} 的数据"
-        )
-
-        self.udp_running = True
-        debug_counter = 0
-
-        while self.udp_running:
-            try:
-                data, addr = self.udp_socket.recvfrom(4096)
-                debug_counter += 1
-
-                try:
-                    # 验证数据包
-                    if len(data) < 16:  # 至少需要16字节的nonce
-                        logger.error(f"无效的音频数据包大小: {len(data)}")
-                        continue
-
-                    # 分离nonce和加密数据
-                    received_nonce = data[:16]
-                    encrypted_audio = data[16:]
-
-                    # 使用AES-CTR解密
-                    decrypted = self.aes_ctr_decrypt(
-                        bytes.fromhex(self.aes_key), received_nonce, encrypted_audio
-                    )
+    def _on_udp_packet(self, data):
+        """处理一个UDP音频包（在事件循环中由UdpAudioProtocol调用）"""
+        # 验证数据包
+        if len(data) < 16:  # 至少需要16字节的nonce
+            logger.error(f"无效的音频数据包大小: {len(data)}")
+            return
+        if self._receive_cipher is None:
+            return
+
+        # nonce最后4字节为服务端的包序号，重复或迟到的包不必解密
+        self.remote_sequence = int.from_bytes(data[12:16], "big")
+        sequence = self.sequence_window.accept(self.remote_sequence, time.monotonic())
+        if sequence is None:
+            return
 
-                    # 调试信息
-                    if debug_counter % 100 == 0:
-                        logger.debug(
-                            f"已解密音频数据包 #{debug_counter}, 大小: {len(decrypted)} 字节"
-                        )
+        try:
+            _, decrypted = self._decrypt_packet(data)
+        except Exception as e:
+            logger.error(f"处理音频数据包错误: {e}")
+            return
 
-                    # 处理解密后的音频数据
-                    if self.on_incoming_audio:
+        self.udp_packets_received += 1
+        if self.udp_packets_received % 500 == 0:
+            logger.debug(f"UDP音频统计: {self.sequence_window.get_stats()}")
 
-                        def process_audio(audio_data=decrypted):
+        # 处理解密后的音频数据
+        callback = self.on_incoming_audio
+        if callback:
+            result = callback(decrypted, sequence)
+            if asyncio.iscoroutine(result):
+                self.loop.create_task(result)
 
-                            if asyncio.iscoroutinefunction(self.on_incoming_audio):
-                                coro = self.on_incoming_audio(audio_data)
-                                if coro is not None:
-                                    asyncio.create_task(coro)
-                            else:
-                                self.on_incoming_audio(audio_data)
+    def publish_text(self, message, qos=None):
+        """发布一条文本消息，不等待回执
 
-                        self.loop.call_soon_threadsafe(process_audio)
+        多条消息可以同时在途，paho按调用顺序发出。
 
-                except Exception as e:
-                    logger.error(f"处理音频数据包错误: {e}")
-                    continue
+        Args:
+            message: 消息内容
+            qos: 本条消息的QoS，None时使用默认QoS
 
-            except socket.timeout:
-                # 超时是正常的，继续循环
-                pass
-            except Exception as e:
-                logger.error(f"UDP接收线程错误: {e}")
-                if not self.udp_running:
-                    break
-                time.sleep(0.1)  # 避免在错误情况下过度消耗CPU
+        Returns:
+            asyncio.Future: 收到回执（QoS 0为写出）后完成，失败时带有异常
+        """
+        if qos is None:
+            qos = self.default_qos
+        started_at = time.monotonic()
+        info = self.mqtt_client.publish(self.publish_topic, message, qos=qos)
+        return self.publish_tracker.track(info, started_at)
 
-        logger.info("UDP接收线程已停止")
+    async def send_text(self, message, qos=None):
+        """发送文本消息，异步等待回执，不阻塞事件循环
 
-    async def send_text(self, message):
-        """发送文本消息"""
+        Args:
+            message: 消息内容
+            qos: 本条消息的QoS，None时使用默认QoS
+        """
         if not self.mqtt_client:
             logger.error("MQTT客户端未初始化")
             return False
 
         try:
-            result = self.mqtt_client.publish(self.publish_topic, message)
-            result.wait_for_publish()
+            await asyncio.wait_for(
+                self.publish_text(message, qos), timeout=self.publish_timeout
+            )
             return True
+        except asyncio.TimeoutError:
+            self.publish_tracker.record_timeout()
+            logger.error(f"发送MQTT消息超时（{self.publish_timeout}秒未收到回执）")
+            if self.on_network_error:
+                await self.on_network_error("发送MQTT消息超时")
+            return False
         except Exception as e:
             logger.error(f"发送MQTT消息失败: {e}")
             if self.on_network_error:
                 await self.on_network_error(f"发送MQTT消息失败: {e}")
             return False
 
+    async def send_json(self, message):
+        """按消息类型选择QoS发送控制消息"""
+        qos = self.qos_by_type.get(message.get("type"), self.default_qos)
+        return await self.send_text(json_codec.dumps(message), qos=qos)
+
     async def send_audio(self, audio_data):
         """发送音频数据
 
         参考 audio_sender.py 的实现方式
         """
-        if not self.udp_socket or not self.udp_server or not self.udp_port:
+        if (
+            self.udp_transport is None
+            or self.udp_transport.is_closing()
+            or self._send_cipher is None
+        ):
             logger.error("UDP通道未初始化")
             return False
 
         try:
-            # 生成新的nonce (类似于 audio_sender.py 中的实现)
-            # 格式: 0x01 (1字节) + 0x00 (3字节) + 长度 (2字节) + 原始nonce (8字节) + 序列号 (8字节)
+            # 在预分配的nonce上原地写入长度和序列号
+            # 格式: 固定前缀 (2字节) + 长度 (2字节) + 原始nonce (8字节) + 序列号 (4字节)
             self.local_sequence = (self.local_sequence + 1) & 0xFFFFFFFF
-            new_nonce = (
-                self.aes_nonce[:4]  # 固定前缀
-                + format(len(audio_data), "04x")  # 数据长度
-                + self.aes_nonce[8:24]  # 原始nonce
-                + format(self.local_sequence, "08x")  # 序列号
-            )
-
-            encrypt_encoded_data = self.aes_ctr_encrypt(
-                bytes.fromhex(self.aes_key), bytes.fromhex(new_nonce), bytes(audio_data)
-            )
+            nonce = self._send_nonce
+            struct.pack_into(">H", nonce, 2, len(audio_data))
+            struct.pack_into(">I", nonce, 12, self.local_sequence)
 
             # 拼接nonce和密文
-            packet = bytes.fromhex(new_nonce) + encrypt_encoded_data
+            packet = bytes(nonce) + self._send_cipher.process(nonce, audio_data)
 
-            # 发送数据包
-            self.udp_socket.sendto(packet, (self.udp_server, self.udp_port))
+            # 发送数据包（非阻塞，由事件循环写出）
+            self.udp_transport.sendto(packet)
 
             # 每发送10个包打印一次日志
             if self.local_sequence % 10 == 0:
@@ -439,7 +510,7 @@ class MqttProtocol(Protocol):
             # 如果有会话ID，发送goodbye消息
             if self.session_id:
                 goodbye_msg = {"type": "goodbye", "session_id": self.session_id}
-                await self.send_text(json.dumps(goodbye_msg))
+                await self.send_json(goodbye_msg)
 
             # 处理goodbye
             await self._handle_goodbye()
@@ -452,7 +523,39 @@ class MqttProtocol(Protocol):
 
     def is_audio_channel_opened(self):
         """检查音频通道是否已打开"""
-        return self.udp_socket is not None
+        return self.udp_transport is not None
+
+    def get_udp_stats(self):
+        """获取下行UDP音频的接收统计（丢包、乱序、重复、迟到、到达抖动）"""
+        return self.sequence_window.get_stats()
+
+    def get_publish_stats(self):
+        """获取控制消息的发布统计（在途数量、回执耗时、失败和超时次数）"""
+        return self.publish_tracker.get_stats()
+
+    def get_network_stats(self):
+        """下行UDP丢包率作为链路丢包的估计（上行没有回执）"""
+        return {"loss_rate": self.sequence_window.get_stats()["loss_rate"]}
+
+    def _setup_udp_crypto(self):
+        """根据hello中的key和nonce准备本会话的加解密上下文"""
+        self._send_cipher = AesCtrCipher(self.aes_key)
+        self._receive_cipher = AesCtrCipher(self.aes_key)
+        self._send_nonce = bytearray.fromhex(self.aes_nonce)
+
+    def _decrypt_packet(self, data):
+        """解密服务端的UDP音频包
+
+        Args:
+            data: nonce(16字节) + 密文
+
+        Returns:
+            tuple: (序列号, 解密后的音频数据)
+        """
+        # nonce最后4字节为服务端的包序号
+        sequence = int.from_bytes(data[12:16], "big")
+        audio = self._receive_cipher.process(data[:16], memoryview(data)[16:])
+        return sequence, audio
 
     def aes_ctr_encrypt(self, key, nonce, plaintext):
         """AES-CTR模式加密函数
@@ -488,20 +591,11 @@ class MqttProtocol(Protocol):
     async def _handle_goodbye(self):
         """处理goodbye消息"""
         try:
-            # 停止UDP接收线程
-            if self.udp_thread and self.udp_thread.is_alive():
-                self.udp_running = False
-                self.udp_thread.join(1.0)
-                self.udp_thread = None
-            logger.info("UDP接收线程已停止")
-
-            # 关闭UDP套接字
-            if self.udp_socket:
-                try:
-                    self.udp_socket.close()
-                except Exception as e:
-                    logger.error(f"关闭UDP套接字失败: {e}")
-                self.udp_socket = None
+            # 关闭UDP通道
+            if self.udp_transport:
+                logger.info(f"UDP音频统计: {self.sequence_window.get_stats()}")
+            logger.info(f"MQTT发布统计: {self.publish_tracker.get_stats()}")
+            self._stop_udp_receiver()
 
             # 停止MQTT客户端
             if self.mqtt_client:
@@ -512,6 +606,7 @@ class MqttProtocol(Protocol):
                 except Exception as e:
                     logger.error(f"断开MQTT连接失败: {e}")
                 self.mqtt_client = None
+            self.publish_tracker.fail_all()
 
             # 重置所有状态
             self.connected = False
@@ -522,6 +617,9 @@ class MqttProtocol(Protocol):
             self.udp_port = 0
             self.aes_key = None
             self.aes_nonce = None
+            self._send_cipher = None
+            self._receive_cipher = None
+            self._send_nonce = None
 
             # 调用音频通道关闭回调
             if self.on_audio_channel_closed:
@@ -531,25 +629,15 @@ class MqttProtocol(Protocol):
             logger.error(f"处理goodbye消息时出错: {e}")
 
     def _stop_udp_receiver(self):
-        """停止UDP接收线程和关闭UDP套接字"""
-        # 关闭UDP接收线程
-        if (
-            hasattr(self, "udp_thread")
-            and self.udp_thread
-            and self.udp_thread.is_alive()
-        ):
-            self.udp_running = False
+        """关闭UDP音频通道"""
+        transport = getattr(self, "udp_transport", None)
+        if transport:
+            self.udp_transport = None
             try:
-                self.udp_thread.join(1.0)
-            except RuntimeError:
-                pass  # 处理线程已经终止的情况
-
-        # 关闭UDP套接字
-        if hasattr(self, "udp_socket") and self.udp_socket:
-            try:
-                self.udp_socket.close()
-            except:
-                pass
+                transport.close()
+                logger.info("UDP音频通道已关闭")
+            except Exception as e:
+                logger.error(f"关闭UDP通道失败: {e}")
 
     def __del__(self):
         """析构函数，清理资源"""
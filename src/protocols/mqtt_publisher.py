@@ -0,0 +1,111 @@
+import time
+
+import paho.mqtt.client as mqtt
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class PublishTracker:
+    """把paho的发布回执转换为asyncio.Future
+
+    client.publish只把消息放入paho的发送队列，on_publish回调在paho网络线程中触发
+    （QoS 0写出套接字后，QoS 1收到PUBACK后）。回调只把消息ID转交给事件循环，
+    登记和完成Future都在事件循环线程中进行：登记紧跟在publish之后且中间不让出，
+    因此即使回执先到，完成操作也一定排在登记之后。
+
+    多条控制消息可以同时在途，各自的Future独立完成；同时统计在途数量和发布耗时。
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self._pending = {}  # mid -> (future, 发布时间)
+        self.reset_stats()
+
+    def reset_stats(self):
+        self._stats = {
+            "published": 0,
+            "acknowledged": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "peak_inflight": 0,
+            "latency_last_ms": None,
+            "latency_max_ms": 0.0,
+        }
+        self._latency_ms = None
+
+    def on_publish(self, client, userdata, mid, *args):
+        """paho的on_publish回调（网络线程），兼容1.x和2.x的回调签名"""
+        acked_at = time.monotonic()
+        try:
+            self.loop.call_soon_threadsafe(self._acknowledge, mid, acked_at)
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
+
+    def track(self, info, started_at):
+        """登记一次publish调用（事件循环线程，紧跟在client.publish之后调用）
+
+        Args:
+            info: client.publish返回的MQTTMessageInfo
+            started_at: 调用publish前的单调时钟时间
+
+        Returns:
+            asyncio.Future: 收到回执后结果为True，发布失败时带有ConnectionError
+        """
+        future = self.loop.create_future()
+        stats = self._stats
+        stats["published"] += 1
+        if info.rc != mqtt.MQTT_ERR_SUCCESS:
+            stats["failed"] += 1
+            future.set_exception(ConnectionError(mqtt.error_string(info.rc)))
+            return future
+
+        mid = info.mid
+        self._pending[mid] = (future, started_at)
+        if len(self._pending) > stats["peak_inflight"]:
+            stats["peak_inflight"] = len(self._pending)
+        # 调用方超时取消后不再等待该回执
+        future.add_done_callback(
+            lambda f, mid=mid: self._pending.pop(mid, None) if f.cancelled() else None
+        )
+        return future
+
+    def _acknowledge(self, mid, acked_at):
+        entry = self._pending.pop(mid, None)
+        if entry is None:
+            return
+        future, started_at = entry
+        latency_ms = (acked_at - started_at) * 1000
+        stats = self._stats
+        stats["acknowledged"] += 1
+        stats["latency_last_ms"] = round(latency_ms, 2)
+        stats["latency_max_ms"] = round(max(stats["latency_max_ms"], latency_ms), 2)
+        if self._latency_ms is None:
+            self._latency_ms = latency_ms
+        else:
+            self._latency_ms += (latency_ms - self._latency_ms) / 8
+        if not future.done():
+            future.set_result(True)
+
+    def record_timeout(self):
+        self._stats["timeouts"] += 1
+
+    def fail_all(self, message="MQTT连接已断开"):
+        """连接断开时结束所有在途消息（事件循环线程）"""
+        pending = list(self._pending.values())
+        self._pending.clear()
+        for future, _ in pending:
+            if not future.done():
+                self._stats["failed"] += 1
+                future.set_exception(ConnectionError(message))
+
+    def get_stats(self):
+        """获取发布统计：在途数量、峰值、回执耗时（毫秒）等"""
+        stats = dict(self._stats)
+        stats["inflight"] = len(self._pending)
+        stats["latency_avg_ms"] = (
+            round(self._latency_ms, 2) if self._latency_ms is not None else None
+        )
+        return stats
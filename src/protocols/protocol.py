@@ -1,6 +1,5 @@
-import json
-
 from src.constants.constants import AbortReason, ListeningMode
+from src.utils import json_codec
 
 
 class Protocol:
@@ -37,12 +36,33 @@ class Protocol:
         """发送文本消息的抽象方法，需要在子类中实现"""
         raise NotImplementedError("send_text方法必须由子类实现")
 
+    async def send_json(self, message):
+        """序列化并发送一条控制消息，子类可按消息类型选择发送参数"""
+        return await self.send_text(json_codec.dumps(message))
+
+    async def start_persistent_session(self):
+        """启动长连接维护（可选），不支持的协议直接返回False"""
+        return False
+
+    async def disconnect(self):
+        """彻底断开连接，应用退出时调用"""
+        await self.close_audio_channel()
+
+    def get_network_stats(self):
+        """获取用于调整编码参数的网络统计
+
+        Returns:
+            dict: 可包含loss_rate、queue_depth、queue_capacity、audio_sent、
+                  audio_dropped；不提供时返回None
+        """
+        return None
+
     async def send_abort_speaking(self, reason):
         """发送中止语音的消息"""
         message = {"session_id": self.session_id, "type": "abort"}
         if reason == AbortReason.WAKE_WORD_DETECTED:
             message["reason"] = "wake_word_detected"
-        await self.send_text(json.dumps(message))
+        await self.send_json(message)
 
     async def send_wake_word_detected(self, wake_word):
         """发送检测到唤醒词的消息"""
@@ -52,7 +72,7 @@ class Protocol:
             "state": "detect",
             "text": wake_word,
         }
-        await self.send_text(json.dumps(message))
+        await self.send_json(message)
 
     async def send_start_listening(self, mode):
         """发送开始监听的消息"""
@@ -67,29 +87,39 @@ class Protocol:
             "state": "start",
             "mode": mode_map[mode],
         }
-        await self.send_text(json.dumps(message))
+        await self.send_json(message)
 
     async def send_stop_listening(self):
         """发送停止监听的消息"""
         message = {"session_id": self.session_id, "type": "listen", "state": "stop"}
-        await self.send_text(json.dumps(message))
+        await self.send_json(message)
 
     async def send_iot_descriptors(self, descriptors):
-        """发送物联网设备描述信息"""
+        """发送物联网设备描述信息
+
+        Args:
+            descriptors: 描述列表；兼容旧调用方传入的JSON字符串
+        """
         message = {
             "session_id": self.session_id,
             "type": "iot",
             "descriptors": (
-                json.loads(descriptors) if isinstance(descriptors, str) else descriptors
+                json_codec.loads(descriptors)
+                if isinstance(descriptors, str)
+                else descriptors
             ),
         }
-        await self.send_text(json.dumps(message))
+        await self.send_json(message)
 
     async def send_iot_states(self, states):
-        """发送物联网设备状态信息"""
+        """发送物联网设备状态信息
+
+        Args:
+            states: 状态列表；兼容旧调用方传入的JSON字符串
+        """
         message = {
             "session_id": self.session_id,
             "type": "iot",
-            "states": json.loads(states) if isinstance(states, str) else states,
+            "states": json_codec.loads(states) if isinstance(states, str) else states,
         }
-        await self.send_text(json.dumps(message))
+        await self.send_json(message)
@@ -0,0 +1,180 @@
+import asyncio
+from collections import deque
+
+from src.audio_codecs.capture_bus import DropPolicy
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class SendQueue:
+    """出站消息队列
+
+    所有出站消息由单个写协程按顺序发送，上行拥塞时发送方不会堆积未完成的任务：
+
+    - 控制消息（JSON）不会被丢弃，调用方可以等待发送完成。默认与音频帧按入队顺序发送，
+      listen stop等消息不会先于它之前采集的语音到达服务端；优先消息（如abort）
+      排在所有已入队的音频帧之前
+    - 音频帧进入有界队列，队列满时按丢弃策略丢帧，内存占用和排队延迟都有上限
+    """
+
+    def __init__(self, max_audio_frames=25, drop_policy=DropPolicy.DROP_OLDEST):
+        """
+        Args:
+            max_audio_frames: 音频队列最多缓存的帧数
+            drop_policy: 音频队列已满时的丢弃策略
+        """
+        self.max_audio_frames = max(1, int(max_audio_frames))
+        self.drop_policy = drop_policy
+        # 音频发送失败时的回调，参数为异常
+        self.on_error = None
+
+        # 优先控制消息：(消息, future)
+        self._control = deque()
+        # 按顺序发送的音频帧(bytes)和控制消息(消息, future)
+        self._audio = deque()
+        self._audio_frames = 0
+        self._wakeup = None
+        self._writer_task = None
+        self._inflight = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        self._stats = {
+            "audio_sent": 0,
+            "audio_dropped": 0,
+            "audio_peak": 0,
+            "control_sent": 0,
+            "send_errors": 0,
+        }
+
+    def start(self, send):
+        """为新连接启动写协程（需在事件循环中调用）
+
+        Args:
+            send: 发送一条消息的协程函数，如websocket.send
+        """
+        self.stop()
+        self._wakeup = asyncio.Event()
+        self._writer_task = asyncio.create_task(self._writer(send))
+
+    def stop(self):
+        """停止写协程，清空队列，未发送的控制消息以ConnectionError结束"""
+        if self._writer_task and not self._writer_task.done():
+            self._writer_task.cancel()
+        self._writer_task = None
+        pending = list(self._control)
+        pending.extend(item for item in self._audio if isinstance(item, tuple))
+        self._control.clear()
+        self._audio.clear()
+        self._audio_frames = 0
+        if self._inflight:
+            pending.append(self._inflight)
+            self._inflight = None
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(ConnectionError("发送队列已关闭"))
+
+    def put_audio(self, data):
+        """音频帧入队（非阻塞）
+
+        Returns:
+            bool: 帧是否入队，队列已满且策略为丢弃新帧时返回False
+        """
+        if self._writer_task is None:
+            return False
+        audio = self._audio
+        if self._audio_frames >= self.max_audio_frames:
+            self._stats["audio_dropped"] += 1
+            if self.drop_policy == DropPolicy.DROP_NEWEST:
+                return False
+            # 丢弃最旧的音频帧，排在其间的控制消息保持原位
+            for i, item in enumerate(audio):
+                if not isinstance(item, tuple):
+                    del audio[i]
+                    break
+        else:
+            self._audio_frames += 1
+        audio.append(data)
+        if self._audio_frames > self._stats["audio_peak"]:
+            self._stats["audio_peak"] = self._audio_frames
+        self._wakeup.set()
+        return True
+
+    def put_control(self, message, priority=False):
+        """控制消息入队
+
+        Args:
+            message: 消息内容
+            priority: 为True时排在所有已入队的音频帧之前，否则排在它们之后
+
+        Returns:
+            asyncio.Future: 消息发出后完成，发送失败时带有异常
+        """
+        future = asyncio.get_running_loop().create_future()
+        if self._writer_task is None:
+            future.set_exception(ConnectionError("发送队列未启动"))
+            return future
+        (self._control if priority else self._audio).append((message, future))
+        self._wakeup.set()
+        return future
+
+    async def _writer(self, send):
+        control = self._control
+        audio = self._audio
+        wakeup = self._wakeup
+        stats = self._stats
+        while True:
+            if control:
+                await self._send_control(send, control.popleft())
+            elif audio:
+                item = audio.popleft()
+                if isinstance(item, tuple):
+                    await self._send_control(send, item)
+                    continue
+                self._audio_frames -= 1
+                try:
+                    await send(item)
+                    stats["audio_sent"] += 1
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # 连接已不可用，积压的音频不再有意义，控制消息留给各自的发送结果
+                    stats["send_errors"] += 1
+                    remaining = [entry for entry in audio if isinstance(entry, tuple)]
+                    audio.clear()
+                    audio.extend(remaining)
+                    self._audio_frames = 0
+                    if self.on_error:
+                        self.on_error(e)
+            else:
+                wakeup.clear()
+                await wakeup.wait()
+
+    async def _send_control(self, send, item):
+        self._inflight = item
+        message, future = item
+        try:
+            await send(message)
+            self._stats["control_sent"] += 1
+            if not future.done():
+                future.set_result(True)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._stats["send_errors"] += 1
+            if not future.done():
+                future.set_exception(e)
+        finally:
+            self._inflight = None
+
+    def get_stats(self):
+        """获取统计信息（当前队列深度、峰值深度、已发送和丢弃数）"""
+        stats = dict(self._stats)
+        stats["audio_queued"] = self._audio_frames
+        stats["control_queued"] = (
+            len(self._control) + len(self._audio) - self._audio_frames
+        )
+        stats["max_audio_frames"] = self.max_audio_frames
+        stats["drop_policy"] = self.drop_policy
+        return stats
@@ -0,0 +1,165 @@
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_SEQUENCE_MOD = 1 << 32
+_HALF_RANGE = 1 << 31
+
+
+class SequenceWindow:
+    """UDP音频包的序号窗口
+
+    用位图记录最近window个序号的到达情况（类似SRTP的防重放窗口）：
+
+    - 窗口内未到过的旧序号视为乱序包，照常交付
+    - 已到过的序号视为重复包，超出窗口的旧序号视为迟到包，二者直接丢弃
+    - 连续resync_after个被丢弃的包序号首尾相连、且都比最大序号落后超过reorder_depth时，
+      说明服务端中途重置了序号，从这些包重新对齐，只损失对齐前丢弃的几个包。
+      最近几个包的重放（如重复发送的一串包）不会触发重新对齐；序号重置到最大序号附近时，
+      新序号最多被当作重复包丢弃reorder_depth个，之后照常交付
+    - 序号滑出窗口时仍未到达的记为丢包
+
+    交付时把32位序号展开为单调递增的扩展序号，播放端的抖动缓冲区据此重排，
+    缺失的序号交给Opus做FEC/PLC。窗口本身不缓存数据，不增加延迟。
+    """
+
+    def __init__(
+        self, window=64, frame_duration_ms=60, resync_after=3, reorder_depth=8
+    ):
+        """
+        Args:
+            window: 窗口大小（包数）
+            frame_duration_ms: 每个包的音频时长，用于计算到达抖动
+            resync_after: 判定序号重置所需的连续被丢弃包数
+            reorder_depth: 重放和乱序可能落后的最大包数，
+                落后不超过该值的被丢弃包不参与重置判定
+        """
+        self.window = max(1, int(window))
+        self.resync_after = max(1, int(resync_after))
+        self.reorder_depth = min(max(0, int(reorder_depth)), self.window - 1)
+        self.frame_duration_ms = frame_duration_ms
+        self._mask = (1 << self.window) - 1
+        self.reset()
+
+    def reset(self):
+        """开始新的会话"""
+        self._highest = None  # 已收到的最大扩展序号
+        self._seen = 0  # 第i位表示序号highest-i已收到
+        self._offset = 0  # 服务端重置序号后的补偿量
+        # 最近连续被丢弃且序号相连的包数，以及其中最后一个序号
+        self._rejected_run = 0
+        self._last_rejected = None
+        self._transit = None
+        self._jitter_ms = 0.0
+        self._stats = {
+            "received": 0,
+            "accepted": 0,
+            "duplicates": 0,
+            "late": 0,
+            "reordered": 0,
+            "lost": 0,
+            "resyncs": 0,
+        }
+
+    def accept(self, sequence, arrival):
+        """处理一个收到的序号
+
+        Args:
+            sequence: nonce中的32位序号
+            arrival: 到达时间（秒，单调时钟）
+
+        Returns:
+            int: 扩展序号；重复或迟到的包返回None
+        """
+        stats = self._stats
+        stats["received"] += 1
+
+        if self._highest is None:
+            self._highest = sequence
+            # 会话开始之前的序号不存在，视为已收到，避免被计为丢包
+            self._seen = self._mask
+            return self._deliver(sequence, arrival)
+
+        delta = (sequence + self._offset - self._highest) % _SEQUENCE_MOD
+        if delta >= _HALF_RANGE:
+            delta -= _SEQUENCE_MOD
+
+        if delta > 0:
+            self._slide(delta)
+            self._rejected_run = 0
+            return self._deliver(self._highest, arrival)
+
+        age = -delta
+        if age >= self.window:
+            return self._reject(sequence, age, arrival, "late")
+
+        bit = 1 << age
+        if self._seen & bit:
+            return self._reject(sequence, age, arrival, "duplicates")
+        self._seen |= bit
+        self._rejected_run = 0
+        stats["reordered"] += 1
+        return self._deliver(self._highest - age, arrival)
+
+    def _reject(self, sequence, age, arrival, reason):
+        """丢弃迟到或重复的包
+
+        服务端重置序号后，新序号落在窗口内会被当作重复包，落在窗口外会被当作迟到包。
+        落后超过reorder_depth的被丢弃包序号连续相连达到resync_after个时从当前包重新对齐，
+        此前丢弃的几个包计为丢包。落后更少的包可能是最近几个包的重放，不参与判定。
+
+        Returns:
+            int: 重新对齐时为当前包的扩展序号，否则为None
+        """
+        self._stats[reason] += 1
+        if age <= self.reorder_depth:
+            self._rejected_run = 0
+            return None
+        if self._rejected_run and sequence == (self._last_rejected + 1) % _SEQUENCE_MOD:
+            self._rejected_run += 1
+        else:
+            self._rejected_run = 1
+        self._last_rejected = sequence
+        if self._rejected_run < self.resync_after:
+            return None
+
+        logger.info(f"UDP音频序号跳变到{sequence}，重新同步")
+        self._stats["resyncs"] += 1
+        run = self._rejected_run
+        self._rejected_run = 0
+        self._offset = (self._highest + run - sequence) % _SEQUENCE_MOD
+        self._slide(run)
+        return self._deliver(self._highest, arrival)
+
+    def _slide(self, delta):
+        """窗口前移delta个序号，统计滑出窗口仍未到达的包"""
+        if delta >= self.window:
+            exiting = self._seen
+            missing = delta - self.window
+            self._seen = 1
+        else:
+            exiting = self._seen >> (self.window - delta)
+            missing = 0
+            self._seen = ((self._seen << delta) | 1) & self._mask
+        exiting_count = min(delta, self.window)
+        self._stats["lost"] += missing + exiting_count - bin(exiting).count("1")
+        self._highest += delta
+
+    def _deliver(self, extended, arrival):
+        """记录一个交付的包并更新到达抖动（RFC 3550）"""
+        self._stats["accepted"] += 1
+        transit = arrival * 1000 - extended * self.frame_duration_ms
+        if self._transit is not None:
+            self._jitter_ms += (abs(transit - self._transit) - self._jitter_ms) / 16
+        self._transit = transit
+        return extended
+
+    def get_stats(self):
+        """获取统计信息"""
+        stats = dict(self._stats)
+        # 窗口内尚未到达的序号可能只是乱序，暂不计入丢包
+        total = stats["accepted"] + stats["lost"]
+        stats["loss_rate"] = round(stats["lost"] / total, 4) if total else 0.0
+        stats["jitter_ms"] = round(self._jitter_ms, 2)
+        stats["highest_sequence"] = self._highest
+        return stats
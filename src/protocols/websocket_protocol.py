@@ -1,12 +1,15 @@
 import asyncio
-import json
 import logging
+import random
 import ssl
+import time
 
 import websockets
 
 from src.constants.constants import AudioConfig
 from src.protocols.protocol import Protocol
+from src.protocols.send_queue import SendQueue
+from src.utils import json_codec
 from src.utils.config_manager import ConfigManager
 from src.utils.logging_config import get_logger
 
@@ -16,6 +19,9 @@ logger = get_logger(__name__)
 
 
 class WebsocketProtocol(Protocol):
+    # 越过发送队列中音频帧的控制消息类型
+    PRIORITY_MESSAGE_TYPES = ("abort",)
+
     def __init__(self):
         super().__init__()
         # 获取配置管理器实例
@@ -37,11 +43,125 @@ class WebsocketProtocol(Protocol):
             "Client-Id": self.config.get_config("SYSTEM_OPTIONS.CLIENT_ID"),
         }
 
+        # 长连接会话：对话结束后保持连接，待命时预先建立连接，断线后按指数退避重连
+        self.persistent = self.config.get_config(
+            "SYSTEM_OPTIONS.NETWORK.WEBSOCKET_SESSION.PERSISTENT", False
+        )
+        self.preconnect = self.config.get_config(
+            "SYSTEM_OPTIONS.NETWORK.WEBSOCKET_SESSION.PRECONNECT", False
+        )
+        self.ping_interval = self.config.get_config(
+            "SYSTEM_OPTIONS.NETWORK.WEBSOCKET_SESSION.PING_INTERVAL", 20
+        )
+        self.ping_timeout = self.config.get_config(
+            "SYSTEM_OPTIONS.NETWORK.WEBSOCKET_SESSION.PING_TIMEOUT", 20
+        )
+        self.reconnect_min_delay = self.config.get_config(
+            "SYSTEM_OPTIONS.NETWORK.WEBSOCKET_SESSION.RECONNECT_MIN_DELAY", 1
+        )
+        self.reconnect_max_delay = self.config.get_config(
+            "SYSTEM_OPTIONS.NETWORK.WEBSOCKET_SESSION.RECONNECT_MAX_DELAY", 30
+        )
+        # 出站消息由单个写协程发送：控制消息优先，音频队列有界
+        self.send_queue = SendQueue(
+            self.config.get_config(
+                "SYSTEM_OPTIONS.NETWORK.SEND_QUEUE.AUDIO_MAX_FRAMES", 25
+            ),
+            self.config.get_config(
+                "SYSTEM_OPTIONS.NETWORK.SEND_QUEUE.AUDIO_DROP_POLICY", "drop_oldest"
+            ),
+        )
+        self.send_queue.on_error = self._on_send_error
+        self._connect_lock = None
+        self._connection_lost = None
+        self._keeper_task = None
+        self._closing = False
+        self._closed_locally = False
+        self.reconnect_count = 0
+
+    async def start_persistent_session(self):
+        """启动长连接维护任务
+
+        开启PRECONNECT时在待命状态就建立连接，唤醒后无需再等待握手。
+
+        Returns:
+            bool: 是否启动了维护任务
+        """
+        if not self.preconnect:
+            return False
+        self._start_keeper()
+        return True
+
+    def _start_keeper(self):
+        """启动后台连接维护任务（已在运行时忽略）"""
+        if self._closing or (self._keeper_task and not self._keeper_task.done()):
+            return
+        self._keeper_task = asyncio.create_task(self._keep_connection())
+
+    async def _keep_connection(self):
+        """保持连接：断开后按指数退避（带随机抖动）重连"""
+        delay = self.reconnect_min_delay
+        while not self._closing:
+            if not self.connected:
+                async with self._get_connect_lock():
+                    success = self.connected or await self._connect(
+                        notify_errors=False
+                    )
+                if not success:
+                    wait = delay * random.uniform(0.5, 1.0)
+                    logger.info(f"WebSocket预连接失败，{wait:.1f}秒后重试")
+                    await asyncio.sleep(wait)
+                    delay = min(delay * 2, self.reconnect_max_delay)
+                    continue
+
+            connected_at = time.monotonic()
+            await self._connection_lost.wait()
+            if self._closing:
+                break
+            if self._closed_locally:
+                # 本端结束会话（预连接模式），立即为下次唤醒准备新连接
+                self._closed_locally = False
+                delay = self.reconnect_min_delay
+                continue
+            # 连接维持得足够久才重置退避，避免服务端反复立即断开时频繁重连
+            if time.monotonic() - connected_at >= self.reconnect_max_delay:
+                delay = self.reconnect_min_delay
+            self.reconnect_count += 1
+            wait = delay * random.uniform(0.5, 1.0)
+            logger.info(f"WebSocket连接断开，{wait:.1f}秒后重连")
+            await asyncio.sleep(wait)
+            delay = min(delay * 2, self.reconnect_max_delay)
+
+    def _get_connect_lock(self):
+        # 在事件循环中创建，保证与连接使用同一个循环
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        return self._connect_lock
+
     async def connect(self) -> bool:
-        """连接到WebSocket服务器"""
+        """连接到WebSocket服务器
+
+        已有可用连接时直接返回，后台正在建立的连接会被复用。
+        """
+        async with self._get_connect_lock():
+            if self.connected:
+                return True
+            success = await self._connect(notify_errors=True)
+        if success and (self.persistent or self.preconnect):
+            self._start_keeper()
+        return success
+
+    async def _connect(self, notify_errors=True) -> bool:
+        """建立连接并完成hello握手
+
+        Args:
+            notify_errors: 失败时是否回调on_network_error，后台重连时不打扰界面
+        """
+        websocket = None
         try:
             # 在连接时创建 Event，确保在正确的事件循环中
             self.hello_received = asyncio.Event()
+            self._connection_lost = asyncio.Event()
 
             # 判断是否应该使用 SSL
             current_ssl_context = None
@@ -51,21 +171,27 @@ class WebsocketProtocol(Protocol):
             # 建立WebSocket连接 (兼容不同Python版本的写法)
             try:
                 # 新的写法 (在Python 3.11+版本中)
-                self.websocket = await websockets.connect(
+                websocket = await websockets.connect(
                     uri=self.WEBSOCKET_URL,
                     ssl=current_ssl_context,
                     additional_headers=self.HEADERS,
+                    ping_interval=self.ping_interval,
+                    ping_timeout=self.ping_timeout,
                 )
             except TypeError:
                 # 旧的写法 (在较早的Python版本中)
-                self.websocket = await websockets.connect(
+                websocket = await websockets.connect(
                     self.WEBSOCKET_URL,
                     ssl=current_ssl_context,
                     extra_headers=self.HEADERS,
+                    ping_interval=self.ping_interval,
+                    ping_timeout=self.ping_timeout,
                 )
+            self.websocket = websocket
+            self.send_queue.start(websocket.send)
 
             # 启动消息处理循环
-            asyncio.create_task(self._message_handler())
+            asyncio.create_task(self._message_handler(websocket))
 
             # 发送客户端hello消息
             hello_message = {
@@ -79,7 +205,7 @@ class WebsocketProtocol(Protocol):
                     "frame_duration": AudioConfig.FRAME_DURATION,
                 },
             }
-            await self.send_text(json.dumps(hello_message))
+            await self.send_text(json_codec.dumps(hello_message))
 
             # 等待服务器hello响应
             try:
@@ -89,23 +215,37 @@ class WebsocketProtocol(Protocol):
                 return True
             except asyncio.TimeoutError:
                 logger.error("等待服务器hello响应超时")
-                if self.on_network_error:
+                await self._discard(websocket)
+                if notify_errors and self.on_network_error:
                     self.on_network_error("等待响应超时")
                 return False
 
         except Exception as e:
             logger.error(f"WebSocket连接失败: {e}")
-            if self.on_network_error:
+            await self._discard(websocket)
+            if notify_errors and self.on_network_error:
                 self.on_network_error(f"无法连接服务: {str(e)}")
             return False
 
-    async def _message_handler(self):
+    async def _discard(self, websocket):
+        """关闭握手未完成的连接"""
+        if websocket is None:
+            return
+        if self.websocket is websocket:
+            self.websocket = None
+            self.send_queue.stop()
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+
+    async def _message_handler(self, websocket):
         """处理接收到的WebSocket消息"""
         try:
-            async for message in self.websocket:
+            async for message in websocket:
                 if isinstance(message, str):
                     try:
-                        data = json.loads(message)
+                        data = json_codec.loads(message)
                         msg_type = data.get("type")
                         if msg_type == "hello":
                             # 处理服务器 hello 消息
@@ -113,45 +253,89 @@ class WebsocketProtocol(Protocol):
                         else:
                             if self.on_incoming_json:
                                 self.on_incoming_json(data)
-                    except json.JSONDecodeError as e:
+                    except json_codec.JSONDecodeError as e:
                         logger.error(f"无效的JSON消息: {message}, 错误: {e}")
                 elif self.on_incoming_audio:  # 使用 elif 更清晰
                     self.on_incoming_audio(message)
 
         except websockets.ConnectionClosed:
             logger.info("WebSocket连接已关闭")
+            if self.websocket is not websocket:
+                # 已被新连接取代
+                return
             self.connected = False
             if self.on_audio_channel_closed:
                 # 使用 schedule 确保回调在主线程中执行
                 await self.on_audio_channel_closed()
         except Exception as e:
             logger.error(f"消息处理错误: {e}")
+            if self.websocket is not websocket:
+                return
             self.connected = False
             if self.on_network_error:
                 # 使用 schedule 确保错误处理在主线程中执行
                 self.on_network_error(f"连接错误: {str(e)}")
+        finally:
+            if self.websocket is websocket:
+                self._stop_send_queue()
+                if self._connection_lost:
+                    self.connected = False
+                    self._connection_lost.set()
+
+    def _stop_send_queue(self):
+        """停止写协程并记录发送统计"""
+        logger.info(f"WebSocket发送队列统计: {self.send_queue.get_stats()}")
+        self.send_queue.stop()
+
+    def _on_send_error(self, error):
+        """写协程发送音频失败"""
+        if self.on_network_error:
+            self.on_network_error(f"发送音频数据失败: {str(error)}")
+
+    def get_send_stats(self):
+        """获取发送队列统计（队列深度、峰值、已发送和丢弃的帧数）"""
+        return self.send_queue.get_stats()
+
+    def get_network_stats(self):
+        """发送队列的积压和丢帧作为拥塞反馈（TCP本身不丢包）"""
+        stats = self.send_queue.get_stats()
+        return {
+            "queue_depth": stats["audio_queued"],
+            "queue_capacity": stats["max_audio_frames"],
+            "audio_sent": stats["audio_sent"],
+            "audio_dropped": stats["audio_dropped"],
+        }
 
     async def send_audio(self, data: bytes):
-        """发送音频数据"""
+        """发送音频数据
+
+        只放入有界发送队列，不等待发送完成；上行拥塞时按丢弃策略丢帧
+        """
         if not self.is_audio_channel_opened():  # 使用已有的 is_connected 方法
             return
 
-        try:
-            await self.websocket.send(data)
-        except Exception as e:
-            if self.on_network_error:
-                self.on_network_error(f"发送音频数据失败: {str(e)}")
+        self.send_queue.put_audio(data)
+
+    async def send_text(self, message: str, priority=False):
+        """发送文本消息
 
-    async def send_text(self, message: str):
-        """发送文本消息"""
+        消息排在队列中已有的音频帧之后，priority为True时排在它们之前，等待实际发出后返回
+        """
         if self.websocket:
             try:
-                await self.websocket.send(message)
+                await self.send_queue.put_control(message, priority)
             except Exception as e:
                 await self.close_audio_channel()
                 if self.on_network_error:
                     self.on_network_error("客户端已关闭")
 
+    async def send_json(self, message):
+        """发送控制消息，abort等需要立即生效的消息越过排队的音频"""
+        return await self.send_text(
+            json_codec.dumps(message),
+            priority=message.get("type") in self.PRIORITY_MESSAGE_TYPES,
+        )
+
     def is_audio_channel_opened(self) -> bool:
         """检查音频通道是否打开"""
         return self.websocket is not None and self.connected
@@ -176,6 +360,7 @@ class WebsocketProtocol(Protocol):
                 logger.error(f"不支持的传输方式: {transport}")
                 return
             print("服务链接返回初始化配置", data)
+            self.session_id = data.get("session_id", self.session_id)
 
             # 设置 hello 接收事件
             self.hello_received.set()
@@ -192,13 +377,36 @@ class WebsocketProtocol(Protocol):
                 self.on_network_error(f"处理服务器响应失败: {str(e)}")
 
     async def close_audio_channel(self):
-        """关闭音频通道"""
+        """关闭音频通道
+
+        长连接模式下只结束本轮对话，保留连接供下次唤醒直接使用。
+        """
+        if self.persistent and self.connected and not self._closing:
+            logger.info("结束本轮对话，保持WebSocket连接")
+            if self.on_audio_channel_closed:
+                await self.on_audio_channel_closed()
+            return
+
         if self.websocket:
             try:
-                await self.websocket.close()
+                websocket = self.websocket
                 self.websocket = None
                 self.connected = False
+                self._stop_send_queue()
+                await websocket.close()
+                if self._connection_lost:
+                    # 预连接模式下由维护任务重新建立连接
+                    self._closed_locally = True
+                    self._connection_lost.set()
                 if self.on_audio_channel_closed:
                     await self.on_audio_channel_closed()
             except Exception as e:
                 logger.error(f"关闭WebSocket连接失败: {e}")
+
+    async def disconnect(self):
+        """断开连接并停止重连，应用退出时调用"""
+        self._closing = True
+        if self._keeper_task and not self._keeper_task.done():
+            self._keeper_task.cancel()
+        self._keeper_task = None
+        await self.close_audio_channel()
@@ -53,7 +53,27 @@ class ConfigManager:
                 "OTA_VERSION_URL": "https://api.tenclass.net/xiaozhi/ota/",
                 "WEBSOCKET_URL": None,
                 "WEBSOCKET_ACCESS_TOKEN": None,
+                "WEBSOCKET_SESSION": {
+                    "PERSISTENT": False,
+                    "PRECONNECT": False,
+                    "PING_INTERVAL": 20,
+                    "PING_TIMEOUT": 20,
+                    "RECONNECT_MIN_DELAY": 1,
+                    "RECONNECT_MAX_DELAY": 30,
+                },
+                "SEND_QUEUE": {
+                    "AUDIO_MAX_FRAMES": 25,
+                    "AUDIO_DROP_POLICY": "drop_oldest",  # 可选值: drop_oldest, drop_newest
+                },
                 "MQTT_INFO": None,
+                # 仅用于本地测试服务器：允许MQTT_INFO中的port和tls关闭TLS
+                "MQTT_ALLOW_INSECURE": False,
+                "MQTT_PUBLISH": {
+                    "QOS": 0,
+                    "QOS_BY_TYPE": {"hello": 1, "abort": 1},
+                    "MAX_INFLIGHT": 20,
+                    "TIMEOUT": 10,
+                },
                 "ACTIVATION_VERSION": "v2",  # 可选值: v1, v2
                 "AUTHORIZATION_URL": "https://xiaozhi.me/",
             },
@@ -62,6 +82,40 @@ class ConfigManager:
             "USE_WAKE_WORD": True,
             "MODEL_PATH": "models/vosk-model-small-cn-0.22",
             "WAKE_WORDS": ["小智", "小美"],
+            "RECOGNIZER_MODE": "open",  # 可选值: open, grammar
+            "MATCHER": "compiled",  # 可选值: compiled, legacy
+            "SPEECH_GATE": {
+                "MODE": "energy",  # 可选值: energy, webrtcvad, off
+                "MIN_RMS": 150,
+                "NOISE_RATIO": 3.0,
+                "PRE_ROLL_MS": 300,
+                "HANGOVER_MS": 600,
+            },
+        },
+        "AUDIO_OPTIONS": {
+            "FRAME_DURATION": 20,  # 可选值: 20, 40, 60, auto
+            "CAPTURE_MODE": "blocking",  # 可选值: blocking, callback
+            "CAPTURE_BUFFER_MS": 500,
+            "PLAYBACK_MODE": "blocking",  # 可选值: blocking, callback
+            "PLAYBACK_BUFFER_MS": 200,
+            "AEC_ENABLED": False,
+            "AEC_DELAY_MS": 50,
+            "AEC_MAX_LOAD": 0.5,
+            "PIPELINE_MODE": "thread",  # 可选值: thread, asyncio
+            "JITTER_MIN_DEPTH": 1,
+            "JITTER_MAX_DEPTH": 10,
+            "BACKEND": "pyaudio",  # 可选值: pyaudio, wav, null
+            "BACKEND_REALTIME": True,
+            "WAV_INPUT": [],
+            "WAV_INPUT_GAP_MS": 1000,
+            "WAV_OUTPUT": "",
+            "LOOPBACK": False,
+            "OPUS_PROFILE": "auto",  # 可选值: auto, balanced, low_cpu
+            "OPUS_ADAPTIVE": True,
+        },
+        "LATENCY_TRACE": {
+            "ENABLED": True,
+            "DUMP_PATH": "",
         },
         "TEMPERATURE_SENSOR_MQTT_INFO": {
             "endpoint": "你的Mqtt连接地址",
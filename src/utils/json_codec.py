@@ -0,0 +1,61 @@
+"""协议消息的JSON编解码
+
+安装了orjson时使用orjson，否则回退到标准库json。两种实现的输出都是紧凑格式、
+不转义非ASCII字符，解析失败时都抛出json.JSONDecodeError（orjson的异常是它的子类）。
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+JSONDecodeError = json.JSONDecodeError
+
+_stdlib_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+_stdlib_decode = json.JSONDecoder().decode
+
+if orjson is not None:
+    BACKEND = "orjson"
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj) -> str:
+        """序列化为JSON字符串（WebSocket文本帧、MQTT消息）"""
+        return dumps_bytes(obj).decode("utf-8")
+
+    def dumps_bytes(obj) -> bytes:
+        """序列化为UTF-8编码的JSON"""
+        try:
+            return orjson.dumps(obj, option=_ORJSON_OPTIONS)
+        except TypeError:
+            # orjson不支持的类型（如超过64位的整数）交给标准库处理
+            return _stdlib_encoder.encode(obj).encode("utf-8")
+
+    def loads(data):
+        """解析JSON，data可以是str、bytes或bytearray"""
+        return orjson.loads(data)
+
+else:
+    BACKEND = "json"
+
+    def dumps(obj) -> str:
+        """序列化为JSON字符串（WebSocket文本帧、MQTT消息）"""
+        return _stdlib_encoder.encode(obj)
+
+    def dumps_bytes(obj) -> bytes:
+        """序列化为UTF-8编码的JSON"""
+        return _stdlib_encoder.encode(obj).encode("utf-8")
+
+    def loads(data):
+        """解析JSON，data可以是str、bytes或bytearray"""
+        if not isinstance(data, str):
+            data = bytes(data).decode("utf-8")
+        return _stdlib_decode(data)
+
+
+logger.debug(f"JSON编解码使用: {BACKEND}")
@@ -0,0 +1,213 @@
+import json
+import math
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from src.utils.config_manager import ConfigManager
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class TracePoint:
+    """一轮对话中的打点位置"""
+
+    WAKE_WORD = "wake_word"  # 唤醒词命中
+    STATE_CONNECTING = "state_connecting"
+    STATE_LISTENING = "state_listening"
+    STATE_SPEAKING = "state_speaking"
+    STATE_IDLE = "state_idle"
+    STT = "stt"  # 服务端识别结果，视为用户说话结束
+    TTS_START = "tts_start"
+    TTS_SENTENCE_START = "tts_sentence_start"
+    TTS_STOP = "tts_stop"
+    FIRST_AUDIO_PACKET = "first_audio_packet"  # 收到第一个TTS音频包
+    FIRST_PLAYBACK = "first_playback"  # 第一帧TTS音频写入扬声器
+
+    @staticmethod
+    def for_state(state):
+        return f"state_{state}"
+
+
+# 指标名 -> (起点, 终点)
+LATENCY_METRICS = {
+    "wake_to_listen": (TracePoint.WAKE_WORD, TracePoint.STATE_LISTENING),
+    "listen_to_stt": (TracePoint.STATE_LISTENING, TracePoint.STT),
+    "stt_to_tts_start": (TracePoint.STT, TracePoint.TTS_START),
+    "speech_end_to_first_tts_byte": (TracePoint.STT, TracePoint.FIRST_AUDIO_PACKET),
+    "first_tts_byte_to_first_sample": (
+        TracePoint.FIRST_AUDIO_PACKET,
+        TracePoint.FIRST_PLAYBACK,
+    ),
+    "speech_end_to_first_sample": (TracePoint.STT, TracePoint.FIRST_PLAYBACK),
+}
+
+
+class LatencyTracer:
+    """对话延迟追踪器（单例）
+
+    每轮对话记录各打点第一次出现的时间，轮次结束时计算LATENCY_METRICS中的各项延迟，
+    保存最近的轮次记录，并按指标维护直方图（p50/p95/p99）。
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    # 每个指标保留的最近样本数，用于计算分位数
+    MAX_SAMPLES = 1000
+    # 保留的最近轮次记录数
+    MAX_TURNS = 200
+
+    def __init__(self):
+        config = ConfigManager.get_instance()
+        self.enabled = config.get_config("LATENCY_TRACE.ENABLED", True)
+        self.dump_path = config.get_config("LATENCY_TRACE.DUMP_PATH", "")
+
+        self._data_lock = threading.Lock()
+        self._turn_id = 0
+        self._turn_start_wall = None
+        self._marks = {}
+        self._turns = deque(maxlen=self.MAX_TURNS)
+        self._samples = {
+            name: deque(maxlen=self.MAX_SAMPLES) for name in LATENCY_METRICS
+        }
+
+    @classmethod
+    def get_instance(cls):
+        """获取延迟追踪器实例（线程安全）"""
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+        return cls._instance
+
+    def mark(self, point):
+        """记录打点，同一轮内只记录第一次出现的时间"""
+        if not self.enabled:
+            return
+        if point == TracePoint.WAKE_WORD and self._marks:
+            # 唤醒词总是开启新的一轮（如播放中被唤醒词打断）
+            self.end_turn()
+        elif point in self._marks:
+            return
+        now = time.perf_counter()
+        with self._data_lock:
+            if not self._marks:
+                self._turn_id += 1
+                self._turn_start_wall = time.time()
+            self._marks.setdefault(point, now)
+
+    def mark_state(self, state):
+        """记录设备状态切换并维护轮次边界"""
+        if not self.enabled:
+            return
+        point = TracePoint.for_state(state)
+        if point == TracePoint.STATE_LISTENING and (
+            TracePoint.STATE_SPEAKING in self._marks
+        ):
+            # 自动对话模式下说完直接进入下一轮聆听
+            self.end_turn()
+        self.mark(point)
+        if point == TracePoint.STATE_IDLE:
+            self.end_turn()
+
+    def end_turn(self):
+        """结束当前轮次，计算并记录各项延迟"""
+        with self._data_lock:
+            marks = self._marks
+            self._marks = {}
+            if len(marks) < 2:
+                # 只有单个打点（如启动时进入待命）不构成一轮对话
+                return None
+
+            origin = min(marks.values())
+            latencies = {}
+            for name, (start, end) in LATENCY_METRICS.items():
+                if start in marks and end in marks and marks[end] >= marks[start]:
+                    value = (marks[end] - marks[start]) * 1000
+                    latencies[name] = round(value, 2)
+                    self._samples[name].append(value)
+
+            record = {
+                "turn": self._turn_id,
+                "start_time": self._turn_start_wall,
+                "marks_ms": {
+                    point: round((ts - origin) * 1000, 2)
+                    for point, ts in sorted(marks.items(), key=lambda item: item[1])
+                },
+                "latency_ms": latencies,
+            }
+            self._turns.append(record)
+
+        if latencies:
+            logger.debug(f"第{record['turn']}轮对话延迟(毫秒): {latencies}")
+        return record
+
+    @staticmethod
+    def _percentile(sorted_values, percent):
+        """最近秩法计算分位数"""
+        if not sorted_values:
+            return None
+        rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+        return sorted_values[rank - 1]
+
+    def get_summary(self):
+        """获取各指标的直方图统计（毫秒）"""
+        with self._data_lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+
+        summary = {}
+        for name, values in samples.items():
+            if not values:
+                continue
+            summary[name] = {
+                "count": len(values),
+                "min": round(values[0], 2),
+                "p50": round(self._percentile(values, 50), 2),
+                "p95": round(self._percentile(values, 95), 2),
+                "p99": round(self._percentile(values, 99), 2),
+                "max": round(values[-1], 2),
+                "mean": round(sum(values) / len(values), 2),
+            }
+        return summary
+
+    def get_turns(self, limit=None):
+        """获取最近的轮次记录"""
+        with self._data_lock:
+            turns = list(self._turns)
+        return turns[-limit:] if limit else turns
+
+    def dump(self, path=None):
+        """把统计和轮次记录写入JSON文件
+
+        Returns:
+            bool: 是否写入成功
+        """
+        path = path or self.dump_path
+        if not path:
+            return False
+        try:
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            data = {
+                "generated_at": time.time(),
+                "summary": self.get_summary(),
+                "turns": self.get_turns(),
+            }
+            path.write_text(
+                json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+            logger.info(f"延迟统计已写入: {path}")
+            return True
+        except Exception as e:
+            logger.error(f"写入延迟统计失败: {e}")
+            return False
+
+    def reset(self):
+        """清空所有记录"""
+        with self._data_lock:
+            self._marks = {}
+            self._turns.clear()
+            for values in self._samples.values():
+                values.clear()
@@ -0,0 +1,52 @@
+import os
+import random
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from src.protocols.aes_ctr import AesCtrCipher
+
+
+def _reference(key, nonce, data):
+    encryptor = Cipher(algorithms.AES(key), modes.CTR(nonce)).encryptor()
+    return encryptor.update(data) + encryptor.finalize()
+
+
+def test_matches_cryptography_ctr_on_random_packets():
+    rng = random.Random(0)
+    key = os.urandom(16)
+    cipher = AesCtrCipher(key)
+    for _ in range(1000):
+        nonce = os.urandom(16)
+        # 包括空包、非整块长度和多块长度
+        data = os.urandom(rng.randrange(0, 1500))
+        assert cipher.process(nonce, data) == _reference(key, nonce, data)
+
+
+def test_non_block_aligned_tails():
+    key = os.urandom(16)
+    cipher = AesCtrCipher(key)
+    nonce = os.urandom(16)
+    for size in (1, 15, 16, 17, 31, 32, 33, 120, 127):
+        data = os.urandom(size)
+        assert cipher.process(nonce, data) == _reference(key, nonce, data)
+
+
+def test_counter_wraparound_near_max_nonce():
+    key = os.urandom(16)
+    cipher = AesCtrCipher(key)
+    max_counter = (1 << 128) - 1
+    for back in range(0, 4):
+        nonce = (max_counter - back).to_bytes(16, "big")
+        for size in (16, 40, 64, 200):
+            data = os.urandom(size)
+            assert cipher.process(nonce, data) == _reference(key, nonce, data)
+
+
+def test_hex_key_and_bytearray_nonce_round_trip():
+    key = os.urandom(16)
+    cipher = AesCtrCipher(key.hex())
+    nonce = bytearray(os.urandom(16))
+    data = os.urandom(300)
+    encrypted = cipher.process(nonce, memoryview(data))
+    assert encrypted == _reference(key, bytes(nonce), data)
+    assert AesCtrCipher(key).process(nonce, encrypted) == data
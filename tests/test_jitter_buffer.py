@@ -0,0 +1,84 @@
+from src.audio_codecs.jitter_buffer import FrameStatus, JitterBuffer
+
+
+def _packet(sequence):
+    return bytes([sequence])
+
+
+def _buffer(**kwargs):
+    # 帧时长取得很长，出队结果只取决于缓冲深度，与测试运行快慢无关
+    return JitterBuffer(frame_duration_ms=1000, **kwargs)
+
+
+def _drain(buffer):
+    frames = []
+    while True:
+        status, data = buffer.pop()
+        if status is None:
+            return frames
+        frames.append((status, data))
+
+
+def test_reorder_gap_and_far_late_packet():
+    buffer = _buffer()
+    # 1和2乱序到达，3和5缺失
+    for sequence in (0, 2, 1, 4, 7):
+        assert buffer.put(_packet(sequence), sequence)
+
+    assert _drain(buffer) == [
+        (FrameStatus.PACKET, _packet(0)),
+        (FrameStatus.PACKET, _packet(1)),
+        (FrameStatus.PACKET, _packet(2)),
+        # 3缺失，用4的带内FEC恢复，4本身仍留在缓冲区
+        (FrameStatus.FEC, _packet(4)),
+        (FrameStatus.PACKET, _packet(4)),
+        # 5缺失且6也没有，只能丢包隐藏
+        (FrameStatus.PLC, None),
+        (FrameStatus.FEC, _packet(7)),
+        (FrameStatus.PACKET, _packet(7)),
+    ]
+
+    # 已经播放过的序号再到达时直接丢弃
+    assert not buffer.put(_packet(3), 3)
+    stats = buffer.get_stats()
+    assert stats["late"] == 1
+    assert stats["played"] == 5
+    assert stats["fec"] == 2
+    assert stats["plc"] == 1
+
+
+def test_duplicate_packet_is_dropped():
+    buffer = _buffer(min_depth=2)
+    assert buffer.put(_packet(0), 0)
+    assert not buffer.put(_packet(0), 0)
+    assert buffer.get_stats()["duplicates"] == 1
+
+
+def test_sequence_jump_beyond_max_depth_resyncs():
+    buffer = _buffer(max_depth=10)
+    buffer.put(_packet(0), 0)
+    assert buffer.pop() == (FrameStatus.PACKET, _packet(0))
+
+    # 服务端重置序号后，新包远在下一个期望序号之后
+    for sequence in (50, 51):
+        buffer.put(_packet(sequence), sequence)
+    assert _drain(buffer) == [
+        (FrameStatus.PACKET, _packet(50)),
+        (FrameStatus.PACKET, _packet(51)),
+    ]
+    assert buffer.get_stats()["plc"] == 0
+
+
+def test_time_until_next_while_prebuffering():
+    buffer = _buffer(min_depth=2)
+    assert buffer.time_until_next() is None
+
+    buffer.put(_packet(0), 0)
+    # 还没攒够目标深度，等待不超过目标深度对应的时长
+    assert buffer.pop() == (None, None)
+    wait = buffer.time_until_next()
+    assert 0 < wait <= 2.0
+
+    buffer.put(_packet(1), 1)
+    assert buffer.time_until_next() == 0.0
+    assert buffer.pop() == (FrameStatus.PACKET, _packet(0))
@@ -0,0 +1,82 @@
+import asyncio
+
+from src.audio_codecs.capture_bus import DropPolicy
+from src.protocols.send_queue import SendQueue
+
+
+class _SlowSocket:
+    """记录发送顺序，第一条消息阻塞到放行为止，模拟上行拥塞"""
+
+    def __init__(self):
+        self.sent = []
+        self.release = asyncio.Event()
+
+    async def send(self, message):
+        if not self.sent:
+            await self.release.wait()
+        self.sent.append(message)
+
+
+async def _congested(queue, frames):
+    socket = _SlowSocket()
+    queue.start(socket.send)
+    for frame in frames:
+        queue.put_audio(frame)
+    # 让写协程取出第一帧并阻塞在发送上
+    await asyncio.sleep(0)
+    return socket
+
+
+def test_stop_listening_follows_queued_audio():
+    async def run():
+        queue = SendQueue(max_audio_frames=25)
+        frames = [bytes([i]) for i in range(10)]
+        socket = await _congested(queue, frames)
+        stop = queue.put_control('{"type":"listen","state":"stop"}')
+        socket.release.set()
+        await asyncio.wait_for(stop, 1)
+        queue.stop()
+        return socket.sent, frames
+
+    sent, frames = asyncio.run(run())
+    assert sent == frames + ['{"type":"listen","state":"stop"}']
+
+
+def test_priority_message_preempts_queued_audio():
+    async def run():
+        queue = SendQueue(max_audio_frames=25)
+        frames = [bytes([i]) for i in range(10)]
+        socket = await _congested(queue, frames)
+        abort = queue.put_control('{"type":"abort"}', priority=True)
+        socket.release.set()
+        await asyncio.wait_for(abort, 1)
+        await asyncio.sleep(0)
+        queue.stop()
+        return socket.sent, frames
+
+    sent, frames = asyncio.run(run())
+    # 第一帧在abort入队前已经开始发送
+    assert sent[:2] == [frames[0], '{"type":"abort"}']
+
+
+def test_dropping_old_audio_keeps_control_order():
+    async def run():
+        queue = SendQueue(max_audio_frames=3, drop_policy=DropPolicy.DROP_OLDEST)
+        socket = await _congested(queue, [b"a0"])
+        queue.put_audio(b"a1")
+        stop = queue.put_control("stop")
+        for frame in (b"b0", b"b1", b"b2"):
+            queue.put_audio(frame)
+        stats = queue.get_stats()
+        socket.release.set()
+        await asyncio.wait_for(stop, 1)
+        while queue.get_stats()["audio_queued"]:
+            await asyncio.sleep(0)
+        queue.stop()
+        return socket.sent, stats
+
+    sent, stats = asyncio.run(run())
+    assert stats["audio_queued"] == 3
+    assert stats["control_queued"] == 1
+    assert stats["audio_dropped"] == 1
+    assert sent == [b"a0", "stop", b"b0", b"b1", b"b2"]
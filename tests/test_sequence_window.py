@@ -0,0 +1,85 @@
+from src.protocols.sequence_window import SequenceWindow
+
+FRAME = 0.06
+
+
+def _feed(window, sequences, start=0):
+    return [
+        window.accept(sequence, (start + i) * FRAME)
+        for i, sequence in enumerate(sequences)
+    ]
+
+
+def test_in_order_sequences_are_delivered():
+    window = SequenceWindow()
+    delivered = _feed(window, range(100, 110))
+    assert delivered == list(range(100, 110))
+    assert window.get_stats()["lost"] == 0
+
+
+def test_duplicate_and_late_packets_are_dropped():
+    window = SequenceWindow(window=8)
+    _feed(window, range(1, 21))
+    assert window.accept(15, 2.0) is None
+    assert window.accept(3, 2.1) is None
+    stats = window.get_stats()
+    assert stats["duplicates"] == 1
+    assert stats["late"] == 1
+    assert stats["resyncs"] == 0
+
+
+def test_mid_stream_reset_outside_window_resyncs_quickly():
+    window = SequenceWindow()
+    _feed(window, range(5000, 5200))
+    delivered = _feed(window, range(1, 21), start=200)
+
+    # 只有对齐前的两个包被丢弃，之后的包接着原来的扩展序号连续交付
+    assert delivered[:2] == [None, None]
+    assert delivered[2:] == list(range(5202, 5220))
+    stats = window.get_stats()
+    assert stats["resyncs"] == 1
+    assert stats["late"] == 3
+
+
+def test_mid_stream_reset_inside_window_resyncs_quickly():
+    window = SequenceWindow()
+    _feed(window, range(1, 41))
+    delivered = _feed(window, range(1, 21), start=40)
+
+    assert delivered[:2] == [None, None]
+    assert delivered[2:] == list(range(43, 61))
+    stats = window.get_stats()
+    assert stats["resyncs"] == 1
+    assert stats["duplicates"] == 3
+
+
+def test_replayed_recent_packets_do_not_resync():
+    window = SequenceWindow()
+    _feed(window, range(1, 41))
+    # 最近几个包被重复发送了一遍，随后原有编号继续
+    delivered = _feed(window, [38, 39, 40, 41, 42], start=40)
+
+    assert delivered == [None, None, None, 41, 42]
+    stats = window.get_stats()
+    assert stats["resyncs"] == 0
+    assert stats["duplicates"] == 3
+
+
+def test_reset_near_highest_sequence_loses_at_most_reorder_depth():
+    window = SequenceWindow(reorder_depth=8)
+    _feed(window, range(1, 41))
+    delivered = _feed(window, range(35, 50), start=40)
+
+    # 35..40被当作重复包丢弃，之后按原编号继续交付
+    assert delivered[:6] == [None] * 6
+    assert delivered[6:] == list(range(41, 50))
+    assert window.get_stats()["resyncs"] == 0
+
+
+def test_scattered_late_packets_do_not_resync():
+    window = SequenceWindow(window=8)
+    _feed(window, range(1, 101))
+    for i, sequence in enumerate((10, 30, 50, 70)):
+        assert window.accept(sequence, 7.0 + i * FRAME) is None
+    assert window.get_stats()["resyncs"] == 0
+    assert window.accept(101, 8.0) == 101